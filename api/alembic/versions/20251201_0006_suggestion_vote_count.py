@@ -0,0 +1,66 @@
+"""Adiciona contador desnormalizado de votos nas sugestões."""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20251201_0006"
+down_revision = "20251120_0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "suggestions",
+        sa.Column("vote_count", sa.Integer(), nullable=False, server_default=sa.text("0")),
+    )
+
+    op.execute(
+        """
+        UPDATE suggestions s
+        SET vote_count = v.total
+        FROM (
+          SELECT suggestion_id, COUNT(*) AS total
+          FROM suggestion_votes
+          GROUP BY suggestion_id
+        ) v
+        WHERE v.suggestion_id = s.id;
+        """
+    )
+
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION update_suggestion_vote_count()
+        RETURNS TRIGGER AS $$
+        BEGIN
+          IF TG_OP = 'INSERT' THEN
+            UPDATE suggestions SET vote_count = vote_count + 1 WHERE id = NEW.suggestion_id;
+            RETURN NEW;
+          END IF;
+
+          UPDATE suggestions SET vote_count = GREATEST(vote_count - 1, 0) WHERE id = OLD.suggestion_id;
+          RETURN OLD;
+        END;
+        $$ LANGUAGE plpgsql;
+        """
+    )
+
+    op.execute(
+        """
+        CREATE TRIGGER update_suggestion_vote_count
+        AFTER INSERT OR DELETE ON suggestion_votes
+        FOR EACH ROW EXECUTE FUNCTION update_suggestion_vote_count();
+        """
+    )
+
+    op.execute(
+        "CREATE INDEX idx_suggestions_vote_count_created_at ON suggestions(vote_count DESC, created_at DESC)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_suggestions_vote_count_created_at")
+    op.execute("DROP TRIGGER IF EXISTS update_suggestion_vote_count ON suggestion_votes")
+    op.execute("DROP FUNCTION IF EXISTS update_suggestion_vote_count")
+    op.drop_column("suggestions", "vote_count")
@@ -0,0 +1,58 @@
+"""Replace single-column indexes on assets/transactions with query-shaped ones."""
+from __future__ import annotations
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20251210_0007"
+down_revision = "20251201_0006"
+branch_labels = None
+depends_on = None
+
+# (nome, definição) na ordem de criação. Cada índice atende a um formato de consulta:
+NEW_INDEXES = [
+    # GET /assets: WHERE user_id = ? ORDER BY ticker (também cobre o FK user_id)
+    ("idx_assets_user_ticker", "ON assets (user_id, ticker)"),
+    # Views portfolio_summary/portfolio_allocation: só ativos ativos, agrupados por
+    # usuário e tipo; o INCLUDE permite index-only scan sem visitar o heap
+    (
+        "idx_assets_active_user_type",
+        "ON assets (user_id, asset_type) INCLUDE (id, quantity, average_price) WHERE is_active",
+    ),
+    # GET /transactions: WHERE user_id = ? ORDER BY date DESC
+    ("idx_transactions_user_date", "ON transactions (user_id, date DESC)"),
+    # Trigger recalculate_average_price (SUM por asset_id + transaction_type), join da
+    # portfolio_summary (COUNT DISTINCT t.id) e FK asset_id com ON DELETE CASCADE
+    (
+        "idx_transactions_asset_type",
+        "ON transactions (asset_id, transaction_type) INCLUDE (id, quantity, unit_price)",
+    ),
+]
+
+# Substituídos pelos acima (prefixo coberto) ou sem consulta que os use
+OLD_INDEXES = [
+    ("idx_assets_user_id", "ON assets (user_id)"),
+    ("idx_assets_type", "ON assets (asset_type)"),
+    ("idx_transactions_user_id", "ON transactions (user_id)"),
+    ("idx_transactions_asset_id", "ON transactions (asset_id)"),
+    ("idx_transactions_date", "ON transactions (date DESC)"),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY não roda dentro de transação; evita travar escritas em bases grandes
+    with op.get_context().autocommit_block():
+        for name, definition in NEW_INDEXES:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} {definition}")
+        for name, _ in OLD_INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+    op.execute("ANALYZE assets")
+    op.execute("ANALYZE transactions")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, definition in OLD_INDEXES:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} {definition}")
+        for name, _ in reversed(NEW_INDEXES):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
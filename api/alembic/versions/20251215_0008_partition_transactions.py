@@ -0,0 +1,259 @@
+"""Optionally convert transactions into a monthly range-partitioned table.
+
+Opt-in, since it changes the primary key to (id, date):
+
+    alembic -x partition_transactions=true upgrade head
+
+Without the flag only ``ensure_transaction_partitions()`` is installed (a no-op while
+the table is not partitioned). To opt in later, downgrade to 20251210_0007 and upgrade
+again with the flag.
+"""
+from __future__ import annotations
+
+from alembic import context, op
+from sqlalchemy import text
+
+from app.core.settings import settings
+
+# revision identifiers, used by Alembic.
+revision = "20251215_0008"
+down_revision = "20251210_0007"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 20_000
+
+# Cria as partições mensais (UTC) de from_month até months_ahead meses à frente.
+# Também é chamada periodicamente pela task maintenance.transaction_partitions.
+# ``parent`` é texto resolvido a cada chamada: um DEFAULT regclass criaria dependência
+# da função na tabela e impediria o DROP TABLE da troca.
+# Se a partição DEFAULT já tem linhas do mês (trade muito no futuro, beat atrasado), o
+# CREATE ... PARTITION OF falharia; ela é destacada, a partição criada, as linhas do mês
+# movidas pela tabela pai (disparando os triggers) e a DEFAULT reanexada.
+ENSURE_PARTITIONS_FN = """
+CREATE OR REPLACE FUNCTION ensure_transaction_partitions(
+  months_ahead integer DEFAULT 3,
+  from_month date DEFAULT NULL,
+  parent text DEFAULT 'transactions'
+)
+RETURNS integer AS $$
+DECLARE
+  parent_table regclass := to_regclass(parent);
+  default_partition regclass;
+  month_start date := COALESCE(from_month, date_trunc('month', now() AT TIME ZONE 'UTC')::date);
+  last_month date := (date_trunc('month', now() AT TIME ZONE 'UTC') + make_interval(months => months_ahead))::date;
+  range_start timestamptz;
+  range_end timestamptz;
+  partition_name text;
+  has_rows boolean;
+  created integer := 0;
+BEGIN
+  IF parent_table IS NULL OR (SELECT relkind FROM pg_class WHERE oid = parent_table) <> 'p' THEN
+    RETURN 0;
+  END IF;
+  SELECT NULLIF(partdefid, 0)::regclass INTO default_partition
+  FROM pg_partitioned_table WHERE partrelid = parent_table;
+
+  WHILE month_start <= last_month LOOP
+    partition_name := format('transactions_%s', to_char(month_start, 'YYYY_MM'));
+    range_start := month_start::timestamp AT TIME ZONE 'UTC';
+    range_end := (month_start + interval '1 month')::timestamp AT TIME ZONE 'UTC';
+    IF to_regclass(partition_name) IS NULL THEN
+      has_rows := false;
+      IF default_partition IS NOT NULL THEN
+        EXECUTE format('SELECT EXISTS (SELECT 1 FROM %s WHERE date >= %L AND date < %L)',
+                       default_partition, range_start, range_end)
+          INTO has_rows;
+      END IF;
+
+      IF has_rows THEN
+        EXECUTE format('ALTER TABLE %s DETACH PARTITION %s', parent_table, default_partition);
+      END IF;
+      EXECUTE format(
+        'CREATE TABLE %I PARTITION OF %s FOR VALUES FROM (%L) TO (%L)',
+        partition_name, parent_table, range_start, range_end
+      );
+      IF has_rows THEN
+        EXECUTE format(
+          'WITH moved AS (DELETE FROM %s WHERE date >= %L AND date < %L RETURNING *) '
+          'INSERT INTO %s SELECT * FROM moved',
+          default_partition, range_start, range_end, parent_table
+        );
+        EXECUTE format('ALTER TABLE %s ATTACH PARTITION %s DEFAULT', parent_table, default_partition);
+      END IF;
+      created := created + 1;
+    END IF;
+    month_start := (month_start + interval '1 month')::date;
+  END LOOP;
+
+  RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# Mantém a cópia em dia enquanto os lotes são movidos. UPDATE vira DELETE + INSERT
+# porque a mudança de ``date`` troca a linha de partição (e de chave primária).
+MIRROR_FN = """
+CREATE OR REPLACE FUNCTION mirror_transactions_to_partitioned()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    DELETE FROM transactions_partitioned WHERE id = OLD.id AND date = OLD.date;
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    INSERT INTO transactions_partitioned SELECT NEW.* ON CONFLICT DO NOTHING;
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# FOR SHARE: um UPDATE/DELETE concorrente espera o lote terminar e então o trigger de
+# espelhamento vê a linha já copiada; ON CONFLICT cobre linhas que o trigger já inseriu.
+COPY_BATCH = """
+WITH batch AS (
+  SELECT * FROM transactions WHERE id > :last_id ORDER BY id LIMIT :batch_size FOR SHARE
+), copied AS (
+  INSERT INTO transactions_partitioned SELECT * FROM batch ON CONFLICT DO NOTHING
+)
+SELECT id FROM batch ORDER BY id DESC LIMIT 1
+"""
+
+DEPENDENT_VIEWS = """
+SELECT DISTINCT v.relname, pg_get_viewdef(v.oid)
+FROM pg_depend d
+JOIN pg_rewrite r ON r.oid = d.objid
+JOIN pg_class v ON v.oid = r.ev_class
+WHERE d.refobjid = 'transactions'::regclass AND v.oid <> 'transactions'::regclass
+"""
+
+AVERAGE_PRICE_TRIGGER = """
+CREATE TRIGGER update_asset_average_price
+AFTER INSERT OR UPDATE OR DELETE ON transactions
+FOR EACH ROW EXECUTE FUNCTION recalculate_average_price();
+"""
+
+
+def _partitioning_requested() -> bool:
+    flag = context.get_x_argument(as_dictionary=True).get("partition_transactions", "")
+    return flag.lower() in {"1", "true", "yes"}
+
+
+def _is_partitioned() -> bool:
+    return op.get_bind().execute(
+        text("SELECT relkind = 'p' FROM pg_class WHERE oid = 'transactions'::regclass")
+    ).scalar_one()
+
+
+def _drop_leftovers() -> None:
+    """Remove o que uma conversão interrompida deixou (a cópia em lotes já foi commitada)."""
+    op.execute("DROP TRIGGER IF EXISTS mirror_transactions_to_partitioned ON transactions")
+    op.execute("DROP FUNCTION IF EXISTS mirror_transactions_to_partitioned()")
+    # Leva junto as partições mensais e a DEFAULT
+    op.execute("DROP TABLE IF EXISTS transactions_partitioned")
+
+
+def _create_table(name: str, *, partitioned: bool) -> None:
+    """Cria ``name`` com as colunas, FKs e índices de transactions (sufixados por ``name``)."""
+    partition_clause = " PARTITION BY RANGE (date)" if partitioned else ""
+    primary_key = "id, date" if partitioned else "id"
+    op.execute(
+        f"CREATE TABLE {name} (LIKE transactions INCLUDING DEFAULTS INCLUDING CONSTRAINTS){partition_clause}"
+    )
+    op.execute(f"ALTER TABLE {name} ADD CONSTRAINT {name}_pkey PRIMARY KEY ({primary_key})")
+    op.execute(
+        f"ALTER TABLE {name} ADD CONSTRAINT {name}_asset_id_fkey "
+        "FOREIGN KEY (asset_id) REFERENCES assets(id) ON DELETE CASCADE"
+    )
+    op.execute(
+        f"ALTER TABLE {name} ADD CONSTRAINT {name}_user_id_fkey "
+        "FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE"
+    )
+    # Mesmos índices da 20251210_0007; em tabela particionada são replicados por partição
+    op.execute(f"CREATE INDEX idx_{name}_user_date ON {name} (user_id, date DESC)")
+    op.execute(
+        f"CREATE INDEX idx_{name}_asset_type ON {name} "
+        "(asset_id, transaction_type) INCLUDE (id, quantity, unit_price)"
+    )
+
+
+def _swap(new_table: str) -> None:
+    """Troca ``transactions`` por ``new_table`` preservando views e o trigger de preço médio.
+
+    Roda numa transação curta com ACCESS EXCLUSIVE: só renomeações e DDL de catálogo.
+    """
+    bind = op.get_bind()
+    op.execute("LOCK TABLE transactions IN ACCESS EXCLUSIVE MODE")
+    # As views referenciam a tabela pelo OID; guarda o SQL para recriá-las sobre a nova
+    views = bind.execute(text(DEPENDENT_VIEWS)).all()
+    for name, _ in views:
+        op.execute(f"DROP VIEW {name}")
+    op.execute("DROP TABLE transactions")
+
+    op.execute(f"ALTER TABLE {new_table} RENAME TO transactions")
+    op.execute(f"ALTER TABLE transactions RENAME CONSTRAINT {new_table}_pkey TO transactions_pkey")
+    op.execute(f"ALTER TABLE transactions RENAME CONSTRAINT {new_table}_asset_id_fkey TO transactions_asset_id_fkey")
+    op.execute(f"ALTER TABLE transactions RENAME CONSTRAINT {new_table}_user_id_fkey TO transactions_user_id_fkey")
+    op.execute(f"ALTER INDEX idx_{new_table}_user_date RENAME TO idx_transactions_user_date")
+    op.execute(f"ALTER INDEX idx_{new_table}_asset_type RENAME TO idx_transactions_asset_type")
+
+    for name, definition in views:
+        op.execute(f"CREATE VIEW {name} AS {definition}")
+    # recalculate_average_price() resolve "transactions" pelo nome a cada execução
+    op.execute(AVERAGE_PRICE_TRIGGER)
+
+
+def upgrade() -> None:
+    # Versões anteriores da função recebiam ``parent regclass``
+    op.execute("DROP FUNCTION IF EXISTS ensure_transaction_partitions(integer, date, regclass)")
+    op.execute(ENSURE_PARTITIONS_FN)
+    if _is_partitioned():
+        return
+    _drop_leftovers()
+    if not _partitioning_requested():
+        return
+
+    bind = op.get_bind()
+    _create_table("transactions_partitioned", partitioned=True)
+    # Datas fora das partições mensais (muito antigas/futuras) caem na DEFAULT
+    op.execute("CREATE TABLE transactions_default PARTITION OF transactions_partitioned DEFAULT")
+    first_month = bind.execute(
+        text("SELECT date_trunc('month', MIN(date) AT TIME ZONE 'UTC')::date FROM transactions")
+    ).scalar()
+    bind.execute(
+        text("SELECT ensure_transaction_partitions(:ahead, :first_month, 'transactions_partitioned')"),
+        {"ahead": settings.transaction_partitions_ahead_months, "first_month": first_month},
+    )
+    op.execute(MIRROR_FN)
+    op.execute(
+        """
+        CREATE TRIGGER mirror_transactions_to_partitioned
+        AFTER INSERT OR UPDATE OR DELETE ON transactions
+        FOR EACH ROW EXECUTE FUNCTION mirror_transactions_to_partitioned();
+        """
+    )
+
+    # Cópia online: cada lote é uma transação própria, sem bloquear escritas na tabela antiga
+    with op.get_context().autocommit_block():
+        last_id = "00000000-0000-0000-0000-000000000000"
+        while True:
+            last_id = bind.execute(
+                text(COPY_BATCH), {"last_id": last_id, "batch_size": BATCH_SIZE}
+            ).scalar()
+            if last_id is None:
+                break
+
+    _swap("transactions_partitioned")
+    op.execute("DROP FUNCTION IF EXISTS mirror_transactions_to_partitioned()")
+    op.execute("ANALYZE transactions")
+
+
+def downgrade() -> None:
+    if _is_partitioned():
+        # Caminho inverso offline: volume cabe numa única transação na volta
+        _create_table("transactions_unpartitioned", partitioned=False)
+        op.execute("INSERT INTO transactions_unpartitioned SELECT * FROM transactions")
+        _swap("transactions_unpartitioned")
+        op.execute("ANALYZE transactions")
+    op.execute("DROP FUNCTION IF EXISTS ensure_transaction_partitions(integer, date, text)")
+    op.execute("DROP FUNCTION IF EXISTS ensure_transaction_partitions(integer, date, regclass)")
@@ -0,0 +1,29 @@
+"""Cria a tabela de candles OHLC diários por ticker."""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20251220_0009"
+down_revision = "20251215_0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # A chave primária (asset_type, ticker, date) já atende a leitura por intervalo de datas
+    op.create_table(
+        "quote_candles",
+        sa.Column("asset_type", sa.String(length=8), primary_key=True, nullable=False),
+        sa.Column("ticker", sa.String(length=32), primary_key=True, nullable=False),
+        sa.Column("date", sa.DateTime(timezone=True), primary_key=True, nullable=False),
+        sa.Column("open", sa.Numeric(20, 8), nullable=False),
+        sa.Column("high", sa.Numeric(20, 8), nullable=False),
+        sa.Column("low", sa.Numeric(20, 8), nullable=False),
+        sa.Column("close", sa.Numeric(20, 8), nullable=False),
+        sa.Column("volume", sa.Numeric(28, 4)),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("quote_candles")
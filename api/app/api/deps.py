@@ -8,17 +8,19 @@ from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 
 from app.core.security import decode_token
-from app.db.session import get_session
+from app.db.replica import get_read_session
+from app.db.session import SessionLocal, get_session
 from app.models import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token", auto_error=False)
 
 
 def get_db() -> Session:
     yield from get_session()
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+def _user_id_from_token(token: str) -> uuid.UUID:
     try:
         payload = decode_token(token)
         subject: str | None = payload.get("sub")
@@ -36,11 +38,58 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         raise HTTPException(status_code=401, detail="Token inválido para esta operação")
 
     try:
-        user_id = uuid.UUID(subject)
+        return uuid.UUID(subject)
     except ValueError as exc:
         raise HTTPException(status_code=401, detail="Token inválido") from exc
 
+
+def get_read_db(token: str | None = Depends(optional_oauth2_scheme)) -> Session:
+    """Sessão para GETs somente leitura (réplica, se configurada).
+
+    O token só identifica o usuário para a proteção read-your-writes; a autenticação
+    continua a cargo de ``get_current_reader``.
+    """
+    user_id = None
+    if token:
+        try:
+            user_id = _user_id_from_token(token)
+        except HTTPException:
+            pass
+    yield from get_read_session(user_id)
+
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+    user_id = _user_id_from_token(token)
+    user = db.get(User, user_id)
+    if not user or not user.is_active:
+        raise HTTPException(status_code=401, detail="Usuário inativo ou inexistente")
+    # Commits desta sessão marcam o usuário como recém-escrito (ver app.db.replica)
+    db.info["user_id"] = user.id
+    return user
+
+
+def get_current_user_detached(token: str = Depends(oauth2_scheme)) -> User:
+    """Como ``get_current_user``, mas devolve a conexão ao pool antes da rota rodar.
+
+    Para rotas que esperam muito sem usar o banco (long-poll, SSE, provedores externos):
+    com ``get_db`` a sessão ficaria aberta, com a conexão presa, até o fim da resposta.
+    """
+    user_id = _user_id_from_token(token)
+    with SessionLocal() as db:
+        user = db.get(User, user_id)
+    if not user or not user.is_active:
+        raise HTTPException(status_code=401, detail="Usuário inativo ou inexistente")
+    return user
+
+
+def get_current_reader(token: str = Depends(oauth2_scheme), db: Session = Depends(get_read_db)) -> User:
+    """Como ``get_current_user``, mas lendo o usuário da mesma sessão da rota de leitura."""
+    user_id = _user_id_from_token(token)
     user = db.get(User, user_id)
+    if user is None and db.info.get("replica"):
+        # Conta recém-criada que ainda não chegou à réplica
+        with SessionLocal() as primary:
+            user = primary.get(User, user_id)
     if not user or not user.is_active:
         raise HTTPException(status_code=401, detail="Usuário inativo ou inexistente")
     return user
@@ -0,0 +1,47 @@
+"""Entrega de arquivos de mídia com cache de longa duração."""
+from __future__ import annotations
+
+from pathlib import Path, PurePosixPath
+from typing import Any
+
+from fastapi import APIRouter, HTTPException, Response
+from fastapi.staticfiles import StaticFiles
+
+from app.core.settings import settings
+
+# Os nomes são derivados do hash do conteúdo, então um arquivo nunca muda de bytes
+MEDIA_CACHE_CONTROL = f"public, max-age={settings.media_cache_max_age}, immutable"
+
+
+class ImmutableStaticFiles(StaticFiles):
+    """StaticFiles que marca as respostas como imutáveis para o navegador/CDN."""
+
+    def file_response(self, *args: Any, **kwargs: Any) -> Response:
+        response = super().file_response(*args, **kwargs)
+        response.headers.setdefault("Cache-Control", MEDIA_CACHE_CONTROL)
+        return response
+
+
+accel_router = APIRouter(prefix=settings.media_url, include_in_schema=False)
+
+
+@accel_router.get("/{path:path}")
+def accel_redirect_media(path: str) -> Response:
+    """Delega a leitura do arquivo ao nginx via ``X-Accel-Redirect``.
+
+    A existência é conferida aqui: sem isso um arquivo ausente viraria um redirect interno
+    para o nginx responder (sem o 404 da API e com o Cache-Control imutável).
+    """
+    relative = PurePosixPath(path)
+    if relative.is_absolute() or not relative.parts or ".." in relative.parts:
+        raise HTTPException(status_code=404, detail="Arquivo não encontrado")
+    if not Path(settings.media_root, *relative.parts).is_file():
+        raise HTTPException(status_code=404, detail="Arquivo não encontrado")
+
+    prefix = (settings.media_accel_redirect_prefix or "").rstrip("/")
+    return Response(
+        headers={
+            "X-Accel-Redirect": f"{prefix}/{relative}",
+            "Cache-Control": MEDIA_CACHE_CONTROL,
+        }
+    )
@@ -0,0 +1,168 @@
+"""Rate limiting por token bucket no Redis, aplicado como dependência de rota.
+
+Cada rota declara seus buckets (por IP e/ou por usuário) com limites no formato
+``"10/minute"``: capacidade de 10 requisições, reabastecida continuamente ao longo de
+um minuto. Todos os buckets de uma requisição são verificados e debitados num único
+script Lua (atômico, uma ida ao Redis); se algum estiver vazio nada é debitado e a
+resposta é 429 com ``Retry-After``.
+"""
+from __future__ import annotations
+
+import ipaddress
+import logging
+import math
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from fastapi import Depends, HTTPException, Request, status
+
+from app.api.deps import get_current_user_detached
+from app.core.settings import settings
+from app.models import User
+
+if TYPE_CHECKING:
+    from redis.commands.core import AsyncScript
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_KEY = "rate-limit:{bucket}"
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+# KEYS: um bucket por chave. ARGV: capacidade e taxa (tokens/s) de cada bucket, em pares.
+# Retorna 0 se a requisição foi aceita ou quantos segundos faltam para haver 1 token.
+_TOKEN_BUCKET = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local levels = {}
+local retry_after = 0
+for i, key in ipairs(KEYS) do
+  local capacity = tonumber(ARGV[i * 2 - 1])
+  local rate = tonumber(ARGV[i * 2])
+  local bucket = redis.call('HMGET', key, 'tokens', 'ts')
+  local tokens = tonumber(bucket[1]) or capacity
+  local ts = tonumber(bucket[2]) or now
+  tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+  levels[i] = tokens
+  if tokens < 1 then
+    retry_after = math.max(retry_after, (1 - tokens) / rate)
+  end
+end
+for i, key in ipairs(KEYS) do
+  local capacity = tonumber(ARGV[i * 2 - 1])
+  local rate = tonumber(ARGV[i * 2])
+  local tokens = levels[i]
+  if retry_after == 0 then
+    tokens = tokens - 1
+  end
+  redis.call('HSET', key, 'tokens', tokens, 'ts', now)
+  redis.call('EXPIRE', key, math.ceil(capacity / rate) + 1)
+end
+return tostring(retry_after)
+"""
+
+
+@dataclass(frozen=True)
+class Rate:
+    capacity: int
+    period_seconds: float
+
+    @property
+    def per_second(self) -> float:
+        return self.capacity / self.period_seconds
+
+    @classmethod
+    def parse(cls, value: str) -> Rate:
+        """Aceita ``"10/minute"`` (second, minute, hour, day) ou ``"10/30"`` (segundos)."""
+        capacity, _, period = value.partition("/")
+        period = period.strip().lower()
+        seconds = _PERIODS.get(period.rstrip("s")) or float(period)
+        return cls(capacity=int(capacity), period_seconds=seconds)
+
+
+@lru_cache
+def _script() -> AsyncScript:
+    from redis import asyncio as aioredis
+
+    client = aioredis.from_url(settings.result_backend, socket_timeout=0.5, socket_connect_timeout=0.5)
+    return client.register_script(_TOKEN_BUCKET)
+
+
+@lru_cache
+def _trusted_networks() -> tuple[ipaddress.IPv4Network | ipaddress.IPv6Network, ...]:
+    return tuple(ipaddress.ip_network(network, strict=False) for network in settings.trusted_proxies)
+
+
+def _is_trusted_proxy(host: str) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in _trusted_networks())
+
+
+def client_ip(request: Request) -> str:
+    """IP do cliente; atrás de um proxy confiável (``TRUSTED_PROXIES``), o do ``X-Real-IP``.
+
+    Sem isso, atrás do nginx todos os clientes teriam o IP do container do proxy e
+    dividiriam um único bucket. O cabeçalho de qualquer outra origem é ignorado: um
+    cliente direto não escolhe o próprio bucket.
+    """
+    peer = request.client.host if request.client else "unknown"
+    forwarded = request.headers.get("X-Real-IP", "").strip()
+    if forwarded and _is_trusted_proxy(peer):
+        return forwarded
+    return peer
+
+
+async def enforce(buckets: list[tuple[str, Rate]]) -> None:
+    """Debita um token de cada bucket ``(chave, limite)`` ou levanta 429 sem debitar nenhum."""
+    if not settings.rate_limit_enabled or not buckets:
+        return
+
+    from redis import RedisError
+
+    args: list[float] = []
+    for _, rate in buckets:
+        args += [rate.capacity, rate.per_second]
+    try:
+        retry_after = float(
+            await _script()(keys=[RATE_LIMIT_KEY.format(bucket=key) for key, _ in buckets], args=args)
+        )
+    except RedisError:
+        # Sem Redis não há como limitar; melhor aceitar do que derrubar login e cotações
+        logger.warning("Rate limit indisponível; requisição liberada", exc_info=True)
+        return
+
+    if retry_after > 0:
+        seconds = math.ceil(retry_after)
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"Muitas requisições; tente novamente em {seconds}s",
+            headers={"Retry-After": str(seconds)},
+        )
+
+
+def rate_limit(
+    name: str, *, per_ip: str | None = None, per_user: str | None = None
+) -> Callable[..., Awaitable[None]]:
+    """Cria a dependência da rota ``name`` com buckets por IP e/ou por usuário autenticado."""
+    ip_rate = Rate.parse(per_ip) if per_ip else None
+    user_rate = Rate.parse(per_user) if per_user else None
+
+    def ip_bucket(request: Request) -> list[tuple[str, Rate]]:
+        return [(f"{name}:ip:{client_ip(request)}", ip_rate)] if ip_rate else []
+
+    if user_rate is None:
+
+        async def limit_by_ip(request: Request) -> None:
+            await enforce(ip_bucket(request))
+
+        return limit_by_ip
+
+    async def limit_by_user(request: Request, current_user: User = Depends(get_current_user_detached)) -> None:
+        await enforce(ip_bucket(request) + [(f"{name}:user:{current_user.id}", user_rate)])
+
+    return limit_by_user
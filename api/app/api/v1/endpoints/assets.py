@@ -3,20 +3,28 @@ from __future__ import annotations
 
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import insert, select, update
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_user, get_db
+from app.api.deps import get_current_reader, get_current_user, get_db, get_read_db
 from app.models import Asset, User
-from app.schema.asset import AssetCreate, AssetRead, AssetUpdate
+from app.schema.asset import (
+    AssetBatch,
+    AssetBatchResult,
+    AssetCreate,
+    AssetHoldings,
+    AssetRead,
+    AssetUpdate,
+)
+from app.services.portfolio_service import BatchNotFoundError, apply_asset_batch, get_asset_holdings
 
 router = APIRouter(prefix="/assets", tags=["assets"])
 
 
 @router.get("/", response_model=list[AssetRead])
 def list_assets(
-    db: Session = Depends(get_db), current_user: User = Depends(get_current_user)
+    db: Session = Depends(get_read_db), current_user: User = Depends(get_current_reader)
 ) -> list[Asset]:
     stmt = select(Asset).where(Asset.user_id == current_user.id).order_by(Asset.ticker)
     return db.execute(stmt).scalars().all()
@@ -26,13 +34,26 @@ def list_assets(
 def create_asset(
     asset_in: AssetCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)
 ) -> Asset:
-    asset = Asset(user_id=current_user.id, **asset_in.model_dump())
-    db.add(asset)
+    # RETURNING traz id, created_at/updated_at no mesmo statement (sem refresh)
+    stmt = insert(Asset).values(user_id=current_user.id, **asset_in.model_dump()).returning(Asset)
+    asset = db.execute(stmt).scalar_one()
     db.commit()
-    db.refresh(asset)
     return asset
 
 
+@router.post("/batch", response_model=AssetBatchResult)
+def batch_assets(
+    batch: AssetBatch, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)
+) -> AssetBatchResult:
+    """Cria, atualiza e remove vários ativos numa única transação (tudo ou nada)."""
+    try:
+        return apply_asset_batch(db, current_user.id, batch)
+    except BatchNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
 def _get_owned_asset(db: Session, asset_id: uuid.UUID, user_id: uuid.UUID) -> Asset:
     asset = db.get(Asset, asset_id)
     if not asset or asset.user_id != user_id:
@@ -42,11 +63,25 @@ def _get_owned_asset(db: Session, asset_id: uuid.UUID, user_id: uuid.UUID) -> As
 
 @router.get("/{asset_id}", response_model=AssetRead)
 def retrieve_asset(
-    asset_id: uuid.UUID, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)
+    asset_id: uuid.UUID, db: Session = Depends(get_read_db), current_user: User = Depends(get_current_reader)
 ) -> Asset:
     return _get_owned_asset(db, asset_id, current_user.id)
 
 
+@router.get("/{asset_id}/holdings", response_model=AssetHoldings)
+def asset_holdings(
+    asset_id: uuid.UUID,
+    limit: int = Query(default=10, ge=0, le=100),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_reader),
+) -> AssetHoldings:
+    """Página da posição: ativo, estatísticas e últimas transações numa única consulta."""
+    holdings = get_asset_holdings(db, current_user.id, asset_id, limit)
+    if holdings is None:
+        raise HTTPException(status_code=404, detail="Ativo não encontrado")
+    return holdings
+
+
 @router.patch("/{asset_id}", response_model=AssetRead)
 def update_asset(
     asset_id: uuid.UUID,
@@ -54,13 +89,22 @@ def update_asset(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> Asset:
-    asset = _get_owned_asset(db, asset_id, current_user.id)
     updates = asset_in.model_dump(exclude_unset=True)
-    for field, value in updates.items():
-        setattr(asset, field, value)
-    db.add(asset)
+    if not updates:
+        return _get_owned_asset(db, asset_id, current_user.id)
+
+    # A posse entra no WHERE: um único UPDATE ... RETURNING verifica, grava e devolve
+    # a linha já com o updated_at aplicado pelo trigger
+    stmt = (
+        update(Asset)
+        .where(Asset.id == asset_id, Asset.user_id == current_user.id)
+        .values(**updates)
+        .returning(Asset)
+    )
+    asset = db.execute(stmt).scalar_one_or_none()
+    if asset is None:
+        raise HTTPException(status_code=404, detail="Ativo não encontrado")
     db.commit()
-    db.refresh(asset)
     return asset
 
 
@@ -3,11 +3,12 @@ from __future__ import annotations
 
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_current_user, get_db
+from app.api.rate_limit import Rate, client_ip, enforce
 from app.core.security import (
     create_access_token,
     create_refresh_token,
@@ -16,6 +17,7 @@ from app.core.security import (
     get_password_hash,
     verify_password,
 )
+from app.core.settings import settings
 from app.models import User
 from app.schema.auth import (
     PasswordChangePayload,
@@ -40,7 +42,23 @@ def register_user(user_in: UserCreate, db: Session = Depends(get_db)) -> UserRea
     return user
 
 
-@router.post("/token", response_model=Token)
+_LOGIN_IP_RATE = Rate.parse(settings.rate_limit_auth_ip)
+_LOGIN_USER_RATE = Rate.parse(settings.rate_limit_auth_user)
+
+
+async def _login_rate_limit(request: Request, form_data: OAuth2PasswordRequestForm = Depends()) -> None:
+    # Antes do bcrypt: por IP contra abuso geral e por (IP, e-mail) contra força bruta.
+    # Um bucket só por e-mail deixaria qualquer um bloquear o login da vítima de fora
+    ip = client_ip(request)
+    await enforce(
+        [
+            (f"auth-token:ip:{ip}", _LOGIN_IP_RATE),
+            (f"auth-token:user:{ip}:{form_data.username.strip().lower()}", _LOGIN_USER_RATE),
+        ]
+    )
+
+
+@router.post("/token", response_model=Token, dependencies=[Depends(_login_rate_limit)])
 def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)
 ) -> Token:
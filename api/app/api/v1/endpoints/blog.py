@@ -5,7 +5,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db
+from app.api.deps import get_read_db
 from app.models import BlogPost
 from app.schema.blog import BlogPostDetail, BlogPostSummary
 
@@ -13,7 +13,7 @@ router = APIRouter(prefix="/blog", tags=["blog"])
 
 
 @router.get("/", response_model=list[BlogPostSummary])
-def list_blog_posts(db: Session = Depends(get_db)) -> list[BlogPost]:
+def list_blog_posts(db: Session = Depends(get_read_db)) -> list[BlogPost]:
     stmt = (
         select(BlogPost)
         .where(BlogPost.published.is_(True))
@@ -24,7 +24,7 @@ def list_blog_posts(db: Session = Depends(get_db)) -> list[BlogPost]:
 
 
 @router.get("/{slug}", response_model=BlogPostDetail)
-def get_blog_post(slug: str, db: Session = Depends(get_db)) -> BlogPost:
+def get_blog_post(slug: str, db: Session = Depends(get_read_db)) -> BlogPost:
     stmt = select(BlogPost).where(BlogPost.slug == slug, BlogPost.published.is_(True))
     blog = db.execute(stmt).scalar_one_or_none()
     if not blog:
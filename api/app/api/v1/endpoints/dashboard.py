@@ -1,18 +1,28 @@
 """Endpoints de métricas do dashboard."""
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_user, get_db
-from app.schema.dashboard import AllocationItem, AllocationResponse, PortfolioSummary
+from app.api.deps import get_current_reader, get_read_db
+from app.api.rate_limit import rate_limit
+from app.core.settings import settings
+from app.schema.dashboard import (
+    AllocationItem,
+    AllocationResponse,
+    PortfolioSummary,
+    RebalancePlan,
+    RebalanceRequest,
+)
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
 
 
 @router.get("/summary", response_model=PortfolioSummary)
-def portfolio_summary(db: Session = Depends(get_db), current_user=Depends(get_current_user)) -> PortfolioSummary:
+def portfolio_summary(
+    db: Session = Depends(get_read_db), current_user=Depends(get_current_reader)
+) -> PortfolioSummary:
     query = text(
         "SELECT total_assets, total_invested, total_transactions FROM portfolio_summary WHERE user_id = :user_id"
     )
@@ -24,7 +34,7 @@ def portfolio_summary(db: Session = Depends(get_db), current_user=Depends(get_cu
 
 @router.get("/allocation", response_model=AllocationResponse)
 def portfolio_allocation(
-    db: Session = Depends(get_db), current_user=Depends(get_current_user)
+    db: Session = Depends(get_read_db), current_user=Depends(get_current_reader)
 ) -> AllocationResponse:
     query = text(
         """
@@ -37,3 +47,23 @@ def portfolio_allocation(
     rows = db.execute(query, {"user_id": str(current_user.id)}).mappings().all()
     items = [AllocationItem(**row) for row in rows]
     return AllocationResponse(items=items)
+
+
+@router.post(
+    "/rebalance",
+    response_model=RebalancePlan,
+    dependencies=[Depends(rate_limit("rebalance", per_user=settings.rate_limit_quotes_user))],
+)
+async def simulate_rebalance(
+    payload: RebalanceRequest,
+    db: Session = Depends(get_read_db),
+    current_user=Depends(get_current_reader),
+) -> RebalancePlan:
+    """Simula as ordens que levam a carteira aos pesos alvo por tipo de ativo (nada é gravado)."""
+    # numpy só é carregado na primeira simulação
+    from app.services import rebalance_service
+
+    try:
+        return await rebalance_service.simulate_rebalance(db, current_user.id, payload)
+    except rebalance_service.RebalanceError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
@@ -1,19 +1,26 @@
 """Endpoints relacionados ao perfil do usuário."""
 from __future__ import annotations
 
-import uuid
-from pathlib import Path
-
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 
 from app.core.settings import settings
 from app.api.deps import get_current_user, get_db
 from app.models import Profile, User
 from app.schema.profile import ProfileRead, ProfileUpdate
+from app.services.media_service import (
+    UploadTooLargeError,
+    avatar_dir,
+    avatar_thumbnail_url,
+    avatar_url,
+    save_upload,
+)
 
 router = APIRouter(prefix="/profile", tags=["profile"])
 
+_AVATAR_EXTENSIONS = {"image/png": ".png", "image/jpeg": ".jpg", "image/webp": ".webp"}
+
 
 @router.get("/me", response_model=ProfileRead)
 def read_my_profile(current_user: User = Depends(get_current_user)) -> Profile:
@@ -26,14 +33,14 @@ def update_my_profile(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> Profile:
-    profile = current_user.profile
     updates = profile_in.model_dump(exclude_unset=True)
-    for field, value in updates.items():
-        setattr(profile, field, value)
+    if not updates:
+        return current_user.profile
 
-    db.add(profile)
+    # O profile compartilha o id do usuário; RETURNING evita o SELECT do lazy load e o refresh
+    stmt = update(Profile).where(Profile.id == current_user.id).values(**updates).returning(Profile)
+    profile = db.execute(stmt).scalar_one()
     db.commit()
-    db.refresh(profile)
     return profile
 
 
@@ -43,27 +50,28 @@ async def upload_avatar(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> dict[str, str]:
-    if file.content_type not in {"image/png", "image/jpeg", "image/webp"}:
+    extension = _AVATAR_EXTENSIONS.get(file.content_type or "")
+    if extension is None:
         raise HTTPException(status_code=400, detail="Formato de arquivo não suportado")
 
-    data = await file.read()
-    if len(data) > 2 * 1024 * 1024:
-        raise HTTPException(status_code=400, detail="Arquivo excede 2MB")
+    try:
+        filename = await save_upload(
+            file, avatar_dir(), extension=extension, max_bytes=settings.avatar_max_bytes
+        )
+    except UploadTooLargeError as exc:
+        raise HTTPException(
+            status_code=400, detail=f"Arquivo excede {settings.avatar_max_bytes // (1024 * 1024)}MB"
+        ) from exc
 
-    media_root = Path(settings.media_root) / "avatars"
-    media_root.mkdir(parents=True, exist_ok=True)
+    public_url = avatar_url(filename)
 
-    extension = Path(file.filename or "").suffix or ".jpg"
-    filename = f"{current_user.id}-{uuid.uuid4().hex}{extension}"
-    save_path = media_root / filename
-    save_path.write_bytes(data)
+    db.execute(update(Profile).where(Profile.id == current_user.id).values(avatar_url=public_url))
+    db.commit()
 
-    public_url = f"{settings.media_url}/avatars/{filename}"
+    # A miniatura substitui avatar_url (e o original é apagado) quando o worker terminar. Import tardio:
+    # o cliente Celery (e o Pillow da task) não entram no cold start da API.
+    from app.worker.tasks import generate_avatar_thumbnail_task
 
-    profile = current_user.profile
-    profile.avatar_url = public_url
-    db.add(profile)
-    db.commit()
-    db.refresh(profile)
+    generate_avatar_thumbnail_task.delay(str(current_user.id), filename)
 
-    return {"avatar_url": public_url}
+    return {"avatar_url": public_url, "thumbnail_url": avatar_thumbnail_url(filename)}
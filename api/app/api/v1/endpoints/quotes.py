@@ -1,46 +1,129 @@
 """Endpoints para consulta de cotações em lote."""
 from __future__ import annotations
 
-from celery.result import AsyncResult
-from fastapi import APIRouter, Depends, HTTPException, status
+from collections.abc import AsyncIterator
 
-from app.api.deps import get_current_user
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_current_reader, get_current_user_detached, get_read_db
+from app.api.rate_limit import rate_limit
+from app.core.settings import settings
 from app.schema.quote import (
+    CandleRange,
+    CandleSeries,
+    QuoteAssetType,
     QuoteInput,
     QuoteJobResponse,
     QuoteJobStatus,
     QuoteResult,
 )
-from app.services.quote_service import fetch_quotes
-from app.worker.celery_app import celery_app
-from app.worker.tasks import fetch_quotes_task
+
+# httpx, Celery e o cliente Redis são importados dentro dos handlers: o custo fica
+# na primeira chamada de cada rota, não no cold start de toda réplica da API.
 
 router = APIRouter(prefix="/quotes", tags=["quotes"])
 
 
-@router.post("/batch", response_model=list[QuoteResult])
+def _reject_unsupported(tickers: list[str]) -> None:
+    if tickers:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Tickers não suportados: {', '.join(tickers)}",
+        )
+
+
+@router.post(
+    "/batch",
+    response_model=list[QuoteResult],
+    dependencies=[
+        Depends(
+            rate_limit(
+                "quotes-batch",
+                per_ip=settings.rate_limit_quotes_ip,
+                per_user=settings.rate_limit_quotes_user,
+            )
+        )
+    ],
+)
 async def batch_quotes(
-    assets: list[QuoteInput], current_user=Depends(get_current_user)
+    assets: list[QuoteInput], current_user=Depends(get_current_user_detached)
 ) -> list[QuoteResult]:
     if not assets:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Lista de ativos vazia")
 
-    return await fetch_quotes(assets)
+    from app.services import symbol_directory
+    from app.services.quote_scheduler import Priority
+    from app.services.quote_service import fetch_quotes, unsupported_tickers
+
+    await symbol_directory.arefresh_if_stale()
+    _reject_unsupported(unsupported_tickers(assets))
+    return await fetch_quotes(assets, priority=Priority.INTERACTIVE)
+
+
+@router.get("/candles", response_model=CandleSeries)
+def quote_candles(
+    ticker: str = Query(..., min_length=1, max_length=32),
+    asset_type: QuoteAssetType = Query(..., alias="type"),
+    candle_range: CandleRange = Query(default=CandleRange.ONE_YEAR, alias="range"),
+    points: int = Query(default=300, ge=10, le=2000, description="Máximo de candles na resposta"),
+    db: Session = Depends(get_read_db),
+    current_user=Depends(get_current_reader),
+) -> CandleSeries:
+    """Série OHLC diária guardada localmente, reduzida por LTTB a ``points`` candles.
+
+    Se a série estiver ausente ou antiga, a atualização é enfileirada no worker e a
+    resposta traz ``refreshing=true`` com o que já estiver gravado.
+    """
+    from app.services import candle_service, symbol_directory
+    from app.services.quote_service import unsupported_tickers
+
+    symbol_directory.refresh_if_stale()
+    _reject_unsupported(unsupported_tickers([QuoteInput(ticker=ticker, type=asset_type)]))
+    return candle_service.get_series(db, asset_type, ticker, candle_range, points)
 
 
 @router.post("/jobs", response_model=QuoteJobResponse)
 def enqueue_quote_job(
-    assets: list[QuoteInput], current_user=Depends(get_current_user)
+    assets: list[QuoteInput], current_user=Depends(get_current_user_detached)
 ) -> QuoteJobResponse:
     if not assets:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Lista de ativos vazia")
 
-    task = fetch_quotes_task.delay([asset.model_dump() for asset in assets])
-    return QuoteJobResponse(task_id=task.id)
+    from app.services import symbol_directory
+    from app.services.job_service import submit_quote_job
+    from app.services.quote_service import unsupported_tickers
+
+    symbol_directory.refresh_if_stale()
+    _reject_unsupported(unsupported_tickers(assets))
+    return QuoteJobResponse(task_id=submit_quote_job(assets))
+
+
+def _job_status(task_id: str, meta: dict) -> QuoteJobStatus:
+    payload = meta.get("result") if meta["status"] == "SUCCESS" else None
+    return QuoteJobStatus(task_id=task_id, status=meta["status"], result=payload)
 
 
 @router.get("/jobs/{task_id}", response_model=QuoteJobStatus)
-def quote_job_status(task_id: str, current_user=Depends(get_current_user)) -> QuoteJobStatus:
-    result = AsyncResult(task_id, app=celery_app)
-    payload = result.result if result.successful() else None
-    return QuoteJobStatus(task_id=task_id, status=result.status, result=payload)
+async def quote_job_status(
+    task_id: str,
+    wait: float = Query(default=0, ge=0, le=settings.quote_job_max_wait_seconds),
+    current_user=Depends(get_current_user_detached),
+) -> QuoteJobStatus:
+    """Com ``wait`` > 0 funciona como long-poll: responde assim que o job terminar."""
+    from app.services.job_service import wait_for_job
+
+    return _job_status(task_id, await wait_for_job(task_id, wait))
+
+
+@router.get("/jobs/{task_id}/events")
+async def quote_job_events(task_id: str, current_user=Depends(get_current_user_detached)) -> StreamingResponse:
+    """Server-Sent Events: emite o estado final do job (ou o atual, se o prazo acabar)."""
+    from app.services.job_service import wait_for_job
+
+    async def stream() -> AsyncIterator[str]:
+        meta = await wait_for_job(task_id, settings.quote_job_max_wait_seconds)
+        yield f"event: status\ndata: {_job_status(task_id, meta).model_dump_json()}\n\n"
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
@@ -3,42 +3,45 @@ from __future__ import annotations
 
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import func, select
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_user, get_db
+from app.api.deps import get_current_user, get_db, get_read_db
 from app.models import Suggestion, SuggestionVote, User
 from app.schema.suggestion import SuggestionCreate, SuggestionRead
 
 router = APIRouter(prefix="/suggestions", tags=["suggestions"])
 
 
+def _to_read(suggestion: Suggestion) -> SuggestionRead:
+    return SuggestionRead(
+        id=suggestion.id,
+        user_id=suggestion.user_id,
+        title=suggestion.title,
+        description=suggestion.description,
+        kind=suggestion.kind,
+        created_at=suggestion.created_at,
+        votes=suggestion.vote_count or 0,
+    )
+
+
 @router.get("/", response_model=list[SuggestionRead])
-def list_suggestions(db: Session = Depends(get_db)) -> list[SuggestionRead]:
-    vote_count = func.count(SuggestionVote.user_id).label("votes")
+def list_suggestions(
+    limit: int = Query(default=50, ge=1, le=100),
+    offset: int = Query(default=0, ge=0),
+    db: Session = Depends(get_read_db),
+) -> list[SuggestionRead]:
+    # vote_count é mantido por trigger; a ordenação usa idx_suggestions_vote_count_created_at
     stmt = (
-        select(Suggestion, vote_count)
-        .select_from(Suggestion)
-        .outerjoin(SuggestionVote, SuggestionVote.suggestion_id == Suggestion.id)
-        .group_by(Suggestion.id)
-        .order_by(vote_count.desc(), Suggestion.created_at.desc())
+        select(Suggestion)
+        .order_by(Suggestion.vote_count.desc(), Suggestion.created_at.desc())
+        .limit(limit)
+        .offset(offset)
     )
-    rows = db.execute(stmt).all()
-
-    return [
-        SuggestionRead(
-            id=suggestion.id,
-            user_id=suggestion.user_id,
-            title=suggestion.title,
-            description=suggestion.description,
-            kind=suggestion.kind,
-            created_at=suggestion.created_at,
-            votes=int(votes or 0),
-        )
-        for suggestion, votes in rows
-    ]
+    return [_to_read(suggestion) for suggestion in db.execute(stmt).scalars()]
 
 
 @router.post("/", response_model=SuggestionRead, status_code=status.HTTP_201_CREATED)
@@ -48,25 +51,20 @@ def create_suggestion(
     current_user: User = Depends(get_current_user),
 ) -> SuggestionRead:
     kind_value = suggestion_in.kind.value if hasattr(suggestion_in.kind, "value") else suggestion_in.kind
-    suggestion = Suggestion(
-        user_id=current_user.id,
-        title=suggestion_in.title,
-        description=suggestion_in.description,
-        kind=kind_value,  # força persistir o valor do enum compatível com o tipo do banco
+    stmt = (
+        insert(Suggestion)
+        .values(
+            user_id=current_user.id,
+            title=suggestion_in.title,
+            description=suggestion_in.description,
+            kind=kind_value,  # força persistir o valor do enum compatível com o tipo do banco
+        )
+        .returning(Suggestion)
     )
-    db.add(suggestion)
+    suggestion = db.execute(stmt).scalar_one()
     db.commit()
-    db.refresh(suggestion)
 
-    return SuggestionRead(
-        id=suggestion.id,
-        user_id=suggestion.user_id,
-        title=suggestion.title,
-        description=suggestion.description,
-        kind=suggestion.kind,
-        created_at=suggestion.created_at,
-        votes=0,
-    )
+    return _to_read(suggestion)
 
 
 @router.post("/{suggestion_id}/vote", status_code=status.HTTP_204_NO_CONTENT)
@@ -75,28 +73,20 @@ def vote_suggestion(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> None:
-    suggestion = db.get(Suggestion, suggestion_id)
-    if not suggestion:
-        raise HTTPException(status_code=404, detail="Sugestão não encontrada")
-
-    already_voted = (
-        db.execute(
-            select(SuggestionVote).where(
-                SuggestionVote.suggestion_id == suggestion_id,
-                SuggestionVote.user_id == current_user.id,
-            )
-        )
-        .scalars()
-        .first()
-        is not None
+    # ON CONFLICT dispensa a checagem prévia; o trigger incrementa vote_count na mesma transação
+    stmt = (
+        insert(SuggestionVote)
+        .values(suggestion_id=suggestion_id, user_id=current_user.id)
+        .on_conflict_do_nothing(index_elements=["suggestion_id", "user_id"])
+        .returning(SuggestionVote.suggestion_id)
     )
-    if already_voted:
-        raise HTTPException(status_code=400, detail="Você já votou nesta sugestão.")
-
-    vote = SuggestionVote(suggestion_id=suggestion_id, user_id=current_user.id)
-    db.add(vote)
     try:
-        db.commit()
+        inserted = db.execute(stmt).first()
     except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=404, detail="Sugestão não encontrada") from None
+
+    if inserted is None:
         db.rollback()
         raise HTTPException(status_code=400, detail="Você já votou nesta sugestão.")
+    db.commit()
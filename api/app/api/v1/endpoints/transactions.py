@@ -4,12 +4,19 @@ from __future__ import annotations
 import uuid
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import select
+from sqlalchemy import insert, select, update
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_user, get_db
+from app.api.deps import get_current_reader, get_current_user, get_db, get_read_db
 from app.models import Asset, Transaction, User
-from app.schema.transaction import TransactionCreate, TransactionRead, TransactionUpdate
+from app.schema.transaction import (
+    TransactionBatch,
+    TransactionBatchResult,
+    TransactionCreate,
+    TransactionRead,
+    TransactionUpdate,
+)
+from app.services.portfolio_service import BatchNotFoundError, apply_transaction_batch
 
 router = APIRouter(prefix="/transactions", tags=["transactions"])
 
@@ -24,8 +31,8 @@ def _get_owned_transaction(db: Session, transaction_id: uuid.UUID, user_id: uuid
 @router.get("/", response_model=list[TransactionRead])
 def list_transactions(
     asset_id: uuid.UUID | None = Query(default=None),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_reader),
 ) -> list[Transaction]:
     stmt = select(Transaction).where(Transaction.user_id == current_user.id)
     if asset_id:
@@ -44,18 +51,36 @@ def create_transaction(
     if not asset or asset.user_id != current_user.id:
         raise HTTPException(status_code=404, detail="Ativo não encontrado para esta transação")
 
-    transaction = Transaction(user_id=current_user.id, **transaction_in.model_dump())
-    db.add(transaction)
+    stmt = (
+        insert(Transaction)
+        .values(user_id=current_user.id, **transaction_in.model_dump())
+        .returning(Transaction)
+    )
+    transaction = db.execute(stmt).scalar_one()
     db.commit()
-    db.refresh(transaction)
     return transaction
 
 
+@router.post("/batch", response_model=TransactionBatchResult)
+def batch_transactions(
+    batch: TransactionBatch,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> TransactionBatchResult:
+    """Cria, atualiza e remove várias transações numa única transação (tudo ou nada)."""
+    try:
+        return apply_transaction_batch(db, current_user.id, batch)
+    except BatchNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
 @router.get("/{transaction_id}", response_model=TransactionRead)
 def retrieve_transaction(
     transaction_id: uuid.UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_reader),
 ) -> Transaction:
     return _get_owned_transaction(db, transaction_id, current_user.id)
 
@@ -78,19 +103,23 @@ def update_transaction(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> Transaction:
-    transaction = _get_owned_transaction(db, transaction_id, current_user.id)
-
-    if transaction_in.asset_id and transaction_in.asset_id != transaction.asset_id:
+    updates = transaction_in.model_dump(exclude_unset=True, exclude={"asset_id"})
+    if transaction_in.asset_id:
         asset = db.get(Asset, transaction_in.asset_id)
         if not asset or asset.user_id != current_user.id:
             raise HTTPException(status_code=404, detail="Ativo não encontrado para esta transação")
-        transaction.asset_id = transaction_in.asset_id
-
-    updates = transaction_in.model_dump(exclude_unset=True, exclude={"asset_id"})
-    for field, value in updates.items():
-        setattr(transaction, field, value)
-
-    db.add(transaction)
+        updates["asset_id"] = transaction_in.asset_id
+    if not updates:
+        return _get_owned_transaction(db, transaction_id, current_user.id)
+
+    stmt = (
+        update(Transaction)
+        .where(Transaction.id == transaction_id, Transaction.user_id == current_user.id)
+        .values(**updates)
+        .returning(Transaction)
+    )
+    transaction = db.execute(stmt).scalar_one_or_none()
+    if transaction is None:
+        raise HTTPException(status_code=404, detail="Transação não encontrada")
     db.commit()
-    db.refresh(transaction)
     return transaction
@@ -0,0 +1,55 @@
+"""Limite de tamanho do corpo por rota, aplicado antes de o FastAPI ler o formulário.
+
+O FastAPI faz o parse do multipart (gravando os arquivos num spool) antes de chamar o
+handler e as dependências, então um limite verificado ali só age depois de o corpo
+inteiro ter sido recebido. Este middleware responde 413 já pelo ``Content-Length`` e,
+sem ele (chunked), interrompe a leitura assim que o limite é ultrapassado.
+"""
+from __future__ import annotations
+
+from collections.abc import Mapping
+
+from fastapi import HTTPException
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Folga para os cabeçalhos e delimitadores do multipart além do arquivo em si
+MULTIPART_OVERHEAD = 16 * 1024
+
+
+def _too_large(limit: int) -> str:
+    return f"Corpo da requisição excede {limit} bytes"
+
+
+class BodySizeLimitMiddleware:
+    """Recusa com 413 corpos maiores que ``limits[path]`` (caminhos exatos, demais rotas livres)."""
+
+    def __init__(self, app: ASGIApp, limits: Mapping[str, int]) -> None:
+        self.app = app
+        self.limits = dict(limits)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        limit = self.limits.get(scope["path"]) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > limit:
+            response = JSONResponse({"detail": _too_large(limit)}, status_code=413, headers={"Connection": "close"})
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Propaga pelo parse do formulário até o handler de HTTPException
+                    raise HTTPException(status_code=413, detail=_too_large(limit))
+            return message
+
+        await self.app(scope, limited_receive, send)
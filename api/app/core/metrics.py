@@ -0,0 +1,198 @@
+"""Métricas Prometheus da API, do banco, das cotações externas e do worker."""
+from __future__ import annotations
+
+import os
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+from prometheus_client.core import GaugeMetricFamily, REGISTRY
+from prometheus_client.registry import Collector
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Latência das requisições HTTP por rota",
+    ["method", "route", "status"],
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Requisições HTTP em andamento",
+    multiprocess_mode="livesum",
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Duração de cada statement SQL",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request",
+    "Quantidade de statements SQL por requisição HTTP",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55),
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "db_time_per_request_seconds",
+    "Tempo total gasto no banco por requisição HTTP",
+    ["route"],
+)
+QUOTE_UPSTREAM_DURATION = Histogram(
+    "quote_upstream_duration_seconds",
+    "Latência das chamadas aos provedores de cotação",
+    ["provider", "outcome"],
+)
+QUOTE_UPSTREAM_ERRORS = Counter(
+    "quote_upstream_errors_total",
+    "Falhas nas chamadas aos provedores de cotação",
+    ["provider"],
+)
+QUOTE_SCHEDULER_WAIT = Histogram(
+    "quote_scheduler_wait_seconds",
+    "Espera por vaga/orçamento do provedor antes de cada chamada de cotação",
+    ["provider", "priority"],
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+CELERY_TASK_DURATION = Histogram(
+    "celery_task_duration_seconds",
+    "Tempo de execução das tasks Celery",
+    ["task", "state"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+
+
+@dataclass
+class _QueryStats:
+    count: int = 0
+    duration: float = 0.0
+
+
+# Objeto mutável: o contexto copiado para o threadpool das rotas síncronas continua somando aqui
+_request_queries: ContextVar[_QueryStats | None] = ContextVar("request_queries", default=None)
+
+
+@contextmanager
+def track_upstream(provider: str) -> Iterator[None]:
+    """Mede uma chamada a provedor externo; exceções contam como erro e são relançadas."""
+    start = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield
+    except Exception:
+        outcome = "error"
+        QUOTE_UPSTREAM_ERRORS.labels(provider).inc()
+        raise
+    finally:
+        QUOTE_UPSTREAM_DURATION.labels(provider, outcome).observe(time.perf_counter() - start)
+
+
+def instrument_engine(engine: Engine, name: str = "primary") -> None:
+    """Registra eventos do SQLAlchemy para medir statements e expor o pool.
+
+    ``name`` vira o label ``engine`` das métricas do pool (ex.: ``primary``/``replica``).
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+        DB_QUERY_DURATION.observe(elapsed)
+        stats = _request_queries.get()
+        if stats is not None:
+            stats.count += 1
+            stats.duration += elapsed
+
+    if not _pool_collector.engines:
+        REGISTRY.register(_pool_collector)
+    _pool_collector.engines[name] = engine
+
+
+class _PoolCollector(Collector):
+    def __init__(self) -> None:
+        self.engines: dict[str, Engine] = {}
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        for metric, documentation, getter in (
+            ("db_pool_size", "Tamanho configurado do pool", "size"),
+            ("db_pool_checked_out", "Conexões em uso", "checkedout"),
+            ("db_pool_checked_in", "Conexões ociosas no pool", "checkedin"),
+            ("db_pool_overflow", "Conexões acima do tamanho do pool", "overflow"),
+        ):
+            family = GaugeMetricFamily(metric, documentation, labels=["engine"])
+            for name, engine in self.engines.items():
+                if hasattr(engine.pool, getter):
+                    family.add_metric([name], getattr(engine.pool, getter)())
+            yield family
+
+
+_pool_collector = _PoolCollector()
+
+
+class MetricsMiddleware:
+    """Middleware ASGI que mede latência, concorrência e uso do banco por rota."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        stats = _QueryStats()
+        token = _request_queries.set(stats)
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            _request_queries.reset(token)
+            # Usa o template da rota (ex.: /assets/{asset_id}) para não explodir a cardinalidade
+            route = getattr(scope.get("route"), "path", "unmatched")
+            HTTP_REQUEST_DURATION.labels(scope["method"], route, str(status_code)).observe(elapsed)
+            DB_QUERIES_PER_REQUEST.labels(route).observe(stats.count)
+            DB_TIME_PER_REQUEST.labels(route).observe(stats.duration)
+
+
+def _collection_registry() -> CollectorRegistry:
+    """Agrega os processos quando PROMETHEUS_MULTIPROC_DIR está definido (gunicorn/prefork)."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def render_latest() -> tuple[bytes, str]:
+    return generate_latest(_collection_registry()), CONTENT_TYPE_LATEST
+
+
+def start_metrics_server(port: int) -> None:
+    """Servidor HTTP avulso para processos sem FastAPI (worker Celery)."""
+    start_http_server(port, registry=_collection_registry())
@@ -0,0 +1,103 @@
+"""Modo de profiling de SQL: detecta queries lentas e repetições (N+1) por requisição."""
+from __future__ import annotations
+
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.settings import settings
+
+logger = logging.getLogger("app.query_profiler")
+
+REPORT_HEADER = "X-Query-Report"
+
+
+@dataclass
+class QueryRecord:
+    statement: str
+    duration: float
+
+
+@dataclass
+class QueryReport:
+    queries: list[QueryRecord] = field(default_factory=list)
+
+    @property
+    def total_time(self) -> float:
+        return sum(query.duration for query in self.queries)
+
+    def slow_queries(self, threshold_ms: float) -> list[QueryRecord]:
+        return [query for query in self.queries if query.duration * 1000 >= threshold_ms]
+
+    def repeated_statements(self, threshold: int) -> dict[str, int]:
+        """Statements idênticos (mesmo SQL parametrizado) executados ``threshold`` vezes ou mais."""
+        counts = Counter(query.statement for query in self.queries)
+        return {statement: count for statement, count in counts.items() if count >= threshold}
+
+    def summary(self) -> str:
+        slow = self.slow_queries(settings.slow_query_threshold_ms)
+        repeated = self.repeated_statements(settings.n_plus_one_threshold)
+        return (
+            f"count={len(self.queries)}; time={self.total_time * 1000:.1f}ms; "
+            f"slow={len(slow)}; repeated={len(repeated)}"
+        )
+
+
+_current_report: ContextVar[QueryReport | None] = ContextVar("query_report", default=None)
+
+
+def attach_query_profiler(engine: Engine) -> None:
+    """Registra eventos no engine que alimentam o relatório da requisição corrente."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault("profiler_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        elapsed = time.perf_counter() - conn.info["profiler_start_time"].pop()
+        report = _current_report.get()
+        if report is not None:
+            report.queries.append(QueryRecord(statement=statement, duration=elapsed))
+
+
+class QueryProfilerMiddleware:
+    """Coleta os statements de cada requisição, adiciona ``X-Query-Report`` e loga problemas."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        report = QueryReport()
+        token = _current_report.set(report)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append(REPORT_HEADER, report.summary())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_report.reset(token)
+            _log_report(scope, report)
+
+
+def _log_report(scope: Scope, report: QueryReport) -> None:
+    request_line = f"{scope['method']} {scope['path']}"
+    for query in report.slow_queries(settings.slow_query_threshold_ms):
+        logger.warning("Query lenta (%.1fms) em %s: %s", query.duration * 1000, request_line, query.statement)
+    for statement, count in report.repeated_statements(settings.n_plus_one_threshold).items():
+        logger.warning("Possível N+1 em %s: statement executado %dx: %s", request_line, count, statement)
+    logger.info("%s -> %s", request_line, report.summary())
@@ -0,0 +1,124 @@
+"""Tracing distribuído (OpenTelemetry) da API, do banco, das cotações e do worker."""
+from __future__ import annotations
+
+import os
+from typing import Any
+
+from opentelemetry import context, propagate, trace
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.settings import settings
+
+# Sem configure_tracing() o tracer é o no-op da API do OpenTelemetry
+tracer = trace.get_tracer("investorion")
+
+
+def configure_tracing(service_name: str) -> None:
+    """Instala o provider com exportador local (console ou arquivo JSON lines)."""
+    # O SDK só é importado quando o tracing está ligado; a API sozinha é leve
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import ConsoleSpanExporter, SimpleSpanProcessor
+
+    if settings.tracing_exporter == "file":
+        out = open(settings.tracing_file_path, "a", encoding="utf-8")  # fica aberto durante todo o processo
+        exporter = ConsoleSpanExporter(out=out, formatter=lambda span: span.to_json(indent=None) + os.linesep)
+    else:
+        exporter = ConsoleSpanExporter()
+
+    provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+    # Exportação síncrona: sem thread de background, seguro antes do fork do prefork
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+
+
+def trace_engine(engine: Engine) -> None:
+    """Cria um span filho por statement SQL executado."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context_, executemany) -> None:
+        span = tracer.start_span(
+            "db.query",
+            kind=SpanKind.CLIENT,
+            attributes={"db.system": "postgresql", "db.statement": statement},
+        )
+        conn.info.setdefault("trace_spans", []).append(span)
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context_, executemany) -> None:
+        conn.info["trace_spans"].pop().end()
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context) -> None:
+        spans = exception_context.connection.info.get("trace_spans") if exception_context.connection else None
+        if spans:
+            span = spans.pop()
+            span.record_exception(exception_context.original_exception)
+            span.set_status(Status(StatusCode.ERROR))
+            span.end()
+
+
+class TracingMiddleware:
+    """Abre um span SERVER por requisição, continuando um ``traceparent`` recebido."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        carrier = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]}
+        parent = propagate.extract(carrier)
+
+        with tracer.start_as_current_span(
+            f"HTTP {scope['method']}",
+            context=parent,
+            kind=SpanKind.SERVER,
+            attributes={"http.method": scope["method"], "http.target": scope["path"]},
+        ) as span:
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+                    if message["status"] >= 500:
+                        span.set_status(Status(StatusCode.ERROR))
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = getattr(scope.get("route"), "path", None)
+                if route:
+                    span.set_attribute("http.route", route)
+                    span.update_name(f"HTTP {scope['method']} {route}")
+
+
+def inject_headers(headers: dict[str, Any]) -> None:
+    """Propaga o contexto corrente nos headers de uma mensagem (ex.: task Celery)."""
+    propagate.inject(headers)
+
+
+def start_consumer_span(
+    name: str, carrier: dict[str, Any], attributes: dict[str, Any] | None = None
+) -> tuple[trace.Span, object]:
+    """Inicia um span CONSUMER ligado ao contexto propagado e o torna corrente.
+
+    Retorna o span e o token que deve ser passado a ``end_consumer_span``.
+    """
+    span = tracer.start_span(
+        name, context=propagate.extract(carrier), kind=SpanKind.CONSUMER, attributes=attributes
+    )
+    token = context.attach(trace.set_span_in_context(span))
+    return span, token
+
+
+def end_consumer_span(span: trace.Span, token: object, *, failed: bool = False) -> None:
+    if failed:
+        span.set_status(Status(StatusCode.ERROR))
+    span.end()
+    context.detach(token)
@@ -0,0 +1,80 @@
+"""Roteamento de leituras para a réplica com proteção read-your-writes.
+
+Cada commit de uma sessão do primário feito em nome de um usuário (``session.info``
+recebe ``user_id`` em ``get_current_user``) grava um marcador com TTL no Redis. Enquanto
+o marcador existir, os GETs desse usuário continuam no primário, então ele sempre vê
+as próprias escritas mesmo com a réplica atrasada; os demais usuários leem da réplica.
+"""
+from __future__ import annotations
+
+import logging
+import uuid
+from collections.abc import Generator
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.settings import settings
+from app.db.session import ReplicaSessionLocal, SessionLocal, get_session, replica_engine
+
+if TYPE_CHECKING:
+    import redis
+
+logger = logging.getLogger(__name__)
+
+RECENT_WRITE_KEY = "db-recent-write:{user_id}"
+
+
+@lru_cache
+def _redis() -> redis.Redis:
+    import redis
+
+    # Timeout curto: o marcador não pode segurar requisições se o Redis estiver lento
+    return redis.Redis.from_url(settings.result_backend, socket_timeout=0.5, socket_connect_timeout=0.5)
+
+
+def mark_recent_write(user_id: uuid.UUID) -> None:
+    from redis import RedisError
+
+    try:
+        _redis().set(
+            RECENT_WRITE_KEY.format(user_id=user_id), 1, ex=settings.replica_read_your_writes_seconds
+        )
+    except RedisError:
+        logger.warning("Não foi possível marcar a escrita recente do usuário %s", user_id, exc_info=True)
+
+
+def wrote_recently(user_id: uuid.UUID) -> bool:
+    from redis import RedisError
+
+    try:
+        return bool(_redis().exists(RECENT_WRITE_KEY.format(user_id=user_id)))
+    except RedisError:
+        # Sem como saber, lê do primário: consistência antes de escala
+        logger.warning("Marcador de escrita indisponível; lendo do primário", exc_info=True)
+        return True
+
+
+def _mark_after_commit(session: Session) -> None:
+    user_id = session.info.get("user_id")
+    if user_id is not None:
+        mark_recent_write(user_id)
+
+
+if replica_engine is not None:
+    event.listen(SessionLocal, "after_commit", _mark_after_commit)
+
+
+def get_read_session(user_id: uuid.UUID | None = None) -> Generator[Session, None, None]:
+    """Sessão para leituras: réplica, salvo sem réplica ou logo após escrita do usuário."""
+    if replica_engine is None or (user_id is not None and wrote_recently(user_id)):
+        yield from get_session()
+        return
+
+    session = ReplicaSessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
@@ -9,6 +9,24 @@ from app.core.settings import settings
 engine = create_engine(settings.database_url, pool_pre_ping=True, future=True)
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False, expire_on_commit=False)
 
+# Réplica de leitura opcional; sem DATABASE_REPLICA_URL as leituras usam o primário
+replica_engine = (
+    create_engine(settings.database_replica_url, pool_pre_ping=True, future=True)
+    if settings.database_replica_url
+    else None
+)
+ReplicaSessionLocal = (
+    sessionmaker(
+        bind=replica_engine,
+        autocommit=False,
+        autoflush=False,
+        expire_on_commit=False,
+        info={"replica": True},
+    )
+    if replica_engine is not None
+    else SessionLocal
+)
+
 Base = declarative_base()
 
 
@@ -1,15 +1,25 @@
 """Ponto de entrada principal do FastAPI."""
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from pathlib import Path
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 
+from app.api.media import ImmutableStaticFiles, accel_router
 from app.api.v1.router import api_router
+from app.core.body_limit import MULTIPART_OVERHEAD, BodySizeLimitMiddleware
+from app.core.metrics import MetricsMiddleware, instrument_engine, render_latest
+from app.core.query_profiler import QueryProfilerMiddleware, attach_query_profiler
 from app.core.settings import settings
-from app.db.session import SessionLocal
+from app.core.tracing import TracingMiddleware, configure_tracing, trace_engine
+from app.db.session import SessionLocal, engine, replica_engine
 from app.services.user_service import ensure_superuser
 
+logger = logging.getLogger(__name__)
+
 _DEV_CORS_ORIGINS = [
     "http://localhost:5173",
     "http://127.0.0.1:5173",
@@ -28,7 +38,48 @@ def _build_cors_origins() -> list[str]:
     return origins
 
 
-app = FastAPI(title=settings.project_name, debug=settings.debug)
+def _ensure_initial_superuser() -> None:
+    session = SessionLocal()
+    try:
+        ensure_superuser(
+            session,
+            email=settings.first_superuser_email,
+            password=settings.first_superuser_password,
+            full_name=settings.first_superuser_full_name,
+        )
+    finally:
+        session.close()
+
+
+def _log_bootstrap_failure(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Falha ao garantir o superusuário inicial", exc_info=task.exception())
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    Path(settings.media_root).mkdir(parents=True, exist_ok=True)
+
+    # O superusuário é garantido em segundo plano: a réplica passa a responder
+    # (/health) sem esperar o round trip ao banco nem o hash bcrypt da senha.
+    bootstrap: asyncio.Task | None = None
+    if settings.first_superuser_email and settings.first_superuser_password:
+        bootstrap = asyncio.create_task(asyncio.to_thread(_ensure_initial_superuser))
+        bootstrap.add_done_callback(_log_bootstrap_failure)
+
+    yield
+
+    if bootstrap is not None and not bootstrap.done():
+        await bootstrap
+
+
+app = FastAPI(title=settings.project_name, debug=settings.debug, lifespan=lifespan)
+
+# Adicionado antes do CORS para que o 413 também leve os cabeçalhos de CORS
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    limits={"/api/v1/profile/me/avatar": settings.avatar_max_bytes + MULTIPART_OVERHEAD},
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -39,28 +90,47 @@ app.add_middleware(
 )
 
 
+if settings.query_profiling_enabled:
+    attach_query_profiler(engine)
+    if replica_engine is not None:
+        attach_query_profiler(replica_engine)
+    app.add_middleware(QueryProfilerMiddleware)
+
+
+if settings.tracing_enabled:
+    configure_tracing("investorion-api")
+    trace_engine(engine)
+    if replica_engine is not None:
+        trace_engine(replica_engine)
+    app.add_middleware(TracingMiddleware)
+
+
 @app.get("/health", tags=["infra"])
 def healthcheck() -> dict[str, str]:
     return {"status": "ok"}
 
 
-app.include_router(api_router, prefix="/api")
+if settings.metrics_enabled:
+    instrument_engine(engine)
+    if replica_engine is not None:
+        instrument_engine(replica_engine, name="replica")
+    app.add_middleware(MetricsMiddleware)
 
-media_path = Path(settings.media_root)
-media_path.mkdir(parents=True, exist_ok=True)
-app.mount(settings.media_url, StaticFiles(directory=media_path), name="media")
+    @app.get("/metrics", tags=["infra"], include_in_schema=False)
+    def metrics() -> Response:
+        payload, content_type = render_latest()
+        return Response(content=payload, media_type=content_type)
 
 
-@app.on_event("startup")
-def ensure_initial_superuser() -> None:
-    if settings.first_superuser_email and settings.first_superuser_password:
-        session = SessionLocal()
-        try:
-            ensure_superuser(
-                session,
-                email=settings.first_superuser_email,
-                password=settings.first_superuser_password,
-                full_name=settings.first_superuser_full_name,
-            )
-        finally:
-            session.close()
+app.include_router(api_router, prefix="/api")
+
+if settings.media_accel_redirect_prefix:
+    app.include_router(accel_router)
+else:
+    # O diretório é criado no lifespan, por isso check_dir=False aqui
+    app.mount(
+        settings.media_url,
+        ImmutableStaticFiles(directory=settings.media_root, check_dir=False),
+        name="media",
+    )
+
@@ -2,8 +2,9 @@
 from app.models.asset import Asset
 from app.models.blog_post import BlogPost
 from app.models.profile import Profile
+from app.models.quote_candle import QuoteCandle
 from app.models.suggestion import Suggestion, SuggestionVote
 from app.models.transaction import Transaction
 from app.models.user import User
 
-__all__ = ["User", "Profile", "Asset", "Transaction", "BlogPost", "Suggestion", "SuggestionVote"]
+__all__ = ["User", "Profile", "Asset", "Transaction", "BlogPost", "Suggestion", "SuggestionVote", "QuoteCandle"]
@@ -4,7 +4,7 @@ from __future__ import annotations
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, Enum, ForeignKey, Numeric, String, func
+from sqlalchemy import Boolean, DateTime, Enum, ForeignKey, Index, Numeric, String, func, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -14,16 +14,27 @@ from app.models.enums import AssetType
 
 class Asset(Base):
     __tablename__ = "assets"
+    # Espelham a migração 20251210_0007 (índices alinhados às consultas)
+    __table_args__ = (
+        Index("idx_assets_user_ticker", "user_id", "ticker"),
+        Index(
+            "idx_assets_active_user_type",
+            "user_id",
+            "asset_type",
+            postgresql_include=["id", "quantity", "average_price"],
+            postgresql_where=text("is_active"),
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
     user_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
     ticker: Mapped[str] = mapped_column(String(16), nullable=False)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
-    asset_type: Mapped[AssetType] = mapped_column(Enum(AssetType), nullable=False, index=True)
+    asset_type: Mapped[AssetType] = mapped_column(Enum(AssetType), nullable=False)
     sector: Mapped[str | None] = mapped_column(String(255))
     quantity: Mapped[float] = mapped_column(Numeric(20, 8), nullable=False, default=0)
     average_price: Mapped[float] = mapped_column(Numeric(20, 8), nullable=False, default=0)
@@ -36,6 +47,8 @@ class Asset(Base):
     )
 
     user: Mapped["User"] = relationship(back_populates="assets")
+    # passive_deletes: ao remover o ativo o ON DELETE CASCADE do banco apaga as
+    # transações, sem carregar a coleção inteira só para deletá-la linha a linha
     transactions: Mapped[list["Transaction"]] = relationship(
-        back_populates="asset", cascade="all, delete-orphan"
+        back_populates="asset", cascade="all, delete-orphan", passive_deletes=True
     )
@@ -0,0 +1,23 @@
+"""Candles OHLC diários armazenados localmente para os gráficos."""
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, Numeric, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.session import Base
+
+
+class QuoteCandle(Base):
+    __tablename__ = "quote_candles"
+
+    # Mesmo valor de QuoteAssetType (STOCK, CRYPTO, FX)
+    asset_type: Mapped[str] = mapped_column(String(8), primary_key=True)
+    ticker: Mapped[str] = mapped_column(String(32), primary_key=True)
+    date: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    open: Mapped[float] = mapped_column(Numeric(20, 8), nullable=False)
+    high: Mapped[float] = mapped_column(Numeric(20, 8), nullable=False)
+    low: Mapped[float] = mapped_column(Numeric(20, 8), nullable=False)
+    close: Mapped[float] = mapped_column(Numeric(20, 8), nullable=False)
+    volume: Mapped[float | None] = mapped_column(Numeric(28, 4))
@@ -4,7 +4,7 @@ from __future__ import annotations
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, Enum, ForeignKey, Numeric, String, Text, func
+from sqlalchemy import DateTime, Enum, ForeignKey, Index, Numeric, String, Text, func, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -14,15 +14,27 @@ from app.models.enums import TransactionType
 
 class Transaction(Base):
     __tablename__ = "transactions"
+    # Com a migração 20251215_0008 em modo particionado a PK no banco vira (id, date);
+    # o ORM continua identificando a linha só pelo id (UUID único).
+    # Espelham a migração 20251210_0007 (índices alinhados às consultas)
+    __table_args__ = (
+        Index("idx_transactions_user_date", "user_id", text("date DESC")),
+        Index(
+            "idx_transactions_asset_type",
+            "asset_id",
+            "transaction_type",
+            postgresql_include=["id", "quantity", "unit_price"],
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
     asset_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("assets.id", ondelete="CASCADE"), nullable=False, index=True
+        UUID(as_uuid=True), ForeignKey("assets.id", ondelete="CASCADE"), nullable=False
     )
     user_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
     transaction_type: Mapped[TransactionType] = mapped_column(Enum(TransactionType), nullable=False)
     quantity: Mapped[float] = mapped_column(Numeric(20, 8), nullable=False)
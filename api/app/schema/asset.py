@@ -7,6 +7,7 @@ from uuid import UUID
 from pydantic import BaseModel
 
 from app.models.enums import AssetType
+from app.schema.transaction import TransactionRead
 
 
 class AssetBase(BaseModel):
@@ -38,3 +39,38 @@ class AssetRead(AssetBase):
     updated_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+class AssetHoldingStats(BaseModel):
+    transaction_count: int
+    bought_quantity: float
+    sold_quantity: float
+    total_bought: float
+    total_sold: float
+    total_fees: float
+    first_transaction_at: datetime | None = None
+    last_transaction_at: datetime | None = None
+
+
+class AssetHoldings(BaseModel):
+    asset: AssetRead
+    stats: AssetHoldingStats
+    recent_transactions: list[TransactionRead]
+
+
+class AssetBatchUpdate(AssetUpdate):
+    id: UUID
+
+
+class AssetBatch(BaseModel):
+    """Operações aplicadas numa única transação (tudo ou nada)."""
+
+    create: list[AssetCreate] = []
+    update: list[AssetBatchUpdate] = []
+    delete: list[UUID] = []
+
+
+class AssetBatchResult(BaseModel):
+    created: list[AssetRead]
+    updated: list[AssetRead]
+    deleted: list[UUID]
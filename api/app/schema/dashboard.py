@@ -2,10 +2,11 @@
 from __future__ import annotations
 
 from decimal import Decimal
+from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
-from app.models.enums import AssetType
+from app.models.enums import AssetType, TransactionType
 
 
 class PortfolioSummary(BaseModel):
@@ -23,3 +24,43 @@ class AllocationItem(BaseModel):
 
 class AllocationResponse(BaseModel):
     items: list[AllocationItem]
+
+
+class RebalanceRequest(BaseModel):
+    # Pesos relativos: são normalizados pela soma (1/0.5 ou 60/30 dão o mesmo alvo)
+    targets: dict[AssetType, float]
+    contribution: float = Field(default=0, ge=0, description="Aporte em dinheiro disponível para compras")
+    allow_sell: bool = True
+    lot_sizes: dict[str, float] = Field(
+        default_factory=dict, description="Lote mínimo por ticker; sobrepõe o padrão do tipo de ativo"
+    )
+
+
+class RebalanceOrder(BaseModel):
+    asset_id: UUID
+    ticker: str
+    asset_type: AssetType
+    side: TransactionType
+    quantity: float
+    price: float
+    value: float
+
+
+class RebalanceAllocation(BaseModel):
+    asset_type: AssetType
+    current_value: float
+    current_weight: float
+    target_weight: float
+    projected_value: float
+    projected_weight: float
+
+
+class RebalancePlan(BaseModel):
+    total_value: float
+    cash_remaining: float
+    orders: list[RebalanceOrder]
+    allocation: list[RebalanceAllocation]
+    # Sem cotação ao vivo: avaliados pelo preço médio de compra
+    unpriced: list[str]
+    # Tipos com peso alvo mas sem posição na carteira para receber compras
+    unreachable: list[AssetType]
@@ -1,6 +1,7 @@
 """Schemas para consulta de cotações."""
 from __future__ import annotations
 
+from datetime import datetime
 from enum import Enum
 
 from pydantic import BaseModel, Field
@@ -25,6 +26,34 @@ class QuoteResult(BaseModel):
     type: QuoteAssetType
 
 
+class CandleRange(str, Enum):
+    ONE_MONTH = "1mo"
+    THREE_MONTHS = "3mo"
+    SIX_MONTHS = "6mo"
+    ONE_YEAR = "1y"
+    TWO_YEARS = "2y"
+    FIVE_YEARS = "5y"
+
+
+class Candle(BaseModel):
+    date: datetime
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float | None = None
+
+
+class CandleSeries(BaseModel):
+    symbol: str
+    type: QuoteAssetType
+    range: CandleRange
+    source_points: int
+    candles: list[Candle]
+    # Candles ausentes ou desatualizados: uma atualização foi enfileirada no worker
+    refreshing: bool = False
+
+
 class QuoteJobResponse(BaseModel):
     task_id: str
 
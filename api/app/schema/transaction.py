@@ -39,3 +39,21 @@ class TransactionRead(TransactionBase):
     created_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+class TransactionBatchUpdate(TransactionUpdate):
+    id: UUID
+
+
+class TransactionBatch(BaseModel):
+    """Operações aplicadas numa única transação (tudo ou nada)."""
+
+    create: list[TransactionCreate] = []
+    update: list[TransactionBatchUpdate] = []
+    delete: list[UUID] = []
+
+
+class TransactionBatchResult(BaseModel):
+    created: list[TransactionRead]
+    updated: list[TransactionRead]
+    deleted: list[UUID]
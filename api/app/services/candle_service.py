@@ -0,0 +1,246 @@
+"""Séries OHLC armazenadas localmente, reduzidas no servidor para os gráficos."""
+from __future__ import annotations
+
+import logging
+from collections.abc import Sequence
+from contextlib import suppress
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import TYPE_CHECKING, Protocol
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.settings import settings
+from app.models import Asset, QuoteCandle
+from app.schema.quote import Candle, CandleRange, CandleSeries, QuoteAssetType
+from app.services.quote_service import QUOTED_ASSET_TYPES
+
+if TYPE_CHECKING:
+    import redis
+
+logger = logging.getLogger(__name__)
+
+CANDLE_REFRESH_KEY = "candles-refresh:{asset_type}:{ticker}"
+RANGE_DAYS = {
+    CandleRange.ONE_MONTH: 30,
+    CandleRange.THREE_MONTHS: 90,
+    CandleRange.SIX_MONTHS: 180,
+    CandleRange.ONE_YEAR: 365,
+    CandleRange.TWO_YEARS: 730,
+    CandleRange.FIVE_YEARS: 1825,
+}
+UPSERT_CHUNK = 1000
+
+
+class _OHLC(Protocol):
+    date: datetime
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float | None
+
+
+@lru_cache
+def _redis() -> redis.Redis:
+    import redis
+
+    # Timeout curto: a leitura do gráfico não pode esperar por um Redis lento
+    return redis.Redis.from_url(settings.result_backend, socket_timeout=0.5, socket_connect_timeout=0.5)
+
+
+def lttb_indices(xs: Sequence[float], ys: Sequence[float], threshold: int) -> list[int]:
+    """Largest-Triangle-Three-Buckets: índices dos ``threshold`` pontos que preservam a forma.
+
+    Mantém o primeiro e o último ponto; de cada bucket intermediário escolhe o ponto que
+    forma o maior triângulo com o ponto escolhido antes e a média do bucket seguinte.
+    """
+    size = len(xs)
+    if threshold >= size or threshold < 3:
+        return list(range(size))
+
+    every = (size - 2) / (threshold - 2)
+    selected = [0]
+    previous = 0
+    for bucket in range(threshold - 2):
+        start = int(bucket * every) + 1
+        end = int((bucket + 1) * every) + 1
+        next_end = min(int((bucket + 2) * every) + 1, size)
+        avg_x = sum(xs[end:next_end]) / (next_end - end)
+        avg_y = sum(ys[end:next_end]) / (next_end - end)
+
+        ax, ay = xs[previous], ys[previous]
+        best, best_area = start, -1.0
+        for index in range(start, end):
+            area = abs((ax - avg_x) * (ys[index] - ay) - (ax - xs[index]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = index, area
+        selected.append(best)
+        previous = best
+    selected.append(size - 1)
+    return selected
+
+
+def downsample(candles: Sequence[_OHLC], points: int) -> list[Candle]:
+    """Reduz a série a ``points`` candles escolhidos por LTTB sobre o fechamento.
+
+    Cada candle escolhido representa o trecho até a metade do caminho para os vizinhos:
+    abertura do início do trecho, máxima/mínima e volume do trecho inteiro, e data e
+    fechamento do próprio candle — pavios e picos não somem do gráfico.
+    """
+    indices = lttb_indices([candle.date.timestamp() for candle in candles], [float(c.close) for c in candles], points)
+    result: list[Candle] = []
+    for position, index in enumerate(indices):
+        low = 0 if position == 0 else (indices[position - 1] + index) // 2 + 1
+        high = len(candles) if position == len(indices) - 1 else (index + indices[position + 1]) // 2 + 1
+        segment = candles[low:high]
+        volumes = [candle.volume for candle in segment if candle.volume is not None]
+        result.append(
+            Candle(
+                date=candles[index].date,
+                open=segment[0].open,
+                high=max(candle.high for candle in segment),
+                low=min(candle.low for candle in segment),
+                close=candles[index].close,
+                volume=sum(volumes) if volumes else None,
+            )
+        )
+    return result
+
+
+def request_refresh(asset_type: QuoteAssetType, ticker: str) -> bool:
+    """Enfileira a atualização dos candles do ticker, no máximo uma por ``candle_refresh_seconds``.
+
+    A chave reservada com ``SET NX`` serve de trava contra enfileiramentos repetidos e de
+    marca de que a série está recente; a task a remove se a busca falhar.
+    """
+    from app.worker.tasks import refresh_candles_task
+
+    key = CANDLE_REFRESH_KEY.format(asset_type=asset_type.value, ticker=ticker)
+    client = _redis()
+    if not client.set(key, 1, nx=True, ex=settings.candle_refresh_seconds):
+        return False
+    try:
+        # Sem as retentativas de publicação: com o broker fora a leitura falha rápido
+        refresh_candles_task.apply_async(args=[asset_type.value, ticker], retry=False)
+    except Exception:
+        # Libera a trava para a próxima leitura tentar de novo (se o Redis ainda responder)
+        with suppress(Exception):
+            client.delete(key)
+        raise
+    return True
+
+
+def forget_refresh(asset_type: QuoteAssetType, ticker: str) -> None:
+    _redis().delete(CANDLE_REFRESH_KEY.format(asset_type=asset_type.value, ticker=ticker))
+
+
+def get_series(
+    db: Session, asset_type: QuoteAssetType, ticker: str, candle_range: CandleRange, points: int
+) -> CandleSeries:
+    """Candles do intervalo pedido (reduzidos a ``points``) e, se preciso, agenda a atualização.
+
+    Sem Redis ou broker a série armazenada é devolvida mesmo assim, com ``refreshing=False``.
+    """
+    from kombu.exceptions import OperationalError
+    from redis import RedisError
+
+    ticker = ticker.strip().upper()
+    since = datetime.now(tz=timezone.utc) - timedelta(days=RANGE_DAYS[candle_range])
+    rows = db.execute(
+        select(
+            QuoteCandle.date,
+            QuoteCandle.open,
+            QuoteCandle.high,
+            QuoteCandle.low,
+            QuoteCandle.close,
+            QuoteCandle.volume,
+        )
+        .where(
+            QuoteCandle.asset_type == asset_type.value,
+            QuoteCandle.ticker == ticker,
+            QuoteCandle.date >= since,
+        )
+        .order_by(QuoteCandle.date)
+    ).all()
+    try:
+        refreshing = request_refresh(asset_type, ticker) or not rows
+    except (RedisError, OperationalError):
+        logger.warning("Atualização dos candles de %s indisponível; servindo os armazenados", ticker, exc_info=True)
+        refreshing = False
+    return CandleSeries(
+        symbol=ticker,
+        type=asset_type,
+        range=candle_range,
+        source_points=len(rows),
+        candles=downsample(rows, points),
+        refreshing=refreshing,
+    )
+
+
+def daily_candles(candles: Sequence[Candle]) -> list[Candle]:
+    """Um candle por dia UTC, com a data à meia-noite.
+
+    Os provedores carimbam o candle mais recente com o horário da cotação ao vivo (e a
+    CoinGecko entrega barras intradiárias em intervalos curtos); sem truncar, cada
+    atualização gravaria mais um ponto do mesmo dia em vez de corrigir o existente.
+    Candles do mesmo dia são fundidos: abertura do primeiro, fechamento do último.
+    """
+    days: dict[datetime, Candle] = {}
+    for candle in sorted(candles, key=lambda item: item.date):
+        day = candle.date.astimezone(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        previous = days.get(day)
+        if previous is None:
+            days[day] = candle.model_copy(update={"date": day})
+            continue
+        volumes = [volume for volume in (previous.volume, candle.volume) if volume is not None]
+        days[day] = Candle(
+            date=day,
+            open=previous.open,
+            high=max(previous.high, candle.high),
+            low=min(previous.low, candle.low),
+            close=candle.close,
+            volume=sum(volumes) if volumes else None,
+        )
+    return list(days.values())
+
+
+def store_candles(db: Session, asset_type: QuoteAssetType, ticker: str, candles: list[Candle]) -> int:
+    """Grava (ou corrige) os candles diários do ticker com ``INSERT ... ON CONFLICT DO UPDATE``.
+
+    Também remove pontos intradiários gravados antes da truncagem por dia.
+    """
+    db.execute(
+        delete(QuoteCandle).where(
+            QuoteCandle.asset_type == asset_type.value,
+            QuoteCandle.ticker == ticker,
+            QuoteCandle.date != func.date_trunc("day", QuoteCandle.date, "UTC"),
+        )
+    )
+    rows = [
+        {"asset_type": asset_type.value, "ticker": ticker, **candle.model_dump()} for candle in daily_candles(candles)
+    ]
+    for start in range(0, len(rows), UPSERT_CHUNK):
+        stmt = insert(QuoteCandle).values(rows[start : start + UPSERT_CHUNK])
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[QuoteCandle.asset_type, QuoteCandle.ticker, QuoteCandle.date],
+                set_={column: stmt.excluded[column] for column in ("open", "high", "low", "close", "volume")},
+            )
+        )
+    db.commit()
+    return len(rows)
+
+
+def held_tickers(db: Session) -> list[tuple[QuoteAssetType, str]]:
+    """Tickers cotáveis presentes em alguma carteira ativa."""
+    stmt = (
+        select(Asset.asset_type, Asset.ticker)
+        .where(Asset.is_active, Asset.asset_type.in_(list(QUOTED_ASSET_TYPES)))
+        .distinct()
+    )
+    return sorted(
+        {(QUOTED_ASSET_TYPES[asset_type], ticker.strip().upper()) for asset_type, ticker in db.execute(stmt)}
+    )
@@ -0,0 +1,136 @@
+"""Submissão deduplicada de jobs Celery e acompanhamento via pub/sub do Redis."""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import uuid
+from functools import lru_cache
+from typing import Any
+
+import redis
+from celery import states
+from redis import asyncio as aioredis
+
+from app.core.settings import settings
+from app.schema.quote import QuoteInput
+from app.worker.celery_app import celery_app
+from app.worker.tasks import fetch_quotes_task
+
+QUOTE_JOB_KEY = "quote-job:{fingerprint}"
+
+
+@lru_cache
+def _redis() -> aioredis.Redis:
+    return aioredis.from_url(settings.result_backend)
+
+
+@lru_cache
+def _sync_redis() -> redis.Redis:
+    return redis.Redis.from_url(settings.result_backend)
+
+
+def quote_job_fingerprint(assets: list[QuoteInput]) -> str:
+    """Hash do conjunto de ativos, independente de ordem, duplicatas e caixa do ticker."""
+    normalized = sorted({(asset.type.value, asset.ticker.strip().upper()) for asset in assets})
+    return hashlib.sha256(json.dumps(normalized).encode()).hexdigest()
+
+
+def _dedupe_ttl() -> int:
+    # A reserva nunca sobrevive ao resultado: enquanto ela existe, a ausência do resultado
+    # significa job na fila, nunca resultado expirado
+    ttls = [ttl for ttl in (settings.quote_job_dedupe_seconds, settings.result_expires_seconds) if ttl > 0]
+    return min(ttls) if ttls else settings.quote_job_dedupe_seconds
+
+
+def _job_failed(client: redis.Redis, task_id: str) -> bool:
+    meta = _decode(client.get(celery_app.backend.get_key_for_task(task_id)))
+    return meta["status"] in {states.FAILURE, states.REVOKED}
+
+
+def _reserve_quote_job(client: redis.Redis, key: str, task_id: str) -> str:
+    """Reserva ``key`` para ``task_id`` ou devolve o job reservado, se ainda aproveitável.
+
+    Um job reservado que falhou é substituído com ``WATCH``/``MULTI``: se várias
+    requisições virem a mesma falha, só uma troca a reserva e as demais recebem o
+    ``task_id`` dela.
+    """
+    ttl = _dedupe_ttl()
+    while True:
+        if client.set(key, task_id, nx=True, ex=ttl):
+            return task_id
+        with client.pipeline() as pipe:
+            try:
+                pipe.watch(key)
+                existing = pipe.get(key)
+                # Chave expirada entre o SET e o GET: nova tentativa de SET NX
+                if existing is None:
+                    continue
+                existing = existing.decode()
+                if not _job_failed(client, existing):
+                    return existing
+                pipe.multi()
+                pipe.set(key, task_id, ex=ttl)
+                pipe.execute()
+                return task_id
+            except redis.WatchError:
+                continue
+
+
+def submit_quote_job(assets: list[QuoteInput]) -> str:
+    """Enfileira o job ou devolve o ``task_id`` de um idêntico em andamento/recém-concluído.
+
+    O ``task_id`` é reservado com ``SET NX`` antes do envio, então requisições
+    simultâneas com a mesma lista (ex.: várias abas) disputam uma única chave e só
+    uma delas publica a task. Um job reservado que falhou não é reaproveitado: a
+    nova requisição assume a reserva e enfileira de novo.
+    """
+    key = QUOTE_JOB_KEY.format(fingerprint=quote_job_fingerprint(assets))
+    task_id = str(uuid.uuid4())
+    client = _sync_redis()
+    reserved = _reserve_quote_job(client, key, task_id)
+    if reserved != task_id:
+        return reserved
+
+    try:
+        fetch_quotes_task.apply_async(args=[[asset.model_dump() for asset in assets]], task_id=task_id)
+    except Exception:
+        client.delete(key)
+        raise
+    return task_id
+
+
+def _decode(payload: bytes | None) -> dict[str, Any]:
+    if payload is None:
+        return {"status": states.PENDING, "result": None}
+    return celery_app.backend.decode_result(payload)
+
+
+async def wait_for_job(task_id: str, timeout: float) -> dict[str, Any]:
+    """Retorna o meta da task (``status``/``result``) assim que ela terminar.
+
+    O backend Redis do Celery publica cada mudança de estado no canal com o mesmo
+    nome da chave do resultado; assinamos o canal antes de ler a chave para não
+    perder uma conclusão que aconteça entre as duas operações. Com ``timeout=0`` é
+    apenas uma leitura. Se o prazo acabar, devolve o último estado conhecido.
+    """
+    key = celery_app.backend.get_key_for_task(task_id)
+    client = _redis()
+
+    if timeout <= 0:
+        return _decode(await client.get(key))
+
+    async with client.pubsub() as pubsub:
+        await pubsub.subscribe(key)
+        meta = _decode(await client.get(key))
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while meta["status"] not in states.READY_STATES:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=remaining)
+            if message is not None and message["type"] == "message":
+                meta = _decode(message["data"])
+        await pubsub.unsubscribe(key)
+    return meta
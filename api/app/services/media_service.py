@@ -0,0 +1,74 @@
+"""Serviço para persistir uploads de mídia (avatars etc.)."""
+from __future__ import annotations
+
+import hashlib
+import uuid
+from pathlib import Path
+
+import anyio
+from fastapi import UploadFile
+
+from app.core.settings import settings
+
+CHUNK_SIZE = 64 * 1024
+AVATAR_DIR = "avatars"
+THUMBNAIL_DIR = "thumbs"
+
+
+class UploadTooLargeError(ValueError):
+    """Upload ultrapassou o limite configurado."""
+
+
+def avatar_dir() -> Path:
+    return Path(settings.media_root) / AVATAR_DIR
+
+
+def avatar_thumbnail_dir() -> Path:
+    return avatar_dir() / THUMBNAIL_DIR
+
+
+def avatar_url(filename: str) -> str:
+    return f"{settings.media_url}/{AVATAR_DIR}/{filename}"
+
+
+def avatar_thumbnail_filename(filename: str) -> str:
+    return f"{Path(filename).stem}-{settings.avatar_thumbnail_size}.webp"
+
+
+def avatar_thumbnail_url(filename: str) -> str:
+    return f"{settings.media_url}/{AVATAR_DIR}/{THUMBNAIL_DIR}/{avatar_thumbnail_filename(filename)}"
+
+
+async def save_upload(file: UploadFile, directory: Path, *, extension: str, max_bytes: int) -> str:
+    """Grava o upload em blocos com nome derivado do SHA-256 do conteúdo.
+
+    O limite é verificado a cada bloco e o conteúdo vai para um arquivo ``.part``
+    que só é renomeado ao final. Se um arquivo com o mesmo hash já existir, o
+    upload é descartado e o arquivo existente reaproveitado. Retorna o nome final.
+    """
+    if file.size is not None and file.size > max_bytes:
+        raise UploadTooLargeError(f"Arquivo excede {max_bytes} bytes")
+
+    await anyio.Path(directory).mkdir(parents=True, exist_ok=True)
+    partial = anyio.Path(directory / f".{uuid.uuid4().hex}.part")
+    digest = hashlib.sha256()
+    written = 0
+    try:
+        async with await anyio.open_file(partial, "wb") as out:
+            while chunk := await file.read(CHUNK_SIZE):
+                written += len(chunk)
+                if written > max_bytes:
+                    raise UploadTooLargeError(f"Arquivo excede {max_bytes} bytes")
+                digest.update(chunk)
+                await out.write(chunk)
+
+        filename = f"{digest.hexdigest()}{extension}"
+        destination = anyio.Path(directory / filename)
+        if await destination.exists():
+            await partial.unlink()
+        else:
+            await partial.rename(destination)
+    except BaseException:
+        await partial.unlink(missing_ok=True)
+        raise
+    return filename
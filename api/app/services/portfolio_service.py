@@ -0,0 +1,181 @@
+"""Consultas agregadas e operações em lote sobre ativos e transações da carteira."""
+from __future__ import annotations
+
+import uuid
+from collections import Counter
+from collections.abc import Iterable
+from typing import TypeVar
+
+from sqlalchemy import delete, func, select, true
+from sqlalchemy.orm import Session, aliased
+
+from app.core.settings import settings
+from app.models import Asset, Transaction
+from app.models.enums import TransactionType
+from app.schema.asset import AssetBatch, AssetBatchResult, AssetHoldings, AssetHoldingStats, AssetRead
+from app.schema.transaction import TransactionBatch, TransactionBatchResult, TransactionRead
+
+ModelT = TypeVar("ModelT", Asset, Transaction)
+
+
+class BatchValidationError(ValueError):
+    """Lote vazio, grande demais ou com ids repetidos."""
+
+
+class BatchNotFoundError(ValueError):
+    """Ids inexistentes ou pertencentes a outro usuário."""
+
+
+def get_asset_holdings(
+    db: Session, user_id: uuid.UUID, asset_id: uuid.UUID, limit: int
+) -> AssetHoldings | None:
+    """Ativo, estatísticas das transações e as ``limit`` mais recentes numa única consulta.
+
+    Dois ``LATERAL``: um agrega todas as transações do ativo e o outro pega as últimas
+    por data (ambos servidos por índices em ``asset_id``). O resultado tem uma linha por
+    transação recente, ou uma só com colunas nulas se o ativo ainda não tiver nenhuma.
+    """
+    is_buy = Transaction.transaction_type == TransactionType.BUY
+    is_sell = Transaction.transaction_type == TransactionType.SELL
+    stats = (
+        select(
+            func.count(Transaction.id).label("transaction_count"),
+            func.coalesce(func.sum(Transaction.quantity).filter(is_buy), 0).label("bought_quantity"),
+            func.coalesce(func.sum(Transaction.quantity).filter(is_sell), 0).label("sold_quantity"),
+            func.coalesce(
+                func.sum(Transaction.quantity * Transaction.unit_price).filter(is_buy), 0
+            ).label("total_bought"),
+            func.coalesce(
+                func.sum(Transaction.quantity * Transaction.unit_price).filter(is_sell), 0
+            ).label("total_sold"),
+            func.coalesce(func.sum(Transaction.fees), 0).label("total_fees"),
+            func.min(Transaction.date).label("first_transaction_at"),
+            func.max(Transaction.date).label("last_transaction_at"),
+        )
+        .where(Transaction.asset_id == Asset.id)
+        .lateral("stats")
+    )
+    recent = (
+        select(Transaction)
+        .where(Transaction.asset_id == Asset.id)
+        .order_by(Transaction.date.desc())
+        .limit(limit)
+        .lateral("recent")
+    )
+    recent_transaction = aliased(Transaction, recent)
+
+    stmt = (
+        select(Asset, *stats.c, recent_transaction)
+        .select_from(Asset)
+        .join(stats, true())
+        .outerjoin(recent, true())
+        .where(Asset.id == asset_id, Asset.user_id == user_id)
+        .order_by(recent.c.date.desc())
+    )
+    rows = db.execute(stmt).all()
+    if not rows:
+        return None
+
+    first = rows[0]
+    return AssetHoldings(
+        asset=AssetRead.model_validate(first.Asset),
+        stats=AssetHoldingStats(**{name: getattr(first, name) for name in stats.c.keys()}),
+        recent_transactions=[TransactionRead.model_validate(row[-1]) for row in rows if row[-1] is not None],
+    )
+
+
+def _validate(operations: int, ids: list[uuid.UUID]) -> None:
+    if operations == 0:
+        raise BatchValidationError("Lote vazio")
+    if operations > settings.batch_max_operations:
+        raise BatchValidationError(f"Lote excede {settings.batch_max_operations} operações")
+    repeated = [str(item) for item, count in Counter(ids).items() if count > 1]
+    if repeated:
+        raise BatchValidationError(f"Ids repetidos no lote: {', '.join(repeated)}")
+
+
+def _owned(db: Session, model: type[ModelT], ids: Iterable[uuid.UUID], user_id: uuid.UUID) -> dict:
+    """Carrega, numa única consulta ``IN``, as linhas de ``ids`` que pertencem ao usuário."""
+    ids = list(ids)
+    if not ids:
+        return {}
+    stmt = select(model).where(model.id.in_(ids), model.user_id == user_id)
+    return {row.id: row for row in db.execute(stmt).scalars()}
+
+
+def _ensure_found(ids: Iterable[uuid.UUID], found: dict | set, label: str) -> None:
+    missing = [str(item) for item in ids if item not in found]
+    if missing:
+        raise BatchNotFoundError(f"{label} não encontrados: {', '.join(missing)}")
+
+
+def _reload(db: Session, model: type[ModelT], ids: list[uuid.UUID]) -> dict:
+    # Defaults do servidor e colunas alteradas por trigger voltam numa única leitura
+    if not ids:
+        return {}
+    stmt = select(model).where(model.id.in_(ids)).execution_options(populate_existing=True)
+    return {row.id: row for row in db.execute(stmt).scalars()}
+
+
+def apply_asset_batch(db: Session, user_id: uuid.UUID, batch: AssetBatch) -> AssetBatchResult:
+    update_ids = [item.id for item in batch.update]
+    _validate(len(batch.create) + len(update_ids) + len(batch.delete), update_ids + batch.delete)
+
+    owned = _owned(db, Asset, update_ids + batch.delete, user_id)
+    _ensure_found(update_ids + batch.delete, owned, "Ativos")
+
+    created = [Asset(user_id=user_id, **item.model_dump()) for item in batch.create]
+    db.add_all(created)
+    for item in batch.update:
+        asset = owned[item.id]
+        for field, value in item.model_dump(exclude_unset=True, exclude={"id"}).items():
+            setattr(asset, field, value)
+    if batch.delete:
+        # Remoção em massa: as transações caem pelo ON DELETE CASCADE do banco, sem
+        # carregar a coleção Asset.transactions de cada ativo
+        db.execute(delete(Asset).where(Asset.id.in_(batch.delete)))
+    db.commit()
+
+    rows = _reload(db, Asset, [asset.id for asset in created] + update_ids)
+    return AssetBatchResult(
+        created=[AssetRead.model_validate(rows[asset.id]) for asset in created],
+        updated=[AssetRead.model_validate(rows[asset_id]) for asset_id in update_ids],
+        deleted=batch.delete,
+    )
+
+
+def apply_transaction_batch(
+    db: Session, user_id: uuid.UUID, batch: TransactionBatch
+) -> TransactionBatchResult:
+    update_ids = [item.id for item in batch.update]
+    _validate(len(batch.create) + len(update_ids) + len(batch.delete), update_ids + batch.delete)
+
+    owned = _owned(db, Transaction, update_ids + batch.delete, user_id)
+    _ensure_found(update_ids + batch.delete, owned, "Transações")
+
+    asset_ids = {item.asset_id for item in batch.create}
+    asset_ids |= {item.asset_id for item in batch.update if item.asset_id}
+    owned_assets: set[uuid.UUID] = set()
+    if asset_ids:
+        stmt = select(Asset.id).where(Asset.id.in_(asset_ids), Asset.user_id == user_id)
+        owned_assets = set(db.execute(stmt).scalars())
+    _ensure_found(sorted(asset_ids), owned_assets, "Ativos das transações")
+
+    created = [Transaction(user_id=user_id, **item.model_dump()) for item in batch.create]
+    db.add_all(created)
+    for item in batch.update:
+        transaction = owned[item.id]
+        if item.asset_id:
+            transaction.asset_id = item.asset_id
+        for field, value in item.model_dump(exclude_unset=True, exclude={"id", "asset_id"}).items():
+            setattr(transaction, field, value)
+    if batch.delete:
+        db.execute(delete(Transaction).where(Transaction.id.in_(batch.delete)))
+    db.commit()
+
+    rows = _reload(db, Transaction, [transaction.id for transaction in created] + update_ids)
+    return TransactionBatchResult(
+        created=[TransactionRead.model_validate(rows[transaction.id]) for transaction in created],
+        updated=[TransactionRead.model_validate(rows[transaction_id]) for transaction_id in update_ids],
+        deleted=batch.delete,
+    )
@@ -0,0 +1,363 @@
+"""Provedores de cotação e o registro que associa cada tipo de ativo a um deles.
+
+Cada provedor declara os tipos de ativo que atende, quantos tickers cabem numa
+requisição (``batch_size``) e seus limites de concorrência/requisições por minuto,
+usados pelo scheduler. Novos provedores são registrados com ``@register_provider`` e
+habilitados pela lista ``QUOTE_PROVIDERS`` (ordem = preferência por tipo de ativo).
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import zlib
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterator
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, ClassVar
+
+from app.core.settings import settings
+from app.schema.quote import Candle, QuoteAssetType, QuoteResult
+from app.services import symbol_directory
+from app.services.quote_scheduler import ProviderLimits
+
+if TYPE_CHECKING:
+    import httpx
+
+
+class UnknownProviderError(ValueError):
+    """Nome em ``QUOTE_PROVIDERS`` sem provedor registrado."""
+
+
+class QuoteProvider(ABC):
+    """Fonte de cotações para um ou mais tipos de ativo."""
+
+    name: ClassVar[str]
+    asset_types: ClassVar[frozenset[QuoteAssetType]]
+    batch_size: int = 1
+    limits: ProviderLimits
+    # Histórico diário máximo que o provedor entrega (0: sem candles)
+    max_candle_days: ClassVar[int] = 0
+
+    def resolve(self, ticker: str, asset_type: QuoteAssetType) -> str | None:
+        """Identificador do ticker no provedor, ou ``None`` se não for suportado."""
+        return ticker.strip().upper()
+
+    @abstractmethod
+    async def fetch(
+        self, client: httpx.AsyncClient, asset_type: QuoteAssetType, symbols: dict[str, str]
+    ) -> dict[str, QuoteResult]:
+        """Cotações de até ``batch_size`` tickers (``ticker -> id resolvido``), indexadas por ticker.
+
+        Tickers sem cotação ficam de fora; erros de rede/HTTP são propagados.
+        """
+
+    async def fetch_candles(
+        self, client: httpx.AsyncClient, asset_type: QuoteAssetType, symbol: str, days: int
+    ) -> list[Candle]:
+        """Candles diários dos últimos ``days`` dias, em ordem cronológica (vazio sem histórico)."""
+        return []
+
+
+def _smallest_at_least(days: int, options: list[tuple[int, str]], fallback: str) -> str:
+    return next((label for limit, label in options if limit >= days), fallback)
+
+
+def _from_epoch(seconds: float) -> datetime:
+    return datetime.fromtimestamp(seconds, tz=timezone.utc)
+
+
+def parse_brapi_payload(data: dict[str, Any] | None, ticker: str) -> QuoteResult | None:
+    results = (data or {}).get("results") or []
+    result = next((item for item in results if item.get("symbol", "").upper() == ticker.upper()), None)
+    if result is None and len(results) == 1:
+        result = results[0]
+    if not result:
+        return None
+    return QuoteResult(
+        symbol=result.get("symbol", ticker).upper(),
+        name=result.get("shortName") or result.get("longName"),
+        price=float(result.get("regularMarketPrice")),
+        change_percent=float(result.get("regularMarketChangePercent", 0)),
+        type=QuoteAssetType.STOCK,
+    )
+
+
+def parse_coingecko_payload(data: dict[str, Any], ticker: str, crypto_id: str) -> QuoteResult | None:
+    price = (data.get(crypto_id) or {}).get("brl")
+    if price is None:
+        return None
+    return QuoteResult(
+        symbol=ticker.upper(),
+        name=crypto_id.capitalize(),
+        price=float(price),
+        change_percent=None,
+        type=QuoteAssetType.CRYPTO,
+    )
+
+
+def parse_awesomeapi_payload(data: dict[str, Any], pair: str) -> QuoteResult | None:
+    result: dict[str, Any] | None = data.get(pair.replace("-", ""))
+    if not result:
+        return None
+    return QuoteResult(
+        symbol=pair.replace("-", "/"),
+        name=result.get("name"),
+        price=float(result.get("bid")),
+        change_percent=float(result.get("pctChange", 0)),
+        type=QuoteAssetType.FX,
+    )
+
+
+def _collect(symbols: dict[str, str], parse: Callable[[str, str], QuoteResult | None]) -> dict[str, QuoteResult]:
+    results: dict[str, QuoteResult] = {}
+    for ticker, symbol in symbols.items():
+        quote = parse(ticker, symbol)
+        if quote is not None:
+            results[ticker] = quote
+    return results
+
+
+_PROVIDERS: dict[str, type[QuoteProvider]] = {}
+
+
+def register_provider(cls: type[QuoteProvider]) -> type[QuoteProvider]:
+    """Torna o provedor disponível para ``QUOTE_PROVIDERS`` pelo seu ``name``."""
+    _PROVIDERS[cls.name] = cls
+    return cls
+
+
+@register_provider
+class BrapiProvider(QuoteProvider):
+    name = "brapi"
+    asset_types = frozenset({QuoteAssetType.STOCK})
+    max_candle_days = 5 * 365
+    HISTORY_RANGES = [(30, "1mo"), (90, "3mo"), (180, "6mo"), (365, "1y"), (730, "2y"), (1825, "5y")]
+
+    def __init__(self) -> None:
+        self.url = settings.brapi_url
+        self.history_url = settings.brapi_history_url
+        # O plano gratuito da brapi aceita um ticker por requisição
+        self.batch_size = settings.brapi_batch_size
+        self.limits = ProviderLimits(
+            concurrency=settings.brapi_max_concurrency,
+            requests_per_minute=settings.brapi_requests_per_minute,
+            background_share=settings.quote_background_budget_share,
+        )
+
+    def resolve(self, ticker: str, asset_type: QuoteAssetType) -> str | None:
+        return symbol_directory.current().resolve(asset_type, ticker)
+
+    async def fetch(
+        self, client: httpx.AsyncClient, asset_type: QuoteAssetType, symbols: dict[str, str]
+    ) -> dict[str, QuoteResult]:
+        resp = await client.get(self.url.format(ticker=",".join(symbols.values())))
+        resp.raise_for_status()
+        data = resp.json()
+        return _collect(symbols, lambda ticker, symbol: parse_brapi_payload(data, symbol))
+
+    async def fetch_candles(
+        self, client: httpx.AsyncClient, asset_type: QuoteAssetType, symbol: str, days: int
+    ) -> list[Candle]:
+        history_range = _smallest_at_least(days, self.HISTORY_RANGES, "max")
+        resp = await client.get(self.history_url.format(ticker=symbol, range=history_range))
+        resp.raise_for_status()
+        results = resp.json().get("results") or [{}]
+        return [
+            Candle(
+                date=_from_epoch(item["date"]),
+                open=item["open"],
+                high=item["high"],
+                low=item["low"],
+                close=item["close"],
+                volume=item.get("volume"),
+            )
+            for item in results[0].get("historicalDataPrice") or []
+            if item.get("close") is not None
+        ]
+
+
+@register_provider
+class CoinGeckoProvider(QuoteProvider):
+    name = "coingecko"
+    asset_types = frozenset({QuoteAssetType.CRYPTO})
+    batch_size = 50
+    # A API pública limita o histórico a 365 dias; acima de 30 dias cada candle cobre 4 dias
+    max_candle_days = 365
+    OHLC_DAYS = [(1, "1"), (7, "7"), (14, "14"), (30, "30"), (90, "90"), (180, "180"), (365, "365")]
+
+    def __init__(self) -> None:
+        self.url = settings.coingecko_url
+        self.ohlc_url = settings.coingecko_ohlc_url
+        self.limits = ProviderLimits(
+            concurrency=settings.coingecko_max_concurrency,
+            requests_per_minute=settings.coingecko_requests_per_minute,
+            background_share=settings.quote_background_budget_share,
+        )
+
+    def resolve(self, ticker: str, asset_type: QuoteAssetType) -> str | None:
+        # A CoinGecko só aceita ids próprios ("bitcoin"), então o ticker precisa estar no diretório
+        return symbol_directory.current().resolve(asset_type, ticker, required=True)
+
+    async def fetch(
+        self, client: httpx.AsyncClient, asset_type: QuoteAssetType, symbols: dict[str, str]
+    ) -> dict[str, QuoteResult]:
+        params = {"ids": ",".join(symbols.values()), "vs_currencies": "brl"}
+        resp = await client.get(self.url, params=params)
+        resp.raise_for_status()
+        data = resp.json()
+        return _collect(symbols, lambda ticker, crypto_id: parse_coingecko_payload(data, ticker, crypto_id))
+
+    async def fetch_candles(
+        self, client: httpx.AsyncClient, asset_type: QuoteAssetType, symbol: str, days: int
+    ) -> list[Candle]:
+        params = {"vs_currency": "brl", "days": _smallest_at_least(days, self.OHLC_DAYS, "365")}
+        resp = await client.get(self.ohlc_url.format(id=symbol), params=params)
+        resp.raise_for_status()
+        return [
+            Candle(date=_from_epoch(ms / 1000), open=open_, high=high, low=low, close=close)
+            for ms, open_, high, low, close in resp.json()
+        ]
+
+
+@register_provider
+class AwesomeApiProvider(QuoteProvider):
+    name = "awesomeapi"
+    asset_types = frozenset({QuoteAssetType.FX})
+    batch_size = 10
+    max_candle_days = 360
+
+    def __init__(self) -> None:
+        self.url = settings.awesomeapi_url
+        self.daily_url = settings.awesomeapi_daily_url
+        self.limits = ProviderLimits(
+            concurrency=settings.awesomeapi_max_concurrency,
+            requests_per_minute=settings.awesomeapi_requests_per_minute,
+            background_share=settings.quote_background_budget_share,
+        )
+
+    def resolve(self, ticker: str, asset_type: QuoteAssetType) -> str | None:
+        return symbol_directory.current().resolve(asset_type, ticker)
+
+    async def fetch(
+        self, client: httpx.AsyncClient, asset_type: QuoteAssetType, symbols: dict[str, str]
+    ) -> dict[str, QuoteResult]:
+        resp = await client.get(self.url.format(pair=",".join(symbols.values())))
+        resp.raise_for_status()
+        data = resp.json()
+        return _collect(symbols, lambda ticker, pair: parse_awesomeapi_payload(data, pair))
+
+    async def fetch_candles(
+        self, client: httpx.AsyncClient, asset_type: QuoteAssetType, symbol: str, days: int
+    ) -> list[Candle]:
+        resp = await client.get(self.daily_url.format(pair=symbol, days=days))
+        resp.raise_for_status()
+        candles: list[Candle] = []
+        # Vem do mais recente para o mais antigo e sem abertura: usa o fechamento anterior
+        for item in sorted(resp.json(), key=lambda entry: int(entry["timestamp"])):
+            close = float(item["bid"])
+            candles.append(
+                Candle(
+                    date=_from_epoch(int(item["timestamp"])),
+                    open=candles[-1].close if candles else close,
+                    high=float(item["high"]),
+                    low=float(item["low"]),
+                    close=close,
+                )
+            )
+        return candles
+
+
+@register_provider
+class StubProvider(QuoteProvider):
+    """Cotações determinísticas geradas localmente, para testes e carga sem rede.
+
+    O preço depende só de tipo + ticker, então execuções diferentes são comparáveis.
+    Com ``QUOTE_STUB_LATENCY_MS`` cada lote simula a latência de um provedor real.
+    """
+
+    name = "stub"
+    asset_types = frozenset(QuoteAssetType)
+    batch_size = 100
+    max_candle_days = 5 * 365
+
+    def __init__(self) -> None:
+        self.latency = settings.quote_stub_latency_ms / 1000
+        self.limits = ProviderLimits(concurrency=100)
+
+    @staticmethod
+    def quote(ticker: str, asset_type: QuoteAssetType) -> QuoteResult:
+        seed = zlib.crc32(f"{asset_type.value}:{ticker}".encode())
+        return QuoteResult(
+            symbol=ticker.replace("-", "/") if asset_type == QuoteAssetType.FX else ticker,
+            name=f"{ticker} (stub)",
+            price=round(5 + (seed % 100_000) / 100, 2),
+            change_percent=round((seed % 2001 - 1000) / 100, 2),
+            type=asset_type,
+        )
+
+    async def fetch(
+        self, client: httpx.AsyncClient, asset_type: QuoteAssetType, symbols: dict[str, str]
+    ) -> dict[str, QuoteResult]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return {ticker: self.quote(symbol, asset_type) for ticker, symbol in symbols.items()}
+
+    async def fetch_candles(
+        self, client: httpx.AsyncClient, asset_type: QuoteAssetType, symbol: str, days: int
+    ) -> list[Candle]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        # Passeio aleatório com semente fixa por ativo, terminando no preço de quote()
+        rng = random.Random(zlib.crc32(f"{asset_type.value}:{symbol}:candles".encode()))
+        today = datetime.now(tz=timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        close = self.quote(symbol, asset_type).price
+        candles: list[Candle] = []
+        for offset in range(days):
+            open_ = close / (1 + rng.gauss(0, 0.02))
+            spread = abs(rng.gauss(0, 0.01))
+            candles.append(
+                Candle(
+                    date=today - timedelta(days=offset),
+                    open=round(open_, 4),
+                    high=round(max(open_, close) * (1 + spread), 4),
+                    low=round(min(open_, close) * (1 - spread), 4),
+                    close=round(close, 4),
+                    volume=float(rng.randrange(1_000, 1_000_000)),
+                )
+            )
+            close = open_
+        candles.reverse()
+        return candles
+
+
+class ProviderRegistry:
+    """Provedores habilitados, na ordem de preferência."""
+
+    def __init__(self, providers: list[QuoteProvider]) -> None:
+        self._providers = {provider.name: provider for provider in providers}
+        self._by_type: dict[QuoteAssetType, QuoteProvider] = {}
+        for provider in providers:
+            for asset_type in provider.asset_types:
+                self._by_type.setdefault(asset_type, provider)
+
+    @classmethod
+    def from_names(cls, names: list[str]) -> ProviderRegistry:
+        unknown = [name for name in names if name not in _PROVIDERS]
+        if unknown:
+            raise UnknownProviderError(f"Provedores de cotação desconhecidos: {', '.join(unknown)}")
+        return cls([_PROVIDERS[name]() for name in names])
+
+    def __iter__(self) -> Iterator[QuoteProvider]:
+        return iter(self._providers.values())
+
+    def for_type(self, asset_type: QuoteAssetType) -> QuoteProvider | None:
+        return self._by_type.get(asset_type)
+
+    def limits(self) -> dict[str, ProviderLimits]:
+        return {provider.name: provider.limits for provider in self}
+
+
+@lru_cache
+def get_registry() -> ProviderRegistry:
+    return ProviderRegistry.from_names(settings.quote_providers)
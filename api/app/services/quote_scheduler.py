@@ -0,0 +1,260 @@
+"""Agendamento das chamadas aos provedores de cotação por cota e prioridade.
+
+Cada provedor tem um limite de requisições simultâneas (por event loop) e um orçamento
+de requisições por minuto. O orçamento é um token bucket no Redis compartilhado por
+todos os processos (workers do uvicorn, worker de cotações, prefork), de modo que o
+limite configurado é o que o provedor recebe de fato; com ``QUOTE_BUDGET_SHARED=false``
+ou sem Redis cada processo usa um bucket local. Quem espera por vaga fica numa fila de
+prioridade: ``INTERACTIVE`` (``/quotes/batch``) passa sempre à frente de
+``BACKGROUND`` (jobs e pré-aquecimento), e o background não consome a fração do
+orçamento reservada ao interativo. Um 429 do provedor pausa o provedor inteiro (em todos
+os processos) pelo ``Retry-After`` em vez de deixar as demais requisições baterem no
+mesmo limite.
+"""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections.abc import AsyncIterator, Mapping
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, replace
+from enum import IntEnum
+from typing import TYPE_CHECKING
+
+from app.core.metrics import QUOTE_SCHEDULER_WAIT
+
+if TYPE_CHECKING:
+    from redis.asyncio import Redis
+
+logger = logging.getLogger(__name__)
+
+BUDGET_KEY = "quote-budget:{provider}"
+PAUSE_KEY = "quote-budget:{provider}:paused-until"
+
+# KEYS: bucket e pausa do provedor. ARGV: capacidade, taxa (tokens/s) e tokens reservados
+# (que esta prioridade não pode consumir). Retorna 0 se levou o token ou os segundos até
+# poder tentar de novo.
+_TAKE_TOKEN = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local paused_until = tonumber(redis.call('GET', KEYS[2]) or '0')
+if paused_until > now then
+  return tostring(paused_until - now)
+end
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local reserved = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens < reserved + 1 then
+  wait = (reserved + 1 - tokens) / rate
+else
+  tokens = tokens - 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(wait)
+"""
+
+# KEYS: pausa do provedor. ARGV: segundos. Só estende a pausa, nunca encurta.
+_PAUSE = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local until_ts = now + tonumber(ARGV[1])
+if until_ts > tonumber(redis.call('GET', KEYS[1]) or '0') then
+  redis.call('SET', KEYS[1], tostring(until_ts), 'EX', math.ceil(tonumber(ARGV[1])) + 1)
+end
+return 1
+"""
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+class SchedulerTimeout(Exception):
+    """A vaga no provedor não foi liberada dentro do prazo da requisição."""
+
+
+@dataclass(frozen=True)
+class ProviderLimits:
+    concurrency: int
+    requests_per_minute: int | None = None
+    # Fração do orçamento por minuto que o background pode usar; o resto fica para o interativo
+    background_share: float = 1.0
+
+
+def _reserved_tokens(limits: ProviderLimits, priority: Priority) -> float:
+    if priority == Priority.INTERACTIVE or not limits.requests_per_minute:
+        return 0.0
+    return limits.requests_per_minute * (1 - limits.background_share)
+
+
+class SharedBudget:
+    """Orçamento por minuto dos provedores num token bucket do Redis, comum a todos os processos.
+
+    O cliente assíncrono pertence ao event loop que o criou; por isso há um por scheduler.
+    Se o Redis falhar a chamada segue sem orçamento (como o rate limiting da API): o 429
+    do provedor, com a pausa, continua protegendo.
+    """
+
+    def __init__(self, client: Redis) -> None:
+        self._take = client.register_script(_TAKE_TOKEN)
+        self._pause = client.register_script(_PAUSE)
+
+    @classmethod
+    def from_url(cls, url: str) -> SharedBudget:
+        from redis import asyncio as aioredis
+
+        return cls(aioredis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5))
+
+    async def take(self, provider: str, limits: ProviderLimits, priority: Priority) -> None:
+        """Espera até levar um token do provedor (respeitando a reserva do interativo)."""
+        from redis import RedisError
+
+        rpm = limits.requests_per_minute
+        keys = [BUDGET_KEY.format(provider=provider), PAUSE_KEY.format(provider=provider)]
+        args = [rpm, rpm / 60, _reserved_tokens(limits, priority)]
+        while True:
+            try:
+                wait = float(await self._take(keys=keys, args=args))
+            except RedisError:
+                logger.warning("Orçamento compartilhado de %s indisponível", provider, exc_info=True)
+                return
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    async def pause(self, provider: str, seconds: float) -> None:
+        from redis import RedisError
+
+        try:
+            await self._pause(keys=[PAUSE_KEY.format(provider=provider)], args=[seconds])
+        except RedisError:
+            logger.warning("Não foi possível propagar a pausa de %s", provider, exc_info=True)
+
+
+class _ProviderLane:
+    def __init__(self, limits: ProviderLimits) -> None:
+        self.limits = limits
+        self.in_flight = 0
+        self.tokens = float(limits.requests_per_minute or 0)
+        self.refilled_at = time.monotonic()
+        self.paused_until = 0.0
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._sequence = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+
+    def _refill(self, now: float) -> None:
+        rpm = self.limits.requests_per_minute
+        if rpm:
+            self.tokens = min(rpm, self.tokens + (now - self.refilled_at) * rpm / 60)
+        self.refilled_at = now
+
+    def _delay(self, priority: Priority, now: float) -> float:
+        """Segundos até ``priority`` poder consumir um token (0 se já pode)."""
+        delay = max(0.0, self.paused_until - now)
+        rpm = self.limits.requests_per_minute
+        if not rpm:
+            return delay
+        missing = _reserved_tokens(self.limits, priority) + 1 - self.tokens
+        if missing > 0:
+            delay = max(delay, missing * 60 / rpm)
+        return delay
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        now = time.monotonic()
+        self._refill(now)
+        while self._waiters and self.in_flight < self.limits.concurrency:
+            priority, _, waiter = self._waiters[0]
+            if waiter.done():
+                # Cancelada ou expirada enquanto esperava
+                heapq.heappop(self._waiters)
+                continue
+            delay = self._delay(Priority(priority), now)
+            if delay > 0:
+                self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                return
+            heapq.heappop(self._waiters)
+            self.in_flight += 1
+            if self.limits.requests_per_minute:
+                self.tokens -= 1
+            waiter.set_result(None)
+
+    async def acquire(self, priority: Priority) -> None:
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), waiter))
+        self._dispatch()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # A vaga pode ter sido concedida no mesmo ciclo do cancelamento
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._dispatch()
+
+    def pause(self, seconds: float) -> None:
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class QuoteScheduler:
+    """Filas por provedor; uma instância por event loop (os futures pertencem ao loop).
+
+    Com ``budget`` o orçamento por minuto vem do Redis e as filas locais cuidam só da
+    concorrência, da prioridade e da pausa.
+    """
+
+    def __init__(self, limits: Mapping[str, ProviderLimits], budget: SharedBudget | None = None) -> None:
+        self._limits = dict(limits)
+        self._budget = budget
+        self._lanes = {
+            provider: _ProviderLane(replace(provider_limits, requests_per_minute=None) if budget else provider_limits)
+            for provider, provider_limits in limits.items()
+        }
+        self._background: set[asyncio.Task[None]] = set()
+
+    async def _acquire(self, provider: str, priority: Priority) -> None:
+        limits = self._limits[provider]
+        if self._budget is not None and limits.requests_per_minute:
+            await self._budget.take(provider, limits, priority)
+        await self._lanes[provider].acquire(priority)
+
+    @asynccontextmanager
+    async def slot(
+        self, provider: str, priority: Priority, timeout: float | None = None
+    ) -> AsyncIterator[None]:
+        """Reserva uma vaga no provedor; ``SchedulerTimeout`` se a espera passar de ``timeout``."""
+        lane = self._lanes[provider]
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._acquire(provider, priority), timeout)
+        except asyncio.TimeoutError as exc:
+            raise SchedulerTimeout(provider) from exc
+        finally:
+            QUOTE_SCHEDULER_WAIT.labels(provider, priority.name.lower()).observe(time.perf_counter() - start)
+        try:
+            yield
+        finally:
+            lane.release()
+
+    def pause(self, provider: str, seconds: float) -> None:
+        """Suspende novas chamadas ao provedor (ex.: após um 429 com ``Retry-After``)."""
+        self._lanes[provider].pause(seconds)
+        if self._budget is not None:
+            task = asyncio.get_running_loop().create_task(self._budget.pause(provider, seconds))
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
@@ -2,97 +2,180 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Any
+import weakref
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
 
 import httpx
 
-from app.schema.quote import QuoteAssetType, QuoteInput, QuoteResult
+from app.core.metrics import track_upstream
+from app.core.settings import settings
+from app.core.tracing import tracer
+from app.models.enums import AssetType
+from app.schema.quote import Candle, QuoteAssetType, QuoteInput, QuoteResult
+from app.services import symbol_directory
+from app.services.quote_providers import QuoteProvider, get_registry
+from app.services.quote_scheduler import Priority, QuoteScheduler, SharedBudget
 
-BRAPI_URL = "https://brapi.dev/api/quote/{ticker}?range=1d&interval=1d&fundamental=false"
-COINGECKO_URL = "https://api.coingecko.com/api/v3/simple/price"
-AWESOMEAPI_URL = "https://economia.awesomeapi.com.br/last/{pair}"
-
-CRYPTO_ID_MAP: dict[str, str] = {
-    "BTC": "bitcoin",
-    "ETH": "ethereum",
+# Tipos de ativo da carteira com cotação ao vivo (ações/FIIs/ETFs/BDRs pela brapi)
+QUOTED_ASSET_TYPES: dict[AssetType, QuoteAssetType] = {
+    AssetType.STOCK: QuoteAssetType.STOCK,
+    AssetType.FII: QuoteAssetType.STOCK,
+    AssetType.ETF: QuoteAssetType.STOCK,
+    AssetType.BDR: QuoteAssetType.STOCK,
+    AssetType.CRYPTO: QuoteAssetType.CRYPTO,
 }
 
+# Pausa após um 429 sem Retry-After numérico
+DEFAULT_RETRY_AFTER_SECONDS = 30.0
+
+_schedulers: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, QuoteScheduler] = weakref.WeakKeyDictionary()
+
+
+def get_scheduler() -> QuoteScheduler:
+    """Scheduler do event loop corrente (API: loop do uvicorn; worker: loop persistente)."""
+    loop = asyncio.get_running_loop()
+    scheduler = _schedulers.get(loop)
+    if scheduler is None:
+        budget = SharedBudget.from_url(settings.result_backend) if settings.quote_budget_shared else None
+        scheduler = _schedulers[loop] = QuoteScheduler(get_registry().limits(), budget)
+    return scheduler
+
+
+@contextmanager
+def _provider_call(provider: str, ticker: str) -> Iterator[None]:
+    """Span + métricas em volta de uma requisição a um provedor externo."""
+    with tracer.start_as_current_span(
+        f"quotes.{provider}", attributes={"quote.provider": provider, "quote.ticker": ticker}
+    ), track_upstream(provider):
+        yield
 
-async def _fetch_stock(client: httpx.AsyncClient, ticker: str) -> QuoteResult | None:
+
+def unsupported_tickers(assets: list[QuoteInput]) -> list[str]:
+    """Tickers sem provedor habilitado para o tipo ou ausentes do diretório de símbolos."""
+    registry = get_registry()
+    unsupported = []
+    for asset in assets:
+        provider = registry.for_type(asset.type)
+        if provider is None or provider.resolve(asset.ticker, asset.type) is None:
+            unsupported.append(asset.ticker)
+    return unsupported
+
+
+def _retry_after(response: httpx.Response) -> float:
     try:
-        resp = await client.get(BRAPI_URL.format(ticker=ticker))
-        resp.raise_for_status()
-        data = resp.json()
-        result = (data or {}).get("results", [{}])[0]
-        if not result:
-            return None
-        return QuoteResult(
-            symbol=result.get("symbol", ticker).upper(),
-            name=result.get("shortName") or result.get("longName"),
-            price=float(result.get("regularMarketPrice")),
-            change_percent=float(result.get("regularMarketChangePercent", 0)),
-            type=QuoteAssetType.STOCK,
-        )
-    except Exception:
-        return None
+        return float(response.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return DEFAULT_RETRY_AFTER_SECONDS
 
 
-async def _fetch_crypto(client: httpx.AsyncClient, ticker: str) -> QuoteResult | None:
-    crypto_id = CRYPTO_ID_MAP.get(ticker.upper())
-    if not crypto_id:
-        return None
-    params = {"ids": crypto_id, "vs_currencies": "brl"}
+@asynccontextmanager
+async def _scheduled_call(provider: QuoteProvider, priority: Priority, ticker: str) -> AsyncIterator[None]:
+    """Vaga no scheduler + span/métricas; um 429 pausa o provedor pelo ``Retry-After``."""
+    scheduler = get_scheduler()
+    wait = settings.quote_interactive_max_wait_seconds if priority == Priority.INTERACTIVE else None
     try:
-        resp = await client.get(COINGECKO_URL, params=params)
-        resp.raise_for_status()
-        data = resp.json()
-        price = (data.get(crypto_id) or {}).get("brl")
-        if price is None:
-            return None
-        return QuoteResult(
-            symbol=ticker.upper(),
-            name=crypto_id.capitalize(),
-            price=float(price),
-            change_percent=None,
-            type=QuoteAssetType.CRYPTO,
-        )
-    except Exception:
-        return None
+        async with scheduler.slot(provider.name, priority, wait):
+            with _provider_call(provider.name, ticker):
+                yield
+    except httpx.HTTPStatusError as exc:
+        if exc.response.status_code == httpx.codes.TOO_MANY_REQUESTS:
+            scheduler.pause(provider.name, _retry_after(exc.response))
+        raise
 
 
-async def _fetch_fx(client: httpx.AsyncClient, pair: str) -> QuoteResult | None:
+async def _fetch_batch(
+    client: httpx.AsyncClient,
+    provider: QuoteProvider,
+    asset_type: QuoteAssetType,
+    symbols: dict[str, str],
+    priority: Priority,
+) -> dict[str, QuoteResult]:
+    """Uma requisição agendada ao provedor; em qualquer falha o lote fica sem cotação."""
     try:
-        resp = await client.get(AWESOMEAPI_URL.format(pair=pair))
-        resp.raise_for_status()
-        data = resp.json()
-        key = pair.replace("-", "")
-        result: dict[str, Any] | None = data.get(key)
-        if not result:
-            return None
-        return QuoteResult(
-            symbol=pair.replace("-", "/"),
-            name=result.get("name"),
-            price=float(result.get("bid")),
-            change_percent=float(result.get("pctChange", 0)),
-            type=QuoteAssetType.FX,
-        )
+        async with _scheduled_call(provider, priority, ",".join(symbols)):
+            return await provider.fetch(client, asset_type, symbols)
     except Exception:
-        return None
+        return {}
 
 
-async def fetch_quotes(assets: list[QuoteInput]) -> list[QuoteResult]:
+async def fetch_candles(
+    client: httpx.AsyncClient,
+    asset_type: QuoteAssetType,
+    ticker: str,
+    priority: Priority = Priority.BACKGROUND,
+) -> list[Candle]:
+    """Histórico diário do ticker pelo provedor do tipo; erros são propagados."""
+    await symbol_directory.arefresh_if_stale()
+    provider = get_registry().for_type(asset_type)
+    # Provedor sem histórico (max_candle_days == 0) conta como ticker não suportado
+    has_candles = provider is not None and provider.max_candle_days > 0
+    symbol = provider.resolve(ticker, asset_type) if has_candles else None
+    if symbol is None:
+        raise ValueError(f"Ticker não suportado: {ticker}")
+    days = min(settings.candle_history_days, provider.max_candle_days)
+    async with _scheduled_call(provider, priority, ticker):
+        return await provider.fetch_candles(client, asset_type, symbol, days)
+
+
+async def fetch_quotes(
+    assets: list[QuoteInput],
+    client: httpx.AsyncClient | None = None,
+    priority: Priority = Priority.BACKGROUND,
+) -> list[QuoteResult]:
+    """Busca as cotações em paralelo; ``client`` permite reaproveitar um pool de conexões.
+
+    As chamadas passam pelo scheduler do loop, que respeita os limites de cada provedor;
+    ``Priority.INTERACTIVE`` fura a fila do background e desiste após
+    ``quote_interactive_max_wait_seconds`` (o ticker fica de fora do resultado).
+    """
+    results = await fetch_quotes_aligned(assets, client, priority)
+    return [quote for quote in results if quote is not None]
+
+
+async def fetch_quotes_aligned(
+    assets: list[QuoteInput],
+    client: httpx.AsyncClient | None = None,
+    priority: Priority = Priority.BACKGROUND,
+) -> list[QuoteResult | None]:
+    """Como ``fetch_quotes``, mas na mesma ordem de ``assets`` e com ``None`` onde faltou cotação."""
     if not assets:
         return []
 
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        tasks = []
-        for asset in assets:
-            if asset.type == QuoteAssetType.STOCK:
-                tasks.append(_fetch_stock(client, asset.ticker))
-            elif asset.type == QuoteAssetType.CRYPTO:
-                tasks.append(_fetch_crypto(client, asset.ticker))
-            elif asset.type == QuoteAssetType.FX:
-                tasks.append(_fetch_fx(client, asset.ticker))
-        results = await asyncio.gather(*tasks)
+    with tracer.start_as_current_span("quotes.fetch", attributes={"quote.count": len(assets)}):
+        if client is None:
+            async with httpx.AsyncClient(timeout=10.0) as own_client:
+                return await _gather_quotes(own_client, assets, priority)
+        return await _gather_quotes(client, assets, priority)
 
-    return [quote for quote in results if quote is not None]
+
+async def _gather_quotes(
+    client: httpx.AsyncClient, assets: list[QuoteInput], priority: Priority
+) -> list[QuoteResult | None]:
+    """Agrupa os tickers por provedor e tipo, em lotes de ``batch_size``, mantendo a ordem de entrada."""
+    await symbol_directory.arefresh_if_stale()
+    registry = get_registry()
+    groups: dict[tuple[str, QuoteAssetType], tuple[QuoteProvider, dict[str, str]]] = {}
+    for asset in assets:
+        provider = registry.for_type(asset.type)
+        if provider is None:
+            continue
+        symbol = provider.resolve(asset.ticker, asset.type)
+        if symbol is None:
+            continue
+        groups.setdefault((provider.name, asset.type), (provider, {}))[1][asset.ticker] = symbol
+
+    batch_types: list[QuoteAssetType] = []
+    tasks = []
+    for (_, asset_type), (provider, symbols) in groups.items():
+        tickers = list(symbols)
+        for start in range(0, len(tickers), provider.batch_size):
+            chunk = {ticker: symbols[ticker] for ticker in tickers[start : start + provider.batch_size]}
+            batch_types.append(asset_type)
+            tasks.append(_fetch_batch(client, provider, asset_type, chunk, priority))
+
+    found: dict[tuple[QuoteAssetType, str], QuoteResult] = {}
+    for asset_type, batch in zip(batch_types, await asyncio.gather(*tasks)):
+        for ticker, quote in batch.items():
+            found[asset_type, ticker] = quote
+    return [found.get((asset.type, asset.ticker)) for asset in assets]
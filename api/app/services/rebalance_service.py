@@ -0,0 +1,215 @@
+"""Simulação de rebalanceamento da carteira por pesos alvo de tipo de ativo.
+
+O cálculo é vetorizado com numpy sobre todas as posições de uma vez (somas por tipo
+com ``bincount``, arredondamento por lote com ``floor``); só a última passada, que
+distribui a sobra de caixa lote a lote, percorre as posições.
+"""
+from __future__ import annotations
+
+import uuid
+from collections.abc import Sequence
+from typing import NamedTuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models import Asset
+from app.models.enums import AssetType, TransactionType
+from app.schema.dashboard import RebalanceAllocation, RebalanceOrder, RebalancePlan, RebalanceRequest
+from app.schema.quote import QuoteInput
+
+ASSET_TYPES = list(AssetType)
+_TYPE_CODES = {asset_type: code for code, asset_type in enumerate(ASSET_TYPES)}
+# Mercado fracionário da B3 negocia de 1 em 1; demais tipos aceitam frações
+DEFAULT_LOT_SIZES = {
+    AssetType.STOCK: 1.0,
+    AssetType.FII: 1.0,
+    AssetType.ETF: 1.0,
+    AssetType.BDR: 1.0,
+}
+FRACTIONAL_LOT = 1e-8
+# Tolerância do floor: 0.1 / 0.01 em ponto flutuante dá 9.999..., não 10
+_EPSILON = 1e-9
+
+
+class RebalanceError(ValueError):
+    """Pesos alvo ou lotes inválidos."""
+
+
+class Position(NamedTuple):
+    id: uuid.UUID
+    ticker: str
+    asset_type: AssetType
+    quantity: float
+    average_price: float
+
+
+def load_positions(db: Session, user_id: uuid.UUID) -> list[Position]:
+    stmt = select(Asset.id, Asset.ticker, Asset.asset_type, Asset.quantity, Asset.average_price).where(
+        Asset.user_id == user_id, Asset.is_active, Asset.quantity > 0
+    )
+    return [Position(*row) for row in db.execute(stmt)]
+
+
+def _normalized_targets(targets: dict[AssetType, float]) -> np.ndarray:
+    if any(weight < 0 for weight in targets.values()):
+        raise RebalanceError("Pesos alvo não podem ser negativos")
+    total = sum(targets.values())
+    if total <= 0:
+        raise RebalanceError("Informe ao menos um peso alvo positivo")
+    return np.array([targets.get(asset_type, 0.0) / total for asset_type in ASSET_TYPES])
+
+
+def plan_rebalance(
+    positions: Sequence[Position], prices: Sequence[float | None], request: RebalanceRequest
+) -> RebalancePlan:
+    """Ordens de compra/venda que aproximam a carteira dos pesos alvo.
+
+    ``prices[i]`` é a cotação de ``positions[i]``; sem cotação usa-se o preço médio
+    (os tickers voltam em ``unpriced``). Dentro de cada tipo a proporção atual entre
+    as posições é mantida. Vendas arredondam para baixo no lote; compras são limitadas
+    ao caixa (aporte + vendas), reduzidas proporcionalmente se faltar dinheiro.
+    """
+    target_weights = _normalized_targets(request.targets)
+    if any(lot <= 0 for lot in request.lot_sizes.values()):
+        raise RebalanceError("Lotes precisam ser positivos")
+    lot_overrides = {ticker.strip().upper(): lot for ticker, lot in request.lot_sizes.items()}
+
+    size = len(positions)
+    kinds = len(ASSET_TYPES)
+    type_idx = np.fromiter((_TYPE_CODES[p.asset_type] for p in positions), dtype=np.intp, count=size)
+    quantity = np.fromiter((float(p.quantity) for p in positions), dtype=float, count=size)
+    live = np.fromiter((np.nan if price is None else price for price in prices), dtype=float, count=size)
+    cost = np.fromiter((float(p.average_price) for p in positions), dtype=float, count=size)
+    lots = np.fromiter(
+        (
+            lot_overrides.get(p.ticker.strip().upper(), DEFAULT_LOT_SIZES.get(p.asset_type, FRACTIONAL_LOT))
+            for p in positions
+        ),
+        dtype=float,
+        count=size,
+    )
+
+    unpriced_mask = ~(live > 0)
+    price = np.where(unpriced_mask, cost, live)
+    # Sem cotação nem preço médio não há como avaliar nem negociar a posição
+    tradable = price > 0
+    price = np.where(tradable, price, 1.0)
+    value = np.where(tradable, quantity * price, 0.0)
+
+    type_value = np.bincount(type_idx, weights=value, minlength=kinds)
+    type_count = np.bincount(type_idx, weights=tradable, minlength=kinds)
+    total = float(type_value.sum()) + request.contribution
+    if total <= 0:
+        raise RebalanceError("Carteira sem valor e sem aporte para rebalancear")
+
+    # Alvo de cada posição: alvo do tipo repartido pela proporção atual dentro do tipo
+    # (ou igualmente, se o tipo estiver zerado)
+    group_value = type_value[type_idx]
+    share = np.where(group_value > 0, value / np.where(group_value > 0, group_value, 1.0), 1.0)
+    share = np.where(group_value > 0, share, 1.0 / np.maximum(type_count[type_idx], 1.0))
+    target = np.where(tradable, target_weights[type_idx] * total * share, value)
+    delta = target - value
+    if not request.allow_sell:
+        delta = np.maximum(delta, 0.0)
+
+    lot_value = lots * price
+    sell_qty = np.where(delta < 0, np.minimum(np.floor(-delta / lot_value + _EPSILON) * lots, quantity), 0.0)
+    cash = request.contribution + float((sell_qty * price).sum())
+
+    wanted = np.maximum(delta, 0.0)
+    needed = float(wanted.sum())
+    if needed > cash:
+        wanted *= cash / needed
+    buy_qty = np.floor(wanted / lot_value + _EPSILON) * lots
+    cash -= float((buy_qty * price).sum())
+
+    # O floor deixa até um lote por posição sem uso: vai para as maiores defasagens
+    gap = np.where(delta > 0, delta - buy_qty * price, 0.0)
+    candidates = np.flatnonzero(gap >= lot_value / 2)
+    candidates = candidates[np.argsort(-gap[candidates])]
+    extra = []
+    for index, cost_per_lot in zip(candidates.tolist(), lot_value[candidates].tolist()):
+        if cost_per_lot <= cash:
+            extra.append(index)
+            cash -= cost_per_lot
+    buy_qty[extra] += lots[extra]
+
+    new_value = (quantity - sell_qty + buy_qty) * price * tradable
+    projected = np.bincount(type_idx, weights=new_value, minlength=kinds)
+
+    # Conversão em bloco para float nativo: round()/float() em escalares numpy, ordem a
+    # ordem, custam mais que toda a aritmética vetorial
+    traded = np.round(buy_qty - sell_qty, 8)
+    order_idx = np.flatnonzero(traded != 0)
+    order_qty = np.abs(traded[order_idx])
+    order_price = price[order_idx]
+    orders = [
+        RebalanceOrder(
+            asset_id=positions[index].id,
+            ticker=positions[index].ticker,
+            asset_type=positions[index].asset_type,
+            side=TransactionType.BUY if is_buy else TransactionType.SELL,
+            quantity=qty,
+            price=unit_price,
+            value=value,
+        )
+        for index, is_buy, qty, unit_price, value in zip(
+            order_idx.tolist(),
+            (traded[order_idx] > 0).tolist(),
+            order_qty.tolist(),
+            order_price.tolist(),
+            np.round(order_qty * order_price, 2).tolist(),
+        )
+    ]
+
+    allocation = [
+        RebalanceAllocation(
+            asset_type=asset_type,
+            current_value=round(float(type_value[code]), 2),
+            current_weight=float(type_value[code] / total),
+            target_weight=float(target_weights[code]),
+            projected_value=round(float(projected[code]), 2),
+            projected_weight=float(projected[code] / total),
+        )
+        for code, asset_type in enumerate(ASSET_TYPES)
+        if type_value[code] > 0 or target_weights[code] > 0
+    ]
+    return RebalancePlan(
+        total_value=round(total, 2),
+        cash_remaining=round(cash, 2),
+        orders=orders,
+        allocation=allocation,
+        unpriced=[positions[index].ticker for index in np.flatnonzero(unpriced_mask & tradable)],
+        unreachable=[ASSET_TYPES[code] for code in np.flatnonzero((target_weights > 0) & (type_count == 0))],
+    )
+
+
+async def simulate_rebalance(db: Session, user_id: uuid.UUID, request: RebalanceRequest) -> RebalancePlan:
+    """Carrega as posições, cota os tickers cotáveis (prioridade interativa) e monta o plano.
+
+    A sessão é fechada logo após a leitura das posições: a cotação pode esperar segundos
+    pelos provedores e não deve segurar uma conexão do pool nesse tempo.
+    """
+    from fastapi.concurrency import run_in_threadpool
+
+    from app.services.quote_scheduler import Priority
+    from app.services.quote_service import QUOTED_ASSET_TYPES, fetch_quotes_aligned
+
+    def load_and_release() -> list[Position]:
+        try:
+            return load_positions(db, user_id)
+        finally:
+            db.close()
+
+    positions = await run_in_threadpool(load_and_release)
+    quoted = [index for index, p in enumerate(positions) if p.asset_type in QUOTED_ASSET_TYPES]
+    inputs = [
+        QuoteInput(ticker=positions[index].ticker.strip().upper(), type=QUOTED_ASSET_TYPES[positions[index].asset_type])
+        for index in quoted
+    ]
+    prices: list[float | None] = [None] * len(positions)
+    for index, quote in zip(quoted, await fetch_quotes_aligned(inputs, priority=Priority.INTERACTIVE)):
+        prices[index] = quote.price if quote is not None else None
+    return plan_rebalance(positions, prices, request)
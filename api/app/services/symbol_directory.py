@@ -0,0 +1,194 @@
+"""Diretório de símbolos: ticker -> identificador no provedor, por tipo de ativo.
+
+O processo começa com o snapshot empacotado em ``app/data/symbol_directory.json`` e
+passa a usar a versão publicada no Redis pela task ``quotes.refresh_symbol_directory``
+(rodada pelo beat), conferindo no máximo a cada ``symbol_directory_reload_seconds``.
+As consultas são ``dict`` em memória, sem I/O no caminho das cotações.
+
+Um tipo de ativo só é validado quando o diretório tem entradas para ele: tickers
+desconhecidos desse tipo são recusados; de um tipo sem entradas, aceitos como estão.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+from importlib import resources
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from app.core.settings import settings
+from app.schema.quote import QuoteAssetType
+
+if TYPE_CHECKING:
+    import httpx
+    import redis
+
+logger = logging.getLogger(__name__)
+
+SYMBOL_DIRECTORY_KEY = "symbol-directory"
+SYMBOL_DIRECTORY_VERSION_KEY = "symbol-directory:version"
+COINGECKO_PAGE_SIZE = 250
+
+
+class SymbolEntry(NamedTuple):
+    provider_id: str
+    name: str | None = None
+
+
+class SymbolDirectory:
+    def __init__(self, symbols: dict[QuoteAssetType, dict[str, SymbolEntry]], updated_at: str) -> None:
+        self.symbols = symbols
+        self.updated_at = updated_at
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> SymbolDirectory:
+        symbols = {
+            QuoteAssetType(asset_type): {ticker: SymbolEntry(*entry) for ticker, entry in entries.items()}
+            for asset_type, entries in data["symbols"].items()
+        }
+        return cls(symbols, data["updated_at"])
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "updated_at": self.updated_at,
+            "symbols": {
+                asset_type.value: {ticker: list(entry) for ticker, entry in entries.items()}
+                for asset_type, entries in self.symbols.items()
+            },
+        }
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self.symbols.values())
+
+    def get(self, asset_type: QuoteAssetType, ticker: str) -> SymbolEntry | None:
+        return self.symbols.get(asset_type, {}).get(ticker.strip().upper())
+
+    def resolve(self, asset_type: QuoteAssetType, ticker: str, *, required: bool = False) -> str | None:
+        """Id do ticker no provedor; ``None`` se o tipo é coberto (ou ``required``) e o ticker não existe."""
+        entry = self.get(asset_type, ticker)
+        if entry is not None:
+            return entry.provider_id
+        if required or self.symbols.get(asset_type):
+            return None
+        return ticker.strip().upper()
+
+
+def load_snapshot() -> SymbolDirectory:
+    raw = resources.files("app").joinpath("data/symbol_directory.json").read_text(encoding="utf-8")
+    return SymbolDirectory.from_json(json.loads(raw))
+
+
+_lock = threading.Lock()
+_directory: SymbolDirectory | None = None
+_version: bytes | None = None
+_checked_at = float("-inf")
+
+
+@lru_cache
+def _redis() -> redis.Redis:
+    import redis
+
+    return redis.Redis.from_url(settings.result_backend, socket_timeout=0.5, socket_connect_timeout=0.5)
+
+
+def current() -> SymbolDirectory:
+    """Diretório em memória (o snapshot empacotado até a primeira versão do Redis)."""
+    global _directory
+    if _directory is None:
+        _directory = load_snapshot()
+    return _directory
+
+
+def _stale() -> bool:
+    return time.monotonic() - _checked_at >= settings.symbol_directory_reload_seconds
+
+
+def refresh_if_stale() -> SymbolDirectory:
+    """Troca o diretório pelo publicado no Redis se a versão mudou; bloqueante (use em threads)."""
+    global _directory, _version, _checked_at
+    # Só uma thread confere por vez; as demais seguem com o diretório atual
+    if _stale() and _lock.acquire(blocking=False):
+        try:
+            _checked_at = time.monotonic()
+            client = _redis()
+            version = client.get(SYMBOL_DIRECTORY_VERSION_KEY)
+            if version is not None and version != _version:
+                raw = client.get(SYMBOL_DIRECTORY_KEY)
+                if raw is not None:
+                    _directory, _version = SymbolDirectory.from_json(json.loads(raw)), version
+        except Exception:
+            logger.warning("Diretório de símbolos indisponível no Redis; mantendo o atual", exc_info=True)
+        finally:
+            _lock.release()
+    return current()
+
+
+async def arefresh_if_stale() -> SymbolDirectory:
+    if _stale():
+        await asyncio.to_thread(refresh_if_stale)
+    return current()
+
+
+def _fetch_crypto(client: httpx.Client) -> dict[str, SymbolEntry]:
+    # Snapshot primeiro: vários tokens compartilham o mesmo símbolo e a curadoria vence;
+    # depois, por market cap decrescente, o primeiro de cada símbolo fica
+    entries = dict(load_snapshot().symbols.get(QuoteAssetType.CRYPTO, {}))
+    for page in range(1, settings.symbol_directory_crypto_pages + 1):
+        resp = client.get(
+            settings.coingecko_markets_url,
+            params={"vs_currency": "brl", "order": "market_cap_desc", "per_page": COINGECKO_PAGE_SIZE, "page": page},
+        )
+        resp.raise_for_status()
+        coins = resp.json()
+        for coin in coins:
+            entries.setdefault(coin["symbol"].upper(), SymbolEntry(coin["id"], coin.get("name")))
+        if len(coins) < COINGECKO_PAGE_SIZE:
+            break
+    return entries
+
+
+def _fetch_fx(client: httpx.Client) -> dict[str, SymbolEntry]:
+    resp = client.get(settings.awesomeapi_available_url)
+    resp.raise_for_status()
+    return {pair.upper(): SymbolEntry(pair.upper(), name) for pair, name in resp.json().items()}
+
+
+def _fetch_stocks(client: httpx.Client) -> dict[str, SymbolEntry]:
+    resp = client.get(settings.brapi_available_url)
+    resp.raise_for_status()
+    return {ticker.upper(): SymbolEntry(ticker.upper()) for ticker in resp.json().get("stocks", [])}
+
+
+def fetch_directory(client: httpx.Client) -> SymbolDirectory:
+    """Monta um diretório novo a partir das listas dos provedores.
+
+    Se uma fonte falhar, o tipo correspondente mantém as entradas do diretório atual.
+    """
+    refresh_if_stale()
+    symbols = dict(current().symbols)
+    sources = {
+        QuoteAssetType.CRYPTO: _fetch_crypto,
+        QuoteAssetType.FX: _fetch_fx,
+        QuoteAssetType.STOCK: _fetch_stocks,
+    }
+    for asset_type, fetch in sources.items():
+        try:
+            symbols[asset_type] = fetch(client)
+        except Exception:
+            logger.warning("Falha ao atualizar símbolos de %s; mantendo os anteriores", asset_type.value, exc_info=True)
+    return SymbolDirectory(symbols, datetime.now(tz=timezone.utc).isoformat())
+
+
+def publish(directory: SymbolDirectory) -> None:
+    """Grava o diretório no Redis; os processos o carregam na próxima conferência."""
+    global _directory, _version
+    version = directory.updated_at.encode()
+    pipe = _redis().pipeline()
+    pipe.set(SYMBOL_DIRECTORY_KEY, json.dumps(directory.to_json(), ensure_ascii=False, separators=(",", ":")))
+    pipe.set(SYMBOL_DIRECTORY_VERSION_KEY, version)
+    pipe.execute()
+    _directory, _version = directory, version
@@ -1,19 +1,93 @@
 """Configuração do Celery para tarefas assíncronas."""
 from __future__ import annotations
 
-from celery import Celery
+import time
 
+from celery import Celery, signals
+
+from app.core.metrics import CELERY_TASK_DURATION, start_metrics_server
 from app.core.settings import settings
+from app.core.tracing import configure_tracing, end_consumer_span, inject_headers, start_consumer_span
 
 celery_app = Celery("investorion")
 celery_app.conf.broker_url = settings.broker_url
 celery_app.conf.result_backend = settings.result_backend
+# Cotações (I/O) e tasks CPU-bound em filas separadas: um import lento nunca atrasa um refresh
 celery_app.conf.task_routes = {
-    "quotes.fetch_batch": {"queue": "quotes"},
+    "quotes.*": {"queue": settings.quotes_queue},
+    "media.*": {"queue": settings.heavy_queue},
+    "imports.*": {"queue": settings.heavy_queue},
+    "valuation.*": {"queue": settings.heavy_queue},
+    "maintenance.*": {"queue": settings.heavy_queue},
 }
+celery_app.conf.worker_prefetch_multiplier = settings.worker_prefetch_multiplier
+celery_app.conf.task_acks_late = settings.task_acks_late
+celery_app.conf.task_reject_on_worker_lost = settings.task_acks_late
 celery_app.conf.task_serializer = "json"
-celery_app.conf.accept_content = ["json"]
-celery_app.conf.result_serializer = "json"
+celery_app.conf.accept_content = ["json", "msgpack"]
+celery_app.conf.result_accept_content = ["json", "msgpack"]
+celery_app.conf.result_serializer = settings.result_serializer
+celery_app.conf.result_expires = settings.result_expires_seconds
+# Agenda periódica (requer um processo `celery beat`)
+celery_app.conf.beat_schedule = {
+    "transaction-partitions": {
+        "task": "maintenance.transaction_partitions",
+        "schedule": 24 * 60 * 60,
+    },
+    "symbol-directory": {
+        "task": "quotes.refresh_symbol_directory",
+        "schedule": 24 * 60 * 60,
+    },
+    "candles-prewarm": {
+        "task": "quotes.prewarm_candles",
+        "schedule": settings.candle_refresh_seconds,
+    },
+}
 
 # Importa módulos contendo tasks para registro automático
 celery_app.autodiscover_tasks(["app.worker.tasks"])
+
+_task_started_at: dict[str, float] = {}
+_task_spans: dict[str, tuple] = {}
+
+
+@signals.before_task_publish.connect
+def _propagate_trace_context(headers: dict | None = None, **kwargs) -> None:
+    # Headers customizados da mensagem viram atributos de task.request no worker
+    if settings.tracing_enabled and headers is not None:
+        inject_headers(headers)
+
+
+@signals.task_prerun.connect
+def _record_task_start(task_id: str, task, **kwargs) -> None:
+    _task_started_at[task_id] = time.perf_counter()
+    if settings.tracing_enabled:
+        _task_spans[task_id] = start_consumer_span(
+            f"celery.task {task.name}", vars(task.request), {"celery.task_id": task_id}
+        )
+
+
+@signals.task_postrun.connect
+def _record_task_duration(task_id: str, task, state: str | None = None, **kwargs) -> None:
+    started_at = _task_started_at.pop(task_id, None)
+    if started_at is not None:
+        CELERY_TASK_DURATION.labels(task.name, state or "UNKNOWN").observe(time.perf_counter() - started_at)
+    span_and_token = _task_spans.pop(task_id, None)
+    if span_and_token is not None:
+        end_consumer_span(*span_and_token, failed=state == "FAILURE")
+
+
+@signals.worker_process_shutdown.connect
+def _stop_event_loop(**kwargs) -> None:
+    from app.worker import event_loop
+
+    event_loop.shutdown()
+
+
+@signals.worker_init.connect
+def _start_observability(**kwargs) -> None:
+    if settings.tracing_enabled:
+        configure_tracing("investorion-worker")
+    # Com prefork, defina PROMETHEUS_MULTIPROC_DIR para agregar os processos filhos
+    if settings.metrics_enabled and settings.worker_metrics_port:
+        start_metrics_server(settings.worker_metrics_port)
@@ -0,0 +1,82 @@
+"""Event loop persistente por processo do worker, com cliente HTTP compartilhado.
+
+Em vez de ``asyncio.run`` a cada task (novo loop, novo pool de conexões e novo
+handshake TLS com os provedores), cada processo do worker mantém um loop rodando
+numa thread dedicada e submete as corrotinas a ele. Funciona com os pools
+``prefork`` (um loop por processo filho, criado após o fork), ``threads`` e ``solo``.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import os
+import threading
+from collections.abc import Awaitable, Callable, Coroutine
+from typing import Any, TypeVar
+
+import httpx
+
+T = TypeVar("T")
+
+_lock = threading.Lock()
+_loop: asyncio.AbstractEventLoop | None = None
+_client: httpx.AsyncClient | None = None
+_owner_pid: int | None = None
+
+
+def _ensure_loop() -> asyncio.AbstractEventLoop:
+    global _loop, _client, _owner_pid
+    with _lock:
+        # Após um fork o loop herdado não tem thread rodando; cria outro no filho
+        if _loop is None or _owner_pid != os.getpid():
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="worker-event-loop", daemon=True).start()
+            _loop, _client, _owner_pid = loop, None, os.getpid()
+        return _loop
+
+
+async def _get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            timeout=10.0,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        )
+    return _client
+
+
+async def _run_in_context(coro: Coroutine[Any, Any, T], context: contextvars.Context) -> T:
+    return await asyncio.create_task(coro, context=context)
+
+
+def run(coro: Coroutine[Any, Any, T], timeout: float | None = None) -> T:
+    """Executa a corrotina no loop do processo e bloqueia até o resultado.
+
+    O contexto da thread chamadora (ex.: span da task) acompanha a corrotina.
+    """
+    context = contextvars.copy_context()
+    return asyncio.run_coroutine_threadsafe(_run_in_context(coro, context), _ensure_loop()).result(timeout)
+
+
+def run_with_client(
+    factory: Callable[[httpx.AsyncClient], Awaitable[T]], timeout: float | None = None
+) -> T:
+    """Como ``run``, passando o ``httpx.AsyncClient`` compartilhado para ``factory(client)``."""
+
+    async def _call() -> T:
+        return await factory(await _get_client())
+
+    return run(_call(), timeout)
+
+
+def shutdown() -> None:
+    """Fecha o cliente HTTP e para o loop (chamado no encerramento do processo)."""
+    global _loop, _client
+    with _lock:
+        if _loop is None or _owner_pid != os.getpid():
+            return
+        loop, client = _loop, _client
+        _loop, _client = None, None
+    if client is not None:
+        asyncio.run_coroutine_threadsafe(client.aclose(), loop).result(5)
+    loop.call_soon_threadsafe(loop.stop)
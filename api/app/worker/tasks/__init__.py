@@ -1,4 +1,18 @@
 """Exporta tasks para facilitar import."""
-from app.worker.tasks.quotes import fetch_quotes_task
+from app.worker.tasks.maintenance import ensure_transaction_partitions_task
+from app.worker.tasks.media import generate_avatar_thumbnail_task
+from app.worker.tasks.quotes import (
+    fetch_quotes_task,
+    prewarm_candles_task,
+    refresh_candles_task,
+    refresh_symbol_directory_task,
+)
 
-__all__ = ["fetch_quotes_task"]
+__all__ = [
+    "ensure_transaction_partitions_task",
+    "fetch_quotes_task",
+    "generate_avatar_thumbnail_task",
+    "prewarm_candles_task",
+    "refresh_candles_task",
+    "refresh_symbol_directory_task",
+]
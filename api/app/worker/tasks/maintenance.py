@@ -0,0 +1,20 @@
+"""Tasks Celery de manutenção do banco."""
+from __future__ import annotations
+
+from sqlalchemy import text
+
+from app.core.settings import settings
+from app.db.session import SessionLocal
+from app.worker.celery_app import celery_app
+
+
+@celery_app.task(name="maintenance.transaction_partitions", ignore_result=True)
+def ensure_transaction_partitions_task() -> int:
+    """Cria as partições mensais futuras de ``transactions`` (no-op sem particionamento)."""
+    with SessionLocal() as session:
+        created = session.execute(
+            text("SELECT ensure_transaction_partitions(:months_ahead)"),
+            {"months_ahead": settings.transaction_partitions_ahead_months},
+        ).scalar_one()
+        session.commit()
+    return created
@@ -0,0 +1,60 @@
+"""Tasks Celery relacionadas a arquivos de mídia."""
+from __future__ import annotations
+
+import uuid
+
+from PIL import Image, ImageOps
+from sqlalchemy import exists, select, update
+
+from app.core.settings import settings
+from app.db.session import SessionLocal
+from app.models import Profile
+from app.services.media_service import (
+    avatar_dir,
+    avatar_thumbnail_dir,
+    avatar_thumbnail_filename,
+    avatar_thumbnail_url,
+    avatar_url,
+)
+from app.worker.celery_app import celery_app
+
+
+@celery_app.task(name="media.avatar_thumbnail", ignore_result=True)
+def generate_avatar_thumbnail_task(profile_id: str, filename: str) -> str:
+    """Gera a miniatura WebP do avatar, aponta o perfil para ela e apaga o original.
+
+    O original é content-addressed e pode ser de outro perfil (upload idêntico): só é
+    removido quando nenhum perfil o referencia mais.
+    """
+    size = settings.avatar_thumbnail_size
+    thumbnail_dir = avatar_thumbnail_dir()
+    thumbnail_dir.mkdir(parents=True, exist_ok=True)
+
+    # Miniaturas também são endereçadas pelo hash do original: uploads repetidos reaproveitam
+    target = thumbnail_dir / avatar_thumbnail_filename(filename)
+    if not target.exists():
+        with Image.open(avatar_dir() / filename) as image:
+            image = ImageOps.exif_transpose(image)
+            mode = "RGBA" if image.mode in {"RGBA", "LA", "P"} else "RGB"
+            thumbnail = ImageOps.fit(image.convert(mode), (size, size), Image.Resampling.LANCZOS)
+            partial = target.with_name(f".{uuid.uuid4().hex}.part")
+            thumbnail.save(partial, "WEBP", quality=80, method=6)
+            partial.replace(target)
+
+    thumbnail_url = avatar_thumbnail_url(filename)
+    original_url = avatar_url(filename)
+    session = SessionLocal()
+    try:
+        # Só troca se o avatar não mudou enquanto a miniatura era gerada
+        session.execute(
+            update(Profile)
+            .where(Profile.id == uuid.UUID(profile_id), Profile.avatar_url == original_url)
+            .values(avatar_url=thumbnail_url)
+        )
+        session.commit()
+        still_referenced = session.execute(select(exists().where(Profile.avatar_url == original_url))).scalar()
+    finally:
+        session.close()
+    if not still_referenced:
+        (avatar_dir() / filename).unlink(missing_ok=True)
+    return thumbnail_url
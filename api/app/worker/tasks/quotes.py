@@ -3,14 +3,73 @@ from __future__ import annotations
 
 import asyncio
 
-from app.schema.quote import QuoteInput
-from app.services.quote_service import fetch_quotes
+import httpx
+
+from app.core.settings import settings
+from app.db.session import SessionLocal
+from app.schema.quote import Candle, QuoteAssetType, QuoteInput, QuoteResult
+from app.services import candle_service, symbol_directory
+from app.services.quote_service import fetch_candles, fetch_quotes
+from app.worker import event_loop
 from app.worker.celery_app import celery_app
 
 
+def parse_assets(assets: list[dict]) -> list[QuoteInput]:
+    return [QuoteInput(**asset) for asset in assets]
+
+
+def dump_results(results: list[QuoteResult]) -> list[dict]:
+    return [quote.model_dump(mode="json", exclude_none=True) for quote in results]
+
+
 @celery_app.task(name="quotes.fetch_batch")
 def fetch_quotes_task(assets: list[dict]) -> list[dict]:
     """Busca cotações em paralelo e armazena o resultado no backend do Celery."""
-    parsed_assets = [QuoteInput(**asset) for asset in assets]
-    results = asyncio.run(fetch_quotes(parsed_assets))
-    return [quote.model_dump() for quote in results]
+    parsed_assets = parse_assets(assets)
+    if settings.worker_persistent_loop:
+        results = event_loop.run_with_client(lambda client: fetch_quotes(parsed_assets, client=client))
+    else:
+        results = asyncio.run(fetch_quotes(parsed_assets))
+    return dump_results(results)
+
+
+@celery_app.task(name="quotes.refresh_symbol_directory", ignore_result=True)
+def refresh_symbol_directory_task() -> int:
+    """Baixa as listas de símbolos dos provedores e publica o diretório no Redis."""
+    with httpx.Client(timeout=30.0) as client:
+        directory = symbol_directory.fetch_directory(client)
+    symbol_directory.publish(directory)
+    return len(directory)
+
+
+async def _fetch_candles_own_client(asset_type: QuoteAssetType, ticker: str) -> list[Candle]:
+    async with httpx.AsyncClient(timeout=10.0) as client:
+        return await fetch_candles(client, asset_type, ticker)
+
+
+@celery_app.task(name="quotes.refresh_candles", ignore_result=True)
+def refresh_candles_task(asset_type: str, ticker: str) -> int:
+    """Baixa o histórico diário do ticker (fila de background do scheduler) e grava os candles."""
+    quote_type = QuoteAssetType(asset_type)
+    try:
+        if settings.worker_persistent_loop:
+            candles = event_loop.run_with_client(lambda client: fetch_candles(client, quote_type, ticker))
+        else:
+            candles = asyncio.run(_fetch_candles_own_client(quote_type, ticker))
+    except ValueError:
+        # Ticker fora do diretório: a trava fica até expirar, sem novas tentativas
+        return 0
+    except Exception:
+        # Libera a trava para a próxima leitura do gráfico tentar de novo
+        candle_service.forget_refresh(quote_type, ticker)
+        raise
+    with SessionLocal() as db:
+        return candle_service.store_candles(db, quote_type, ticker, candles)
+
+
+@celery_app.task(name="quotes.prewarm_candles", ignore_result=True)
+def prewarm_candles_task() -> int:
+    """Enfileira a atualização dos candles de todo ticker presente em alguma carteira."""
+    with SessionLocal() as db:
+        tickers = candle_service.held_tickers(db)
+    return sum(candle_service.request_refresh(asset_type, ticker) for asset_type, ticker in tickers)
@@ -0,0 +1,77 @@
+"""Servidor local que imita brapi, CoinGecko e AwesomeAPI para benchmarks offline.
+
+Uso: uvicorn --app-dir benchmarks fake_quotes:app --port 9100
+
+E suba a API apontando para ele:
+    BRAPI_URL='http://localhost:9100/api/quote/{ticker}'
+    COINGECKO_URL='http://localhost:9100/api/v3/simple/price'
+    AWESOMEAPI_URL='http://localhost:9100/last/{pair}'
+
+``FAKE_QUOTES_LATENCY_MS`` adiciona uma latência fixa a cada resposta.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import zlib
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+LATENCY = float(os.environ.get("FAKE_QUOTES_LATENCY_MS", "0")) / 1000
+
+
+def _price(symbol: str) -> float:
+    # Determinístico por símbolo, para resultados comparáveis entre execuções
+    return round(5 + (zlib.crc32(symbol.encode()) % 100000) / 100, 2)
+
+
+async def _delay() -> None:
+    if LATENCY:
+        await asyncio.sleep(LATENCY)
+
+
+async def brapi_quote(request: Request) -> JSONResponse:
+    await _delay()
+    tickers = request.path_params["ticker"].upper().split(",")
+    return JSONResponse(
+        {
+            "results": [
+                {
+                    "symbol": ticker,
+                    "shortName": f"{ticker} SA",
+                    "regularMarketPrice": _price(ticker),
+                    "regularMarketChangePercent": 0.5,
+                }
+                for ticker in tickers
+            ]
+        }
+    )
+
+
+async def coingecko_price(request: Request) -> JSONResponse:
+    await _delay()
+    ids = [coin for coin in request.query_params.get("ids", "").split(",") if coin]
+    return JSONResponse({coin: {"brl": _price(coin)} for coin in ids})
+
+
+async def awesomeapi_last(request: Request) -> JSONResponse:
+    await _delay()
+    pairs = request.path_params["pair"].split(",")
+    return JSONResponse(
+        {
+            pair.replace("-", ""): {"name": pair.replace("-", "/"), "bid": str(_price(pair)), "pctChange": "0.1"}
+            for pair in pairs
+        }
+    )
+
+
+app = Starlette(
+    routes=[
+        Route("/api/quote/{ticker}", brapi_quote),
+        Route("/api/v3/simple/price", coingecko_price),
+        Route("/last/{pair}", awesomeapi_last),
+    ]
+)
@@ -0,0 +1,115 @@
+"""Orçamento de cold start da API: tempo de import de ``app.main`` e módulos pesados.
+
+Uso:
+    python benchmarks/import_profile.py --top 25 --budget-ms 800
+    python benchmarks/import_profile.py --output startup.json --baseline startup_anterior.json
+
+Roda ``python -X importtime -c "import app.main"`` num processo limpo e reporta os
+módulos com maior tempo cumulativo. Também confere que dependências reservadas a
+rotas específicas (Celery, httpx, passlib, Pillow, SDK do OpenTelemetry) não são
+carregadas no import; qualquer violação ou estouro do orçamento termina com código 1.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+API_ROOT = Path(__file__).resolve().parent.parent
+
+# Importados apenas na primeira chamada das rotas que os usam
+DEFERRED_MODULES = ("celery", "httpx", "numpy", "passlib", "PIL", "redis", "opentelemetry.sdk")
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+@dataclass
+class ImportRecord:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def _profile(target: str) -> list[ImportRecord]:
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=API_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    records = []
+    for line in completed.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            records.append(ImportRecord(module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return records
+
+
+def _loaded_deferred(records: list[ImportRecord]) -> list[str]:
+    loaded = {record.module for record in records}
+    return sorted(
+        name for name in DEFERRED_MODULES if any(m == name or m.startswith(name + ".") for m in loaded)
+    )
+
+
+def main(args: argparse.Namespace) -> int:
+    records = _profile(args.target)
+    target = next((r for r in records if r.module == args.target), None)
+    if target is None:
+        print(f"{args.target} não aparece no relatório do -X importtime")
+        return 1
+    total_ms = target.cumulative_us / 1000
+
+    print(f"{'módulo':<60}{'self ms':>10}{'cumul. ms':>12}")
+    for record in sorted(records, key=lambda r: r.cumulative_us, reverse=True)[: args.top]:
+        print(f"{record.module:<60}{record.self_us / 1000:>10.1f}{record.cumulative_us / 1000:>12.1f}")
+
+    # Soma o tempo próprio por pacote de primeiro nível (sem dupla contagem)
+    packages: dict[str, int] = {}
+    for record in records:
+        package = record.module.split(".")[0]
+        packages[package] = packages.get(package, 0) + record.self_us
+    print()
+    print(f"{'pacote':<60}{'self ms':>10}")
+    for package, self_us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:10]:
+        print(f"{package:<60}{self_us / 1000:>10.1f}")
+
+    failed = False
+    print()
+    line = f"import {args.target}: {total_ms:.1f} ms"
+    if args.baseline:
+        previous = json.loads(Path(args.baseline).read_text())["total_ms"]
+        line += f" ({(total_ms - previous) / previous * 100:+.1f}% vs baseline)"
+    print(line)
+    if args.budget_ms and total_ms > args.budget_ms:
+        print(f"Orçamento de {args.budget_ms:.0f} ms excedido")
+        failed = True
+
+    eager = _loaded_deferred(records)
+    if eager:
+        print(f"Módulos que deveriam ser carregados sob demanda: {', '.join(eager)}")
+        failed = True
+
+    if args.output:
+        top = sorted(records, key=lambda r: r.cumulative_us, reverse=True)[: args.top]
+        Path(args.output).write_text(
+            json.dumps({"total_ms": total_ms, "eager": eager, "top": [asdict(r) for r in top]}, indent=2)
+        )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Perfil de import (cold start) da API")
+    parser.add_argument("--target", default="app.main", help="Módulo importado no processo limpo")
+    parser.add_argument("--top", type=int, default=25, help="Quantidade de módulos no relatório")
+    parser.add_argument("--budget-ms", type=float, help="Falha se o import total passar deste tempo")
+    parser.add_argument("--output", help="Grava o relatório em JSON")
+    parser.add_argument("--baseline", help="JSON de uma execução anterior para comparação")
+    sys.exit(main(parser.parse_args()))
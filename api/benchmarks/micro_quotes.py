@@ -0,0 +1,123 @@
+"""Micro-benchmarks do caminho quente de cotações (parsing, validação e serialização).
+
+Uso:
+    python benchmarks/micro_quotes.py --output micro.json
+    python benchmarks/micro_quotes.py --baseline micro.json --max-regression 20
+
+Cada caso roda para 10, 100 e 1000 tickers; com ``--baseline`` o script termina com
+código 1 se algum caso ficar mais lento que o limite percentual informado.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import timeit
+from collections.abc import Callable
+from pathlib import Path
+
+from app.schema.quote import QuoteResult
+from app.services.quote_providers import (
+    parse_awesomeapi_payload,
+    parse_brapi_payload,
+    parse_coingecko_payload,
+)
+from app.worker.tasks.quotes import dump_results, parse_assets
+
+SIZES = (10, 100, 1000)
+
+
+def _brapi_payloads(size: int) -> list[tuple[dict, str]]:
+    return [
+        (
+            {
+                "results": [
+                    {
+                        "symbol": f"TICK{i}",
+                        "shortName": f"Empresa {i} SA",
+                        "regularMarketPrice": 10 + i / 100,
+                        "regularMarketChangePercent": 0.42,
+                    }
+                ]
+            },
+            f"TICK{i}",
+        )
+        for i in range(size)
+    ]
+
+
+def _coingecko_payloads(size: int) -> list[tuple[dict, str, str]]:
+    return [({f"coin-{i}": {"brl": 1000 + i}}, f"C{i}", f"coin-{i}") for i in range(size)]
+
+
+def _awesomeapi_payloads(size: int) -> list[tuple[dict, str]]:
+    return [
+        ({f"USD{i}BRL": {"name": f"Dólar {i}/Real", "bid": "5.12", "pctChange": "0.3"}}, f"USD{i}-BRL")
+        for i in range(size)
+    ]
+
+
+def _raw_assets(size: int) -> list[dict]:
+    kinds = ("STOCK", "CRYPTO", "FX")
+    return [{"ticker": f"TICK{i}", "type": kinds[i % 3]} for i in range(size)]
+
+
+def _cases(size: int) -> dict[str, Callable[[], object]]:
+    brapi = _brapi_payloads(size)
+    coingecko = _coingecko_payloads(size)
+    awesomeapi = _awesomeapi_payloads(size)
+    raw_assets = _raw_assets(size)
+    results = [parse_brapi_payload(data, ticker) for data, ticker in brapi]
+    encoded = json.dumps(dump_results(results))
+
+    return {
+        "parse_brapi": lambda: [parse_brapi_payload(data, ticker) for data, ticker in brapi],
+        "parse_coingecko": lambda: [parse_coingecko_payload(*payload) for payload in coingecko],
+        "parse_awesomeapi": lambda: [parse_awesomeapi_payload(data, pair) for data, pair in awesomeapi],
+        "validate_quote_input": lambda: parse_assets(raw_assets),
+        "dump_results": lambda: dump_results(results),
+        # Ida e volta equivalente ao backend de resultados do Celery + QuoteJobStatus
+        "result_json_roundtrip": lambda: [QuoteResult(**item) for item in json.loads(encoded)],
+    }
+
+
+def _measure(func: Callable[[], object], repeat: int) -> float:
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def main(args: argparse.Namespace) -> int:
+    baseline = json.loads(Path(args.baseline).read_text()) if args.baseline else {}
+    results: dict[str, float] = {}
+    regressions: list[str] = []
+
+    print(f"{'caso':<32}{'µs/chamada':>14}{'µs/ticker':>12}")
+    for size in SIZES:
+        for name, func in _cases(size).items():
+            key = f"{name}[{size}]"
+            seconds = _measure(func, args.repeat)
+            results[key] = seconds
+            line = f"{key:<32}{seconds * 1e6:>14.1f}{seconds * 1e6 / size:>12.2f}"
+            if key in baseline:
+                delta = (seconds - baseline[key]) / baseline[key] * 100
+                line += f"   {delta:+.1f}%"
+                if delta > args.max_regression:
+                    regressions.append(key)
+            print(line)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+    if regressions:
+        print(f"Regressões acima de {args.max_regression}%: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Micro-benchmarks de cotações")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Grava os tempos (s/chamada) em JSON")
+    parser.add_argument("--baseline", help="JSON de uma execução anterior para comparação")
+    parser.add_argument("--max-regression", type=float, default=20.0, help="Tolerância percentual")
+    sys.exit(main(parser.parse_args()))
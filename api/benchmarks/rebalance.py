@@ -0,0 +1,71 @@
+"""Micro-benchmark do simulador de rebalanceamento (``plan_rebalance``).
+
+Uso:
+    python benchmarks/rebalance.py --budget-ms 15
+
+Monta carteiras sintéticas de 100, 500 e 2000 posições (todos os tipos de ativo, lotes
+inteiros e fracionários, parte sem cotação) e termina com código 1 se alguma simulação
+passar do orçamento ou deixar caixa negativo.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import timeit
+import uuid
+
+from app.models.enums import AssetType
+from app.schema.dashboard import RebalanceRequest
+from app.services.rebalance_service import Position, plan_rebalance
+
+SIZES = (100, 500, 2000)
+
+
+def _portfolio(size: int, rng: random.Random) -> tuple[list[Position], list[float | None]]:
+    kinds = list(AssetType)
+    positions = [
+        Position(
+            id=uuid.uuid4(),
+            ticker=f"TICK{i}",
+            asset_type=kinds[i % len(kinds)],
+            quantity=rng.randint(1, 500),
+            average_price=rng.uniform(5, 200),
+        )
+        for i in range(size)
+    ]
+    # ~5% sem cotação ao vivo, avaliados pelo preço médio
+    prices = [None if rng.random() < 0.05 else p.average_price * rng.uniform(0.7, 1.5) for p in positions]
+    return positions, prices
+
+
+def main(args: argparse.Namespace) -> int:
+    rng = random.Random(args.seed)
+    weights = {asset_type: rng.uniform(0.5, 2) for asset_type in AssetType}
+    request = RebalanceRequest(targets=weights, contribution=10_000)
+    failures: list[str] = []
+
+    print(f"{'posições':<12}{'ms/simulação':>14}{'ordens':>10}{'caixa restante':>18}")
+    for size in SIZES:
+        positions, prices = _portfolio(size, rng)
+        timer = timeit.Timer(lambda: plan_rebalance(positions, prices, request))
+        number, _ = timer.autorange()
+        millis = min(timer.repeat(repeat=args.repeat, number=number)) / number * 1000
+        plan = plan_rebalance(positions, prices, request)
+        print(f"{size:<12}{millis:>14.2f}{len(plan.orders):>10}{plan.cash_remaining:>18.2f}")
+        if millis > args.budget_ms:
+            failures.append(f"{size} posições: {millis:.2f} ms > {args.budget_ms} ms")
+        if plan.cash_remaining < 0:
+            failures.append(f"{size} posições: caixa negativo ({plan.cash_remaining})")
+
+    for failure in failures:
+        print(failure)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark do simulador de rebalanceamento")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--budget-ms", type=float, default=15.0, help="Tempo máximo por simulação")
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,188 @@
+"""Carga HTTP contra a API reportando throughput e latências p50/p95/p99.
+
+Uso:
+    python benchmarks/run.py --base-url http://localhost:8000 --requests 2000 --concurrency 32 \\
+        --output results.json [--baseline baseline.json]
+
+Requer um banco populado por ``benchmarks/seed.py``, a API com ``RATE_LIMIT_ENABLED=false``
+(a carga sai de um único IP e poucos usuários) e, para ``quotes_batch``, apontando para
+``benchmarks/fake_quotes.py``.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import httpx
+
+from seed import BENCH_EMAIL, BENCH_PASSWORD
+
+API_PREFIX = "/api/v1"
+
+QUOTE_PAYLOAD = [
+    {"ticker": "PETR4", "type": "STOCK"},
+    {"ticker": "VALE3", "type": "STOCK"},
+    {"ticker": "ITUB4", "type": "STOCK"},
+    {"ticker": "WEGE3", "type": "STOCK"},
+    {"ticker": "MXRF11", "type": "STOCK"},
+    {"ticker": "BOVA11", "type": "STOCK"},
+    {"ticker": "BTC", "type": "CRYPTO"},
+    {"ticker": "ETH", "type": "CRYPTO"},
+    {"ticker": "USD-BRL", "type": "FX"},
+    {"ticker": "EUR-BRL", "type": "FX"},
+]
+
+
+@dataclass
+class ScenarioResult:
+    scenario: str
+    requests: int
+    errors: int
+    throughput_rps: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+
+Request = Callable[[httpx.AsyncClient, str], Awaitable[httpx.Response]]
+
+
+def _login_form(rng: random.Random, users: int) -> dict[str, str]:
+    return {"username": BENCH_EMAIL.format(index=rng.randrange(users)), "password": BENCH_PASSWORD}
+
+
+def _scenarios(users: int, seed: int) -> dict[str, Request]:
+    rng = random.Random(seed)
+
+    def auth(path: str) -> Request:
+        async def call(client: httpx.AsyncClient, token: str) -> httpx.Response:
+            return await client.get(API_PREFIX + path, headers={"Authorization": f"Bearer {token}"})
+
+        return call
+
+    async def auth_token(client: httpx.AsyncClient, token: str) -> httpx.Response:
+        return await client.post(f"{API_PREFIX}/auth/token", data=_login_form(rng, users))
+
+    async def quotes_batch(client: httpx.AsyncClient, token: str) -> httpx.Response:
+        return await client.post(
+            f"{API_PREFIX}/quotes/batch", json=QUOTE_PAYLOAD, headers={"Authorization": f"Bearer {token}"}
+        )
+
+    return {
+        "auth_token": auth_token,
+        "dashboard_summary": auth("/dashboard/summary"),
+        "dashboard_allocation": auth("/dashboard/allocation"),
+        "transactions_list": auth("/transactions/"),
+        "quotes_batch": quotes_batch,
+    }
+
+
+async def _login_pool(client: httpx.AsyncClient, users: int, size: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    tokens = []
+    for _ in range(size):
+        response = await client.post(f"{API_PREFIX}/auth/token", data=_login_form(rng, users))
+        if response.status_code == httpx.codes.TOO_MANY_REQUESTS:
+            raise SystemExit("Login limitado (429); suba a API com RATE_LIMIT_ENABLED=false")
+        response.raise_for_status()
+        tokens.append(response.json()["access_token"])
+    return tokens
+
+
+def _percentile(samples: list[float], percentile: int) -> float:
+    if len(samples) < 2:
+        return samples[0] if samples else 0.0
+    return statistics.quantiles(samples, n=100, method="inclusive")[percentile - 1]
+
+
+async def _run_scenario(
+    client: httpx.AsyncClient, name: str, call: Request, tokens: list[str], total: int, concurrency: int
+) -> ScenarioResult:
+    latencies: list[float] = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker() -> None:
+        nonlocal errors
+        for index in counter:
+            token = tokens[index % len(tokens)]
+            start = time.perf_counter()
+            try:
+                response = await call(client, token)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return ScenarioResult(
+        scenario=name,
+        requests=total,
+        errors=errors,
+        throughput_rps=round(total / elapsed, 1),
+        p50_ms=round(_percentile(latencies, 50), 2),
+        p95_ms=round(_percentile(latencies, 95), 2),
+        p99_ms=round(_percentile(latencies, 99), 2),
+    )
+
+
+def _print_report(results: list[ScenarioResult], baseline: dict[str, dict] | None) -> None:
+    header = f"{'cenário':<22}{'req':>7}{'erros':>7}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        line = (
+            f"{result.scenario:<22}{result.requests:>7}{result.errors:>7}{result.throughput_rps:>10}"
+            f"{result.p50_ms:>10}{result.p95_ms:>10}{result.p99_ms:>10}"
+        )
+        previous = (baseline or {}).get(result.scenario)
+        if previous and previous.get("p95_ms"):
+            delta = (result.p95_ms - previous["p95_ms"]) / previous["p95_ms"] * 100
+            line += f"   p95 {delta:+.1f}% vs baseline"
+        print(line)
+
+
+async def main(args: argparse.Namespace) -> None:
+    scenarios = _scenarios(args.users, args.seed)
+    selected = args.scenario or list(scenarios)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=30.0, limits=limits) as client:
+        tokens = await _login_pool(client, args.users, args.token_pool, args.seed)
+        results = []
+        for name in selected:
+            # Aquecimento curto para não medir conexões e caches frios
+            await _run_scenario(client, name, scenarios[name], tokens, min(50, args.requests), args.concurrency)
+            results.append(
+                await _run_scenario(client, name, scenarios[name], tokens, args.requests, args.concurrency)
+            )
+
+    baseline = json.loads(Path(args.baseline).read_text()) if args.baseline else None
+    _print_report(results, baseline)
+    if args.output:
+        Path(args.output).write_text(json.dumps({r.scenario: asdict(r) for r in results}, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark HTTP da API Investorion")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--users", type=int, default=1000, help="Usuários criados pelo seed")
+    parser.add_argument("--requests", type=int, default=1000, help="Requisições por cenário")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--token-pool", type=int, default=50, help="Usuários autenticados antes da carga")
+    parser.add_argument("--scenario", action="append", help="Restringe a cenários específicos (repetível)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Grava os resultados em JSON")
+    parser.add_argument("--baseline", help="JSON de uma execução anterior para comparação")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,149 @@
+"""Popula o banco com usuários, ativos e transações sintéticos para benchmarks.
+
+Uso: python benchmarks/seed.py --users 10000 --trades-per-user 200
+
+Aponte DATABASE_URL para um banco descartável já migrado (``alembic upgrade head``).
+Os dados são determinísticos para um mesmo ``--seed``.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from sqlalchemy import text
+
+from app.core.security import get_password_hash
+from app.db.session import engine
+
+BENCH_PASSWORD = "bench-password"
+BENCH_EMAIL = "bench{index}@example.com"
+
+TICKERS: list[tuple[str, str, str]] = [
+    ("PETR4", "Petrobras PN", "STOCK"),
+    ("VALE3", "Vale ON", "STOCK"),
+    ("ITUB4", "Itaú Unibanco PN", "STOCK"),
+    ("BBDC4", "Bradesco PN", "STOCK"),
+    ("WEGE3", "WEG ON", "STOCK"),
+    ("MXRF11", "Maxi Renda FII", "FII"),
+    ("HGLG11", "CSHG Logística FII", "FII"),
+    ("BOVA11", "iShares Ibovespa", "ETF"),
+    ("IVVB11", "iShares S&P 500", "ETF"),
+    ("BTC", "Bitcoin", "CRYPTO"),
+    ("ETH", "Ethereum", "CRYPTO"),
+    ("AAPL34", "Apple BDR", "BDR"),
+]
+
+BATCH_USERS = 500
+
+
+def _uuid(rng: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def _generate_batch(
+    rng: random.Random,
+    first_index: int,
+    count: int,
+    assets_per_user: int,
+    trades_per_user: int,
+    password_hash: str,
+) -> tuple[list[tuple], list[tuple], list[tuple], list[tuple]]:
+    users, profiles, assets, transactions = [], [], [], []
+    start = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+    for index in range(first_index, first_index + count):
+        user_id = _uuid(rng)
+        email = BENCH_EMAIL.format(index=index)
+        users.append((user_id, email, password_hash, f"Bench {index}"))
+        profiles.append((user_id, email, f"Bench {index}"))
+
+        user_assets = []
+        for ticker, name, asset_type in rng.sample(TICKERS, k=min(assets_per_user, len(TICKERS))):
+            asset_id = _uuid(rng)
+            user_assets.append(asset_id)
+            assets.append((asset_id, user_id, ticker, name, asset_type))
+
+        for trade in range(trades_per_user):
+            asset_id = user_assets[trade % len(user_assets)]
+            # As primeiras operações de cada ativo são compras para não zerar a posição
+            is_sell = trade >= len(user_assets) and rng.random() < 0.2
+            quantity = Decimal(rng.randint(1, 5) if is_sell else rng.randint(10, 100))
+            unit_price = Decimal(rng.randint(500, 50000)) / 100
+            date = start + timedelta(minutes=rng.randint(0, 60 * 24 * 365 * 5))
+            transactions.append(
+                (_uuid(rng), asset_id, user_id, "SELL" if is_sell else "BUY", quantity, unit_price, Decimal(0), date)
+            )
+
+    return users, profiles, assets, transactions
+
+
+def _copy(cursor, statement: str, rows: list[tuple]) -> None:
+    with cursor.copy(statement) as copy:
+        for row in rows:
+            copy.write_row(row)
+
+
+def seed(users: int, assets_per_user: int, trades_per_user: int, seed_value: int) -> None:
+    rng = random.Random(seed_value)
+    password_hash = get_password_hash(BENCH_PASSWORD)
+    started = time.perf_counter()
+
+    raw = engine.raw_connection()
+    try:
+        with raw.cursor() as cursor:
+            # O trigger de preço médio roda por linha; recalculamos tudo de uma vez ao final
+            cursor.execute("ALTER TABLE transactions DISABLE TRIGGER update_asset_average_price")
+            for first_index in range(0, users, BATCH_USERS):
+                count = min(BATCH_USERS, users - first_index)
+                batch = _generate_batch(rng, first_index, count, assets_per_user, trades_per_user, password_hash)
+                user_rows, profile_rows, asset_rows, transaction_rows = batch
+                _copy(cursor, "COPY users (id, email, hashed_password, full_name) FROM STDIN", user_rows)
+                _copy(cursor, "COPY profiles (id, email, full_name) FROM STDIN", profile_rows)
+                _copy(cursor, "COPY assets (id, user_id, ticker, name, asset_type) FROM STDIN", asset_rows)
+                _copy(
+                    cursor,
+                    "COPY transactions (id, asset_id, user_id, transaction_type, quantity, unit_price, fees, date) "
+                    "FROM STDIN",
+                    transaction_rows,
+                )
+                print(f"{first_index + count}/{users} usuários inseridos")
+
+            cursor.execute(
+                """
+                UPDATE assets a
+                SET quantity = agg.total_quantity,
+                    average_price = CASE WHEN agg.total_quantity > 0 THEN agg.buy_cost / agg.total_quantity ELSE 0 END
+                FROM (
+                  SELECT asset_id,
+                         SUM(CASE WHEN transaction_type = 'BUY' THEN quantity ELSE -quantity END) AS total_quantity,
+                         SUM(CASE WHEN transaction_type = 'BUY' THEN quantity * unit_price ELSE 0 END) AS buy_cost
+                  FROM transactions
+                  GROUP BY asset_id
+                ) agg
+                WHERE agg.asset_id = a.id
+                """
+            )
+            cursor.execute("ALTER TABLE transactions ENABLE TRIGGER update_asset_average_price")
+        raw.commit()
+    finally:
+        raw.close()
+
+    with engine.connect() as conn:
+        conn.execution_options(isolation_level="AUTOCOMMIT").execute(text("ANALYZE"))
+
+    elapsed = time.perf_counter() - started
+    print(f"Seed concluído: {users} usuários × {trades_per_user} transações em {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed sintético para benchmarks")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--assets-per-user", type=int, default=8)
+    parser.add_argument("--trades-per-user", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    seed(args.users, args.assets_per_user, args.trades_per_user, args.seed)
@@ -0,0 +1,51 @@
+"""Throughput da task ``quotes.fetch_batch`` com e sem o event loop persistente.
+
+Uso (com ``benchmarks/fake_quotes.py`` rodando na porta 9100):
+    BRAPI_URL='http://localhost:9100/api/quote/{ticker}' \\
+    COINGECKO_URL=http://localhost:9100/api/v3/simple/price \\
+    AWESOMEAPI_URL='http://localhost:9100/last/{pair}' \\
+    python benchmarks/worker_tasks.py --jobs 1000 --threads 4
+
+Executa as tasks em processo (``Task.apply``, sem broker), isolando o custo de
+criar loop + cliente HTTP por task do restante do pipeline do Celery.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.settings import settings
+from app.worker import event_loop
+from app.worker.tasks import fetch_quotes_task
+
+SMALL_JOB = [{"ticker": "PETR4", "type": "STOCK"}, {"ticker": "USD-BRL", "type": "FX"}]
+
+
+def _run(jobs: int, threads: int, persistent: bool) -> float:
+    settings.worker_persistent_loop = persistent
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(lambda _: fetch_quotes_task.apply(args=[SMALL_JOB]).get(), range(jobs)))
+    return jobs / (time.perf_counter() - started)
+
+
+def main(args: argparse.Namespace) -> None:
+    # Aquecimento: imports, primeira conexão e compilação de validadores
+    _run(min(20, args.jobs), args.threads, persistent=True)
+    _run(min(20, args.jobs), args.threads, persistent=False)
+
+    per_task_loop = _run(args.jobs, args.threads, persistent=False)
+    persistent_loop = _run(args.jobs, args.threads, persistent=True)
+    event_loop.shutdown()
+
+    print(f"asyncio.run por task : {per_task_loop:8.1f} jobs/s")
+    print(f"loop persistente     : {persistent_loop:8.1f} jobs/s")
+    print(f"ganho                : {persistent_loop / per_task_loop:8.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de throughput das tasks de cotação")
+    parser.add_argument("--jobs", type=int, default=1000)
+    parser.add_argument("--threads", type=int, default=1, help="Simula o pool threads do Celery")
+    main(parser.parse_args())
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+
+import httpx
+import pytest
+
+from tests.live_api import API_URL, ApiUnavailable, authenticated_client
+
+
+@pytest.fixture
+def api() -> Iterator[httpx.Client]:
+    """Cliente autenticado na API de ``BENCH_API_URL``; pula o teste se ela não estiver disponível."""
+    if not API_URL:
+        pytest.skip("BENCH_API_URL não definida")
+    try:
+        with authenticated_client(API_URL) as client:
+            yield client
+    except ApiUnavailable as exc:
+        pytest.skip(f"API indisponível em {API_URL}: {exc}")
@@ -0,0 +1,49 @@
+"""Cliente dos testes que rodam contra a API de pé (banco populado por ``benchmarks/seed.py``).
+
+A URL vem de ``BENCH_API_URL``; sem ela, ou com a API fora do ar, os testes que usam a
+fixture ``api`` (``conftest.py``) são pulados.
+"""
+from __future__ import annotations
+
+import os
+import re
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+import httpx
+
+from benchmarks.seed import BENCH_EMAIL, BENCH_PASSWORD
+
+API_URL = os.environ.get("BENCH_API_URL")
+API_PREFIX = "/api/v1"
+# Statements que toda rota autenticada gasta para carregar o usuário
+AUTH_STATEMENTS = 1
+
+_COUNT = re.compile(r"count=(\d+)")
+
+
+class ApiUnavailable(Exception):
+    """A API não respondeu em ``BENCH_API_URL``."""
+
+
+@contextmanager
+def authenticated_client(base_url: str, index: int = 0) -> Iterator[httpx.Client]:
+    """Cliente autenticado como o usuário sintético ``index`` do seed."""
+    with httpx.Client(base_url=base_url + API_PREFIX, timeout=30.0) as client:
+        try:
+            login = client.post(
+                "/auth/token", data={"username": BENCH_EMAIL.format(index=index), "password": BENCH_PASSWORD}
+            )
+        except httpx.TransportError as exc:
+            raise ApiUnavailable(str(exc)) from exc
+        login.raise_for_status()
+        client.headers["Authorization"] = f"Bearer {login.json()['access_token']}"
+        yield client
+
+
+def statement_count(response: httpx.Response) -> int | None:
+    """Statements SQL da requisição segundo o ``X-Query-Report`` (None sem profiling)."""
+    report = response.headers.get("X-Query-Report")
+    if report is None:
+        return None
+    return int(_COUNT.search(report).group(1))
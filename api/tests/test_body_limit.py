@@ -0,0 +1,82 @@
+import asyncio
+
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+
+from app.core.body_limit import BodySizeLimitMiddleware
+
+LIMIT = 1024
+
+
+def _client(parsed: list[int]) -> TestClient:
+    app = FastAPI()
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)) -> dict[str, int]:
+        parsed.append(file.size or 0)
+        return {"size": file.size or 0}
+
+    @app.post("/other")
+    async def other(file: UploadFile = File(...)) -> dict[str, int]:
+        return {"size": file.size or 0}
+
+    app.add_middleware(BodySizeLimitMiddleware, limits={"/upload": LIMIT})
+    return TestClient(app)
+
+
+def test_small_upload_passes():
+    parsed: list[int] = []
+    response = _client(parsed).post("/upload", files={"file": ("a.png", b"x" * 100, "image/png")})
+    assert response.status_code == 200
+    assert parsed == [100]
+
+
+def test_content_length_over_limit_is_rejected_before_parsing():
+    parsed: list[int] = []
+    response = _client(parsed).post("/upload", files={"file": ("a.png", b"x" * (LIMIT * 4), "image/png")})
+    assert response.status_code == 413
+    assert parsed == []
+
+
+def test_chunked_body_is_cut_while_streaming():
+    parsed: list[int] = []
+    app = _client(parsed).app
+    boundary = "limite"
+    head = f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="a.png"\r\n'
+    messages = [head.encode() + b"Content-Type: image/png\r\n\r\n"] + [b"x" * 512] * 64
+    delivered = 0
+    sent: list[dict] = []
+
+    async def receive() -> dict:
+        nonlocal delivered
+        delivered += 1
+        return {"type": "http.request", "body": messages[delivered - 1], "more_body": True}
+
+    async def send(message: dict) -> None:
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/upload",
+        "raw_path": b"/upload",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", f"multipart/form-data; boundary={boundary}".encode())],
+        "client": ("127.0.0.1", 1234),
+        "server": ("testserver", 80),
+    }
+    asyncio.run(app(scope, receive, send))
+
+    assert sent[0]["status"] == 413
+    assert parsed == []
+    # Sem Content-Length a leitura para logo depois de passar do limite
+    assert delivered <= LIMIT // 512 + 2
+
+
+def test_other_routes_are_not_limited():
+    response = _client([]).post("/other", files={"file": ("a.png", b"x" * (LIMIT * 4), "image/png")})
+    assert response.status_code == 200
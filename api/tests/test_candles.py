@@ -0,0 +1,42 @@
+"""Normalização dos candles antes do upsert em ``quote_candles``."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from app.schema.quote import Candle
+from app.services.candle_service import daily_candles
+
+UTC = timezone.utc
+
+
+def _candle(date: datetime, open_: float, close: float, volume: float | None = None) -> Candle:
+    return Candle(date=date, open=open_, high=max(open_, close), low=min(open_, close), close=close, volume=volume)
+
+
+def test_live_tail_is_truncated_to_its_day() -> None:
+    yesterday = datetime(2025, 12, 19, tzinfo=UTC)
+    live = datetime(2025, 12, 20, 14, 37, 12, tzinfo=UTC)
+
+    result = daily_candles([_candle(yesterday, 10, 11), _candle(live, 11, 12)])
+
+    assert [candle.date for candle in result] == [yesterday, datetime(2025, 12, 20, tzinfo=UTC)]
+
+
+def test_same_day_candles_are_merged() -> None:
+    day = datetime(2025, 12, 20, tzinfo=UTC)
+    intraday = [
+        _candle(day + timedelta(hours=4), 10, 13, 5),
+        _candle(day + timedelta(hours=12), 13, 9, None),
+        _candle(day + timedelta(hours=20), 9, 11, 7),
+    ]
+
+    (merged,) = daily_candles(list(reversed(intraday)))
+
+    assert merged == Candle(date=day, open=10, high=13, low=9, close=11, volume=12)
+
+
+def test_day_is_taken_in_utc() -> None:
+    brt = timezone(timedelta(hours=-3))
+    (candle,) = daily_candles([_candle(datetime(2025, 12, 20, 22, 0, tzinfo=brt), 1, 1)])
+
+    assert candle.date == datetime(2025, 12, 21, tzinfo=UTC)
@@ -0,0 +1,134 @@
+"""Confere, via EXPLAIN, que as consultas quentes usam os índices esperados.
+
+Roda contra o banco populado por ``benchmarks/seed.py`` apontado por
+``BENCH_DATABASE_URL`` (sem a variável os testes são pulados):
+
+    BENCH_DATABASE_URL=postgresql+psycopg://... python -m pytest tests/test_explain_indexes.py
+
+Para cada formato de consulta das rotas, views e do trigger de preço médio roda
+``EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)`` com um usuário sintético e exige que os
+índices listados apareçam como Index Scan/Index Only Scan/Bitmap Index Scan, sem
+Seq Scan em ``assets`` ou ``transactions``.
+"""
+from __future__ import annotations
+
+import json
+import os
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from benchmarks.seed import BENCH_EMAIL
+
+DATABASE_URL = os.environ.get("BENCH_DATABASE_URL")
+INDEX_NODES = {"Index Scan", "Index Only Scan", "Bitmap Index Scan"}
+WATCHED_TABLES = {"assets", "transactions"}
+
+pytestmark = pytest.mark.skipif(not DATABASE_URL, reason="BENCH_DATABASE_URL não definida")
+
+
+@dataclass
+class Case:
+    name: str
+    sql: str
+    expected_indexes: tuple[str, ...]
+
+
+CASES = [
+    Case(
+        "assets_list",
+        "SELECT * FROM assets WHERE user_id = :user_id ORDER BY ticker",
+        ("idx_assets_user_ticker",),
+    ),
+    Case(
+        "transactions_list",
+        "SELECT * FROM transactions WHERE user_id = :user_id ORDER BY date DESC",
+        ("idx_transactions_user_date",),
+    ),
+    Case(
+        "transactions_by_asset",
+        "SELECT * FROM transactions WHERE user_id = :user_id AND asset_id = :asset_id ORDER BY date DESC",
+        ("idx_transactions_asset_type",),
+    ),
+    Case(
+        "portfolio_summary",
+        "SELECT * FROM portfolio_summary WHERE user_id = :user_id",
+        ("idx_assets_active_user_type", "idx_transactions_asset_type"),
+    ),
+    Case(
+        "portfolio_allocation",
+        "SELECT * FROM portfolio_allocation WHERE user_id = :user_id ORDER BY percentage DESC",
+        ("idx_assets_active_user_type",),
+    ),
+    Case(
+        "average_price_trigger",
+        """
+        SELECT COALESCE(SUM(quantity), 0), COALESCE(SUM(quantity * unit_price), 0)
+        FROM transactions
+        WHERE asset_id = :asset_id AND transaction_type = 'BUY'
+        """,
+        ("idx_transactions_asset_type",),
+    ),
+]
+
+
+def _walk(node: dict) -> Iterator[dict]:
+    yield node
+    for child in node.get("Plans", []):
+        yield from _walk(child)
+
+
+def _describe(nodes: list[dict]) -> str:
+    return ", ".join(
+        f"{node['Node Type']} ({node.get('Index Name') or node.get('Relation Name')})"
+        for node in nodes
+        if "Scan" in node["Node Type"]
+    )
+
+
+@pytest.fixture(scope="module")
+def connection():
+    engine = create_engine(DATABASE_URL)
+    # Index-only scans dependem do visibility map, atualizado pelo VACUUM
+    with engine.connect() as conn:
+        conn.execution_options(isolation_level="AUTOCOMMIT").execute(text("VACUUM (ANALYZE) assets, transactions"))
+    with engine.connect() as conn:
+        yield conn
+    engine.dispose()
+
+
+@pytest.fixture(scope="module")
+def params(connection) -> dict:
+    row = connection.execute(
+        text(
+            """
+            SELECT u.id AS user_id, a.id AS asset_id
+            FROM users u JOIN assets a ON a.user_id = u.id
+            WHERE u.email = :email
+            ORDER BY a.ticker
+            LIMIT 1
+            """
+        ),
+        {"email": BENCH_EMAIL.format(index=0)},
+    ).mappings().first()
+    if row is None:
+        pytest.skip("Usuário sintético não encontrado; rode benchmarks/seed.py antes")
+    return dict(row)
+
+
+@pytest.mark.parametrize("case", CASES, ids=lambda case: case.name)
+def test_query_uses_expected_indexes(connection, params, case):
+    raw = connection.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {case.sql}"), params).scalar_one()
+    plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]
+    nodes = list(_walk(plan["Plan"]))
+
+    used = {node["Index Name"] for node in nodes if node["Node Type"] in INDEX_NODES}
+    problems = [f"índice {name} não utilizado" for name in case.expected_indexes if name not in used]
+    problems += [
+        f"Seq Scan em {node['Relation Name']}"
+        for node in nodes
+        if node["Node Type"] == "Seq Scan" and node.get("Relation Name") in WATCHED_TABLES
+    ]
+    assert not problems, f"{'; '.join(problems)} — plano: {_describe(nodes)}"
@@ -0,0 +1,63 @@
+"""``GET /assets/{id}/holdings`` contra a API de ``BENCH_API_URL`` (pulado sem ela).
+
+Cria um ativo com três transações no usuário do seed e confere estatísticas, ordem e
+``limit`` das transações recentes, o ativo sem transações e o 404 de um id inexistente.
+Com ``QUERY_PROFILING_ENABLED=true`` também exige uma única consulta além da autenticação.
+"""
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from tests.live_api import AUTH_STATEMENTS, statement_count
+
+
+@pytest.fixture
+def asset_id(api):
+    asset = api.post("/assets/", json={"ticker": "BENCHH", "name": "Holdings", "asset_type": "STOCK"})
+    asset.raise_for_status()
+    yield asset.json()["id"]
+    # As transações caem por cascade
+    api.delete(f"/assets/{asset.json()['id']}")
+
+
+def test_asset_without_transactions(api, asset_id):
+    response = api.get(f"/assets/{asset_id}/holdings")
+    assert response.status_code == 200
+    assert response.json()["stats"]["transaction_count"] == 0
+    assert response.json()["recent_transactions"] == []
+
+
+def test_holdings_stats_and_recent_transactions(api, asset_id):
+    now = datetime.now(tz=timezone.utc)
+    for kind, quantity, price, days_ago in [("BUY", 10, 20.0, 3), ("BUY", 5, 22.0, 2), ("SELL", 4, 25.0, 1)]:
+        api.post(
+            "/transactions/",
+            json={
+                "asset_id": asset_id,
+                "transaction_type": kind,
+                "quantity": quantity,
+                "unit_price": price,
+                "date": (now - timedelta(days=days_ago)).isoformat(),
+            },
+        ).raise_for_status()
+
+    response = api.get(f"/assets/{asset_id}/holdings", params={"limit": 2})
+    assert response.status_code == 200
+    stats = response.json()["stats"]
+    assert stats["transaction_count"] == 3
+    assert stats["bought_quantity"] == 15
+    assert stats["sold_quantity"] == 4
+    assert stats["total_bought"] == 310
+    recent = response.json()["recent_transactions"]
+    assert [item["transaction_type"] for item in recent] == ["SELL", "BUY"]
+
+    count = statement_count(response)
+    if count is not None:
+        assert count <= AUTH_STATEMENTS + 1
+
+
+def test_unknown_asset_is_404(api):
+    assert api.get(f"/assets/{uuid.uuid4()}/holdings").status_code == 404
@@ -0,0 +1,32 @@
+"""Rotas que esperam sem usar o banco não podem segurar uma conexão do pool."""
+from __future__ import annotations
+
+import pytest
+from fastapi.routing import APIRoute
+
+from app.api.deps import get_db, get_read_db
+from app.api.v1.endpoints.quotes import router
+
+
+def _calls(dependant) -> set:
+    calls = {dependant.call}
+    for sub in dependant.dependencies:
+        calls |= _calls(sub)
+    return calls
+
+
+@pytest.mark.parametrize(
+    ("method", "path"),
+    [
+        ("GET", "/quotes/jobs/{task_id}"),
+        ("GET", "/quotes/jobs/{task_id}/events"),
+        ("POST", "/quotes/batch"),
+    ],
+)
+def test_waiting_routes_do_not_hold_a_session(method: str, path: str) -> None:
+    route = next(
+        route
+        for route in router.routes
+        if isinstance(route, APIRoute) and route.path == path and method in route.methods
+    )
+    assert not _calls(route.dependant) & {get_db, get_read_db}
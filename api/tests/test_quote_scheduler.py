@@ -0,0 +1,56 @@
+import asyncio
+
+from app.services.quote_scheduler import Priority, ProviderLimits, QuoteScheduler
+
+
+class _RecordingBudget:
+    """Orçamento em memória no lugar do bucket do Redis: registra as chamadas."""
+
+    def __init__(self) -> None:
+        self.taken: list[tuple[str, Priority]] = []
+        self.paused: list[tuple[str, float]] = []
+
+    async def take(self, provider, limits, priority) -> None:
+        self.taken.append((provider, priority))
+
+    async def pause(self, provider, seconds) -> None:
+        self.paused.append((provider, seconds))
+
+
+def test_shared_budget_replaces_local_bucket():
+    budget = _RecordingBudget()
+    limits = {"brapi": ProviderLimits(concurrency=2, requests_per_minute=1, background_share=0.5)}
+
+    async def run() -> None:
+        scheduler = QuoteScheduler(limits, budget)
+        # Com um bucket local de 1 req/min a segunda chamada esperaria ~1 minuto
+        for priority in (Priority.INTERACTIVE, Priority.BACKGROUND):
+            async with scheduler.slot("brapi", priority, timeout=1.0):
+                pass
+
+    asyncio.run(run())
+    assert budget.taken == [("brapi", Priority.INTERACTIVE), ("brapi", Priority.BACKGROUND)]
+
+
+def test_pause_is_propagated_to_shared_budget():
+    budget = _RecordingBudget()
+
+    async def run() -> None:
+        scheduler = QuoteScheduler({"coingecko": ProviderLimits(concurrency=1, requests_per_minute=30)}, budget)
+        scheduler.pause("coingecko", 12.0)
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert budget.paused == [("coingecko", 12.0)]
+
+
+def test_provider_without_budget_skips_redis():
+    budget = _RecordingBudget()
+
+    async def run() -> None:
+        scheduler = QuoteScheduler({"stub": ProviderLimits(concurrency=1)}, budget)
+        async with scheduler.slot("stub", Priority.BACKGROUND, timeout=1.0):
+            pass
+
+    asyncio.run(run())
+    assert budget.taken == []
@@ -0,0 +1,42 @@
+"""Despacho de ``quote_service`` para os provedores registrados."""
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.schema.quote import QuoteAssetType
+from app.services import quote_service, symbol_directory
+from app.services.quote_providers import StubProvider
+
+
+class _NoCandlesProvider(StubProvider):
+    name = "no-candles"
+    max_candle_days = 0
+
+    async def fetch_candles(self, client, asset_type, symbol, days):
+        raise AssertionError("provedor sem histórico não deve ser chamado")
+
+
+class _Registry:
+    def __init__(self, provider) -> None:
+        self.provider = provider
+
+    def for_type(self, asset_type):
+        return self.provider
+
+
+def test_provider_without_candles_is_unsupported(monkeypatch):
+    async def fresh():
+        return None
+
+    monkeypatch.setattr(symbol_directory, "arefresh_if_stale", fresh)
+    monkeypatch.setattr(quote_service, "get_registry", lambda: _Registry(_NoCandlesProvider()))
+
+    async def run() -> None:
+        async with httpx.AsyncClient() as client:
+            await quote_service.fetch_candles(client, QuoteAssetType.FX, "USD-BRL")
+
+    with pytest.raises(ValueError, match="Ticker não suportado"):
+        asyncio.run(run())
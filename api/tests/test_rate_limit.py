@@ -0,0 +1,70 @@
+"""Identificação do cliente nos buckets de rate limit (sem Redis)."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterator
+
+import pytest
+from starlette.requests import Request
+
+from app.api import rate_limit
+from app.core.settings import settings
+
+NGINX = "172.28.0.10"
+
+
+def _request(peer: str, real_ip: str | None = None) -> Request:
+    headers = [(b"x-real-ip", real_ip.encode())] if real_ip else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers, "client": (peer, 50000)})
+
+
+@pytest.fixture(autouse=True)
+def trust_nginx(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    monkeypatch.setattr(settings, "trusted_proxies", [f"{NGINX}/32"])
+    rate_limit._trusted_networks.cache_clear()
+    yield
+    rate_limit._trusted_networks.cache_clear()
+
+
+def test_trusted_proxy_forwards_real_ip() -> None:
+    assert rate_limit.client_ip(_request(NGINX, "203.0.113.7")) == "203.0.113.7"
+
+
+def test_untrusted_peer_cannot_choose_its_ip() -> None:
+    assert rate_limit.client_ip(_request("198.51.100.9", "203.0.113.7")) == "198.51.100.9"
+
+
+def test_clients_behind_proxy_get_separate_buckets(monkeypatch: pytest.MonkeyPatch) -> None:
+    charged: list[list[str]] = []
+
+    async def fake_enforce(buckets: list[tuple[str, rate_limit.Rate]]) -> None:
+        charged.append([key for key, _ in buckets])
+
+    monkeypatch.setattr(rate_limit, "enforce", fake_enforce)
+    dependency = rate_limit.rate_limit("login", per_ip="20/minute")
+    asyncio.run(dependency(_request(NGINX, "203.0.113.7")))
+    asyncio.run(dependency(_request(NGINX, "203.0.113.8")))
+
+    assert charged == [["login:ip:203.0.113.7"], ["login:ip:203.0.113.8"]]
+
+
+def test_login_bucket_is_per_ip_and_email(monkeypatch: pytest.MonkeyPatch) -> None:
+    from fastapi.security import OAuth2PasswordRequestForm
+
+    from app.api.v1.endpoints import auth
+
+    charged: list[list[str]] = []
+
+    async def fake_enforce(buckets: list[tuple[str, rate_limit.Rate]]) -> None:
+        charged.append([key for key, _ in buckets])
+
+    monkeypatch.setattr(auth, "enforce", fake_enforce)
+    form = OAuth2PasswordRequestForm(username="Vitima@Example.com", password="x")
+    asyncio.run(auth._login_rate_limit(_request(NGINX, "203.0.113.7"), form))
+    asyncio.run(auth._login_rate_limit(_request(NGINX, "203.0.113.8"), form))
+
+    # Tentativas de outro IP não consomem o bucket do IP da vítima
+    assert charged == [
+        ["auth-token:ip:203.0.113.7", "auth-token:user:203.0.113.7:vitima@example.com"],
+        ["auth-token:ip:203.0.113.8", "auth-token:user:203.0.113.8:vitima@example.com"],
+    ]
@@ -0,0 +1,36 @@
+import asyncio
+import uuid
+
+from app.models.enums import AssetType
+from app.schema.dashboard import RebalanceRequest
+from app.services import quote_service, rebalance_service
+
+
+class _RecordingSession:
+    """Sessão em memória com as posições de uma carteira; registra o close."""
+
+    def __init__(self, rows: list[tuple]) -> None:
+        self.rows = rows
+        self.closed = False
+
+    def execute(self, stmt):
+        return iter(self.rows)
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def test_session_is_released_before_quoting(monkeypatch):
+    db = _RecordingSession([(uuid.uuid4(), "PETR4", AssetType.STOCK, 10, 30.0)])
+    closed_while_quoting: list[bool] = []
+
+    async def fake_quotes(inputs, *, priority):
+        closed_while_quoting.append(db.closed)
+        return [None] * len(inputs)
+
+    monkeypatch.setattr(quote_service, "fetch_quotes_aligned", fake_quotes)
+    request = RebalanceRequest(targets={AssetType.STOCK: 1}, contribution=100)
+    plan = asyncio.run(rebalance_service.simulate_rebalance(db, uuid.uuid4(), request))
+
+    assert closed_while_quoting == [True]
+    assert plan.unpriced == ["PETR4"]
@@ -0,0 +1,66 @@
+"""Quantos statements SQL cada endpoint de escrita executa.
+
+Roda contra a API de ``BENCH_API_URL`` com ``QUERY_PROFILING_ENABLED=true`` (pulado
+sem ela ou sem profiling) e lê o ``X-Query-Report`` de cada resposta: 1 statement para
+autenticar o usuário + os da própria escrita, que grava e devolve a linha com
+``INSERT/UPDATE ... RETURNING`` (sem ``db.refresh``).
+"""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import pytest
+
+from tests.live_api import AUTH_STATEMENTS, statement_count
+
+
+def test_writes_stay_within_statement_budget(api):
+    probe = api.get("/profile/me")
+    probe.raise_for_status()
+    if statement_count(probe) is None:
+        pytest.skip("Resposta sem X-Query-Report; suba a API com QUERY_PROFILING_ENABLED=true")
+
+    asset = api.post("/assets/", json={"ticker": "BENCHW", "name": "Benchmark", "asset_type": "STOCK"})
+    asset.raise_for_status()
+    asset_id = asset.json()["id"]
+    try:
+        transaction = api.post(
+            "/transactions/",
+            json={
+                "asset_id": asset_id,
+                "transaction_type": "BUY",
+                "quantity": 1,
+                "unit_price": 10,
+                "date": datetime.now(tz=timezone.utc).isoformat(),
+            },
+        )
+        transaction.raise_for_status()
+        # (nome, resposta, statements da escrita além da autenticação)
+        cases = [
+            ("create_asset", asset, 1),
+            ("update_asset", api.patch(f"/assets/{asset_id}", json={"sector": "Teste"}), 1),
+            # + leitura do ativo para conferir a posse
+            ("create_transaction", transaction, 2),
+            (
+                "update_transaction",
+                api.patch(f"/transactions/{transaction.json()['id']}", json={"notes": "bench"}),
+                1,
+            ),
+            ("update_my_profile", api.patch("/profile/me", json={"full_name": "Bench"}), 1),
+            (
+                "create_suggestion",
+                api.post("/suggestions/", json={"title": "Bench", "description": "Bench", "kind": "ideia"}),
+                1,
+            ),
+        ]
+    finally:
+        # As transações caem por cascade
+        api.delete(f"/assets/{asset_id}")
+
+    over_budget = []
+    for name, response, budget in cases:
+        response.raise_for_status()
+        count = statement_count(response)
+        if count > AUTH_STATEMENTS + budget:
+            over_budget.append(f"{name}: {count} statements (orçamento {AUTH_STATEMENTS + budget})")
+    assert not over_budget